@@ -114,7 +114,8 @@ class ManageBusesView(AdminRequiredMixin, ListView):
 
     def get_queryset(self):
         return (
-            Bus.objects.all().order_by("-created_at")
+            Bus.objects.select_related("assigned_route", "assigned_driver__user")
+            .order_by("-created_at")
         )
 
 
@@ -17,6 +17,20 @@ class User(AbstractUser):
     def __str__(self):
         return f"{self.username} - {self.role}"
 
+    def save(self, *args, **kwargs):
+        from core.identity import forget_user
+
+        super().save(*args, **kwargs)
+        forget_user(self.pk)
+
+    def delete(self, *args, **kwargs):
+        from core.identity import forget_user
+
+        user_id = self.pk
+        result = super().delete(*args, **kwargs)
+        forget_user(user_id)
+        return result
+
     @property
     def is_admin(self):
         return self.role == "admin"
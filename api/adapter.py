@@ -0,0 +1,280 @@
+"""
+Translate Vercel's Python function events into WSGI/ASGI calls.
+
+The serverless contract is a single JSON document per response, so the body
+has to be complete before we return. Chunks are spooled to a temporary file
+as the application yields them (large exports don't sit in Python memory
+twice), and the result is returned as text only when it is textual and valid
+UTF-8; anything else (PDF tickets, QR PNGs) is base64 encoded with
+``isBase64Encoded`` so the bytes arrive intact.
+
+Response headers are returned both as ``headers`` (one value per name) and
+``multiValueHeaders`` so repeated headers such as ``Set-Cookie`` survive.
+
+When the project runs under a real server (gunicorn for ``local_app``,
+uvicorn for ``wakafine_bus.asgi``) responses stream natively; these adapters
+are only used by the Vercel entry point in api/index.py.
+"""
+
+import asyncio
+import base64
+import io
+import sys
+import tempfile
+from urllib.parse import urlencode, urlparse
+
+# Bodies larger than this spill from memory to a temporary file.
+SPOOL_MAX_SIZE = 1024 * 1024
+
+TEXT_CONTENT_TYPES = (
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "application/xhtml+xml",
+    "image/svg+xml",
+)
+
+
+def _first(value):
+    if isinstance(value, (list, tuple)):
+        return value[0] if value else ""
+    return value
+
+
+def request_headers(event):
+    """Return the event headers as a list of (lowercase name, value) pairs."""
+    pairs = []
+    multi = event.get("multiValueHeaders") or {}
+    for key, values in multi.items():
+        for value in values or []:
+            pairs.append((key.lower(), str(value)))
+    if not pairs:
+        for key, value in (event.get("headers") or {}).items():
+            values = value if isinstance(value, (list, tuple)) else [value]
+            for item in values:
+                pairs.append((key.lower(), str(item)))
+    return pairs
+
+
+def query_string(event):
+    """Build an RFC 3986 encoded query string from the event.
+
+    A raw query on the path is kept as-is. Otherwise the parsed ``query`` /
+    ``multiValueQueryStringParameters`` mapping is re-encoded, keeping
+    repeated keys (``?seat=1&seat=2``) and escaping reserved characters.
+    """
+    raw = event.get("rawQuery") or urlparse(event.get("path", "/")).query
+    if raw:
+        return raw
+    query = (
+        event.get("multiValueQueryStringParameters")
+        or event.get("query")
+        or event.get("queryStringParameters")
+        or {}
+    )
+    return urlencode(
+        [
+            (key, item)
+            for key, value in query.items()
+            for item in (value if isinstance(value, (list, tuple)) else [value])
+        ]
+    )
+
+
+def request_body(event):
+    body = event.get("body") or b""
+    if event.get("isBase64Encoded") or event.get("encoding") == "base64":
+        return base64.b64decode(body)
+    if isinstance(body, str):
+        return body.encode("utf-8")
+    return bytes(body)
+
+
+def is_text_response(headers):
+    content_type = ""
+    content_encoding = ""
+    for key, value in headers:
+        lowered = key.lower()
+        if lowered == "content-type":
+            content_type = value.lower()
+        elif lowered == "content-encoding":
+            content_encoding = value.lower()
+    if content_encoding and content_encoding != "identity":
+        return False
+    mime = content_type.split(";")[0].strip()
+    return mime.startswith("text/") or mime in TEXT_CONTENT_TYPES
+
+
+def build_response(status_code, headers, spool):
+    """Assemble the Vercel response dict from collected status/headers/body."""
+    single = {}
+    multi = {}
+    for key, value in headers:
+        multi.setdefault(key, []).append(value)
+        single[key] = value
+
+    spool.seek(0)
+    data = spool.read()
+    response = {
+        "statusCode": status_code,
+        "headers": single,
+        "multiValueHeaders": multi,
+    }
+    if is_text_response(headers):
+        try:
+            response["body"] = data.decode("utf-8")
+            response["isBase64Encoded"] = False
+            return response
+        except UnicodeDecodeError:
+            pass
+    response["body"] = base64.b64encode(data).decode("ascii")
+    response["isBase64Encoded"] = True
+    return response
+
+
+class WSGIAdapter:
+    """Run a WSGI application for one Vercel event."""
+
+    def __init__(self, app):
+        self.app = app
+
+    def environ(self, event):
+        headers = request_headers(event)
+        body = request_body(event)
+        header_map = dict(headers)
+        environ = {
+            "REQUEST_METHOD": event.get("method") or event.get("httpMethod", "GET"),
+            "SCRIPT_NAME": "",
+            "PATH_INFO": urlparse(event.get("path", "/")).path or "/",
+            "QUERY_STRING": query_string(event),
+            "SERVER_NAME": header_map.get("host", "localhost").split(":")[0],
+            "SERVER_PORT": header_map.get("x-forwarded-port", "443"),
+            "SERVER_PROTOCOL": "HTTP/1.1",
+            "REMOTE_ADDR": header_map.get("x-forwarded-for", "").split(",")[0].strip()
+            or "127.0.0.1",
+            "wsgi.version": (1, 0),
+            "wsgi.url_scheme": header_map.get("x-forwarded-proto", "https"),
+            "wsgi.input": io.BytesIO(body),
+            "wsgi.errors": sys.stderr,
+            "wsgi.multithread": False,
+            "wsgi.multiprocess": False,
+            "wsgi.run_once": False,
+            "CONTENT_LENGTH": str(len(body)),
+        }
+        for key, value in headers:
+            name = key.upper().replace("-", "_")
+            if name in ("CONTENT_TYPE", "CONTENT_LENGTH"):
+                environ[name] = value
+                continue
+            name = f"HTTP_{name}"
+            # Repeated request headers are folded as RFC 9110 allows.
+            environ[name] = f"{environ[name]},{value}" if name in environ else value
+        return environ
+
+    def __call__(self, event, context=None):
+        state = {"status": "500 INTERNAL SERVER ERROR", "headers": []}
+        spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+
+        def start_response(status, response_headers, exc_info=None):
+            if exc_info:
+                try:
+                    if state.get("sent"):
+                        raise exc_info[1].with_traceback(exc_info[2])
+                finally:
+                    exc_info = None
+            state["status"] = status
+            state["headers"] = list(response_headers)
+            return spool.write
+
+        result = self.app(self.environ(event), start_response)
+        try:
+            for chunk in result:
+                if chunk:
+                    state["sent"] = True
+                    spool.write(chunk)
+        finally:
+            if hasattr(result, "close"):
+                result.close()
+
+        try:
+            status_code = int(state["status"].split()[0])
+        except (ValueError, IndexError):
+            status_code = 500
+        try:
+            return build_response(status_code, state["headers"], spool)
+        finally:
+            spool.close()
+
+
+class ASGIAdapter:
+    """Run an ASGI application (``wakafine_bus.asgi``) for one Vercel event.
+
+    A single event loop is kept per process so warm invocations reuse it,
+    along with anything async views cached on it.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.loop = asyncio.new_event_loop()
+
+    def scope(self, event):
+        headers = request_headers(event)
+        header_map = dict(headers)
+        path = urlparse(event.get("path", "/")).path or "/"
+        host = header_map.get("host", "localhost").split(":")[0]
+        return {
+            "type": "http",
+            "asgi": {"version": "3.0", "spec_version": "2.3"},
+            "http_version": "1.1",
+            "method": (event.get("method") or event.get("httpMethod", "GET")).upper(),
+            "scheme": header_map.get("x-forwarded-proto", "https"),
+            "path": path,
+            "raw_path": path.encode("utf-8"),
+            "query_string": query_string(event).encode("latin-1"),
+            "root_path": "",
+            "headers": [
+                (key.encode("latin-1"), value.encode("latin-1"))
+                for key, value in headers
+            ],
+            "server": (host, int(header_map.get("x-forwarded-port", "443"))),
+            "client": (
+                header_map.get("x-forwarded-for", "127.0.0.1").split(",")[0].strip(),
+                0,
+            ),
+        }
+
+    async def _run(self, event):
+        body = request_body(event)
+        state = {"status": 500, "headers": [], "complete": asyncio.Event()}
+        spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+        request_sent = False
+
+        async def receive():
+            nonlocal request_sent
+            if not request_sent:
+                request_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            await state["complete"].wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            if message["type"] == "http.response.start":
+                state["status"] = message["status"]
+                state["headers"] = [
+                    (key.decode("latin-1"), value.decode("latin-1"))
+                    for key, value in message.get("headers", [])
+                ]
+            elif message["type"] == "http.response.body":
+                spool.write(message.get("body", b""))
+                if not message.get("more_body", False):
+                    state["complete"].set()
+
+        try:
+            await self.app(self.scope(event), receive, send)
+            return build_response(state["status"], state["headers"], spool)
+        finally:
+            state["complete"].set()
+            spool.close()
+
+    def __call__(self, event, context=None):
+        return self.loop.run_until_complete(self._run(event))
@@ -2,8 +2,6 @@ import os
 import sys
 from pathlib import Path
 import logging
-from urllib.parse import urlparse
-import io
 
 # Configure logging
 logging.basicConfig(
@@ -20,13 +18,20 @@ sys.path.insert(0, str(project_root))
 # Set Django settings module
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'wakafine_bus.settings_production')
 
+from api.adapter import ASGIAdapter, WSGIAdapter
+
+# Serve through Django's WSGI handler by default; set VERCEL_APP_PROTOCOL=asgi
+# to run wakafine_bus.asgi so async views don't need a sync/async bridge.
+APP_PROTOCOL = os.environ.get('VERCEL_APP_PROTOCOL', 'wsgi').lower()
+
 # We'll capture startup errors and expose them in the handler so Vercel doesn't crash silently.
 startup_exception = None
 wsgi_app = None
+app_adapter = None
 
 def initialize_django():
     """Initialize Django application"""
-    global wsgi_app, startup_exception
+    global wsgi_app, app_adapter, startup_exception
     try:
         import django
         from django.core.wsgi import get_wsgi_application
@@ -38,7 +43,12 @@ def initialize_django():
             django.setup()
         
         wsgi_app = get_wsgi_application()
-        logger.info('Django setup completed successfully')
+        if APP_PROTOCOL == 'asgi':
+            from wakafine_bus.asgi import application as asgi_app
+            app_adapter = ASGIAdapter(asgi_app)
+        else:
+            app_adapter = WSGIAdapter(wsgi_app)
+        logger.info('Django setup completed successfully (%s)', APP_PROTOCOL)
         startup_exception = None
         return True
     except Exception as e:
@@ -53,43 +63,6 @@ def initialize_django():
 initialize_django()
 
 
-def _build_environ(event):
-    # Convert Vercel event to a WSGI environ dict
-    path = event.get('path', '/')
-    query = event.get('query', {}) or {}
-    method = event.get('method', 'GET')
-    headers = event.get('headers', {}) or {}
-    body = event.get('body', '') or ''
-
-    parsed = urlparse(path)
-    body_bytes = body.encode('utf-8') if isinstance(body, str) else (body or b'')
-    environ = {
-        'REQUEST_METHOD': method,
-        'SCRIPT_NAME': '',
-        'PATH_INFO': parsed.path,
-        'QUERY_STRING': '&'.join(f'{k}={v}' for k, v in query.items()),
-        'SERVER_PROTOCOL': 'HTTP/1.1',
-        'wsgi.version': (1, 0),
-        'wsgi.url_scheme': headers.get('x-forwarded-proto', 'https'),
-        'wsgi.input': io.BytesIO(body_bytes),
-        'wsgi.errors': sys.stderr,
-        'wsgi.multithread': False,
-        'wsgi.multiprocess': False,
-        'wsgi.run_once': False,
-        'CONTENT_LENGTH': str(len(body_bytes)) if body_bytes else '0',
-    }
-
-    # Add headers
-    for key, value in headers.items():
-        hk = key.upper().replace('-', '_')
-        if hk in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
-            environ[hk] = value
-        else:
-            environ[f'HTTP_{hk}'] = value
-
-    return environ
-
-
 def handler(event, context):
     # Top-level handler called by Vercel
     try:
@@ -107,8 +80,8 @@ def handler(event, context):
                     'headers': {'Content-Type': 'text/plain'}
                 }
 
-        # Ensure wsgi_app is available
-        if wsgi_app is None:
+        # Ensure the application is available
+        if app_adapter is None:
             logger.error('WSGI application not available')
             return {
                 'statusCode': 500,
@@ -132,47 +105,9 @@ def handler(event, context):
         if path == '/api/health':
             return {'statusCode': 200, 'body': 'Healthy', 'headers': {'Content-Type': 'text/plain'}}
 
-        # Construct WSGI environ and call the application
-        environ = _build_environ(event)
-
-        status_headers = {'status': None, 'headers': []}
-        body_chunks = []
-
-        def start_response(status, response_headers, exc_info=None):
-            status_headers['status'] = status
-            status_headers['headers'] = response_headers
-
-            def write(data):
-                body_chunks.append(data if isinstance(data, (bytes, bytearray)) else data.encode('utf-8'))
-
-            return write
-
-        result = wsgi_app(environ, start_response)
-        try:
-            for part in result:
-                if isinstance(part, (bytes, bytearray)):
-                    body_chunks.append(part)
-                else:
-                    body_chunks.append(str(part).encode('utf-8'))
-        finally:
-            if hasattr(result, 'close'):
-                try:
-                    result.close()
-                except Exception:
-                    pass
-
-        status_line = status_headers.get('status') or '500 INTERNAL SERVER ERROR'
-        try:
-            status_code = int(status_line.split()[0])
-        except Exception:
-            status_code = 500
-
-        # Convert headers to dict (last value wins)
-        headers = {k: v for k, v in status_headers.get('headers', [])}
-
-        body = b''.join(body_chunks).decode('utf-8', errors='replace')
-
-        return {'statusCode': status_code, 'headers': headers, 'body': body}
+        # Run the request through the WSGI/ASGI adapter, which keeps binary
+        # bodies intact (base64) and preserves repeated headers like Set-Cookie
+        return app_adapter(event, context)
 
     except Exception as e:
         logger.error(f'Request error: {e!s}')
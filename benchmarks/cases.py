@@ -0,0 +1,132 @@
+"""
+Benchmark cases for the booking, seat map, GPS and admin hot paths.
+
+View-level cases go through Django's test client or RequestFactory so the
+numbers include middleware, ORM and rendering, i.e. what a request costs on
+a real server minus the network.
+"""
+
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.test import Client, RequestFactory
+from django.urls import reverse
+from django.utils import timezone
+
+from bookings import ticket_pdf as ticket_renderer
+from bookings.models import Booking
+from bookings.views import get_seat_availability
+from buses.models import Bus
+from gps_tracking.views import GetBusLocationsAPIView
+
+from .harness import benchmark
+
+User = get_user_model()
+
+
+def _client_for(username):
+    client = Client()
+    client.force_login(User.objects.get(username=username))
+    return client
+
+
+def _get(client, url):
+    def call():
+        response = client.get(url)
+        if response.status_code >= 400:
+            raise RuntimeError(f"GET {url} returned {response.status_code}")
+        return response
+    return call
+
+
+def _busiest_bus():
+    booking = Booking.objects.order_by("-travel_date").only("bus_id").first()
+    return Bus.objects.get(pk=booking.bus_id) if booking else Bus.objects.first()
+
+
+@benchmark("seat_availability", iterations=100)
+def seat_availability(context):
+    booking = Booking.objects.filter(status="confirmed").select_related("bus").first()
+    request = RequestFactory().get(
+        "/bookings/ajax/get-seat-availability/",
+        {"bus_id": booking.bus_id, "travel_date": booking.travel_date.date().isoformat()},
+    )
+    return lambda: get_seat_availability(request)
+
+
+@benchmark("bus_locations_api", iterations=10, warmup=1)
+def bus_locations_api(context):
+    view = GetBusLocationsAPIView.as_view()
+    request = RequestFactory().get("/gps/api/buses/locations/")
+    return lambda: view(request)
+
+
+@benchmark("booking_create", iterations=20, warmup=2)
+def booking_create(context):
+    """POST the booking form; each booking is rolled back so the seat stays free."""
+    bus = _busiest_bus()
+    seat = bus.seats.order_by("seat_number").first()
+    client = _client_for("bench_customer_0")
+    data = {
+        "route": bus.assigned_route_id,
+        "bus": bus.pk,
+        "seat": seat.pk,
+        "trip_type": "one_way",
+        "travel_date": (timezone.localdate() + timedelta(days=365)).isoformat(),
+    }
+    url = reverse("bookings:create")
+
+    def call():
+        with transaction.atomic():
+            response = client.post(url, data)
+            if response.status_code != 302:
+                raise RuntimeError(f"booking form rejected ({response.status_code})")
+            transaction.set_rollback(True)
+
+    return call
+
+
+@benchmark("ticket_pdf", iterations=30, warmup=3)
+def ticket_pdf(context):
+    booking = Booking.objects.filter(status="confirmed").first()
+    client = _client_for("bench_admin")
+    return _get(client, reverse("bookings:ticket_pdf", kwargs={"pk": booking.pk}))
+
+
+TICKET_BATCH = 400
+
+
+@benchmark("ticket_pdf_batch", iterations=5, warmup=1, unit="pages", per_call=TICKET_BATCH)
+def ticket_pdf_batch(context):
+    """Bulk reprint: TICKET_BATCH tickets rendered in 200-page files over a process pool."""
+    bookings = list(
+        Booking.objects.filter(status="confirmed")
+        .select_related("route", "bus", "seat", "customer")[:TICKET_BATCH]
+    )
+    tickets = [ticket_renderer.ticket_fields(booking) for booking in bookings]
+    tickets = (tickets * (TICKET_BATCH // len(tickets) + 1))[:TICKET_BATCH]
+    return lambda: ticket_renderer.render_batch(tickets, "01/01/2025 00:00")
+
+
+ADMIN_PAGES = {
+    "admin_dashboard": "accounts:admin_dashboard",
+    "admin_manage_buses": "accounts:admin_manage_buses",
+    "admin_manage_bookings": "accounts:admin_manage_bookings",
+    "admin_manage_tickets": "accounts:admin_manage_tickets",
+    "gps_admin_dashboard": "gps_tracking:admin_dashboard",
+    "gps_admin_bus_list": "gps_tracking:admin_bus_list",
+    "django_admin_buslocation": "admin:gps_tracking_buslocation_changelist",
+    "django_admin_bus": "admin:buses_bus_changelist",
+    "django_admin_driver": "admin:gps_tracking_driver_changelist",
+}
+
+
+def _admin_page(url_name):
+    def setup(context):
+        return _get(_client_for("bench_admin"), reverse(url_name))
+    return setup
+
+
+for _name, _url_name in ADMIN_PAGES.items():
+    benchmark(_name, iterations=10, warmup=1)(_admin_page(_url_name))
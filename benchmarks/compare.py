@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+"""
+Compare two benchmark result files produced by benchmarks/run.py.
+
+  python benchmarks/compare.py results/before.json results/after.json --threshold 10
+
+Prints p50 latency and query count changes per case and exits with status 1
+when any case got slower than ``--threshold`` percent or runs more queries.
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+
+def load(path):
+    payload = json.loads(Path(path).read_text())
+    return payload, {result["name"]: result for result in payload["results"]}
+
+
+def change(before, after):
+    if not before:
+        return 0.0
+    return (after - before) / before * 100
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("before")
+    parser.add_argument("after")
+    parser.add_argument("--threshold", type=float, default=10.0, help="allowed slowdown in percent")
+    parser.add_argument("--metric", default="p50_ms", help="latency field to compare")
+    args = parser.parse_args()
+
+    before_meta, before = load(args.before)
+    after_meta, after = load(args.after)
+    print(
+        f"{before_meta.get('revision')} ({before_meta['database']}/{before_meta['scale']})"
+        f"  ->  {after_meta.get('revision')} ({after_meta['database']}/{after_meta['scale']})"
+    )
+    print(f"{'case':<28} {'before':>10} {'after':>10} {'change':>8}   queries")
+
+    regressions = []
+    for name in sorted(set(before) | set(after)):
+        old, new = before.get(name), after.get(name)
+        if not old or not new or "error" in old or "error" in new:
+            status = (new or {}).get("error") or ("missing" if not new else "new")
+            print(f"{name:<28} {status}")
+            continue
+        pct = change(old[args.metric], new[args.metric])
+        queries = f"{old['queries_mean']} -> {new['queries_mean']}"
+        flag = ""
+        if pct > args.threshold or new["queries_mean"] > old["queries_mean"]:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(
+            f"{name:<28} {old[args.metric]:>10.2f} {new[args.metric]:>10.2f}"
+            f" {pct:>+7.1f}%   {queries}{flag}"
+        )
+
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+#!/usr/bin/env python
+"""
+Benchmark database connection strategies against a local Postgres.
+
+Simulates the request lifecycle Django runs for every request (close stale
+connections, run a query, close or keep the connection) under each
+``DB_POOL_MODE``/``CONN_MAX_AGE`` combination from wakafine_bus/database.py.
+
+A local Postgres is much closer than Supabase, so the script can put a TCP
+proxy in front of it that adds a fixed delay to every packet, standing in for
+the round trips a TLS handshake to a hosted database costs.
+
+Usage:
+  BENCH_PG_NAME=postgres BENCH_PG_USER=postgres BENCH_PG_PASSWORD=postgres \\
+  python benchmarks/connection_pooling.py --requests 200 --latency-ms 20
+"""
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "wakafine_bus.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.db.utils import ConnectionHandler  # noqa: E402
+
+from wakafine_bus.database import postgres_database  # noqa: E402
+
+
+class LatencyProxy:
+    """Forward TCP traffic to ``target`` after sleeping ``delay`` seconds per chunk."""
+
+    def __init__(self, target_host, target_port, delay):
+        self.target = (target_host, target_port)
+        self.delay = delay
+        self.server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.server.bind(("127.0.0.1", 0))
+        self.server.listen(64)
+        self.port = self.server.getsockname()[1]
+        self._thread = threading.Thread(target=self._accept, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def _accept(self):
+        while True:
+            try:
+                client, _ = self.server.accept()
+            except OSError:
+                return
+            upstream = socket.create_connection(self.target)
+            for src, dst in ((client, upstream), (upstream, client)):
+                threading.Thread(
+                    target=self._pipe, args=(src, dst), daemon=True
+                ).start()
+
+    def _pipe(self, src, dst):
+        try:
+            while True:
+                data = src.recv(65536)
+                if not data:
+                    break
+                time.sleep(self.delay)
+                dst.sendall(data)
+        except OSError:
+            pass
+        finally:
+            for sock in (src, dst):
+                try:
+                    sock.close()
+                except OSError:
+                    pass
+
+    def close(self):
+        self.server.close()
+
+
+def scenarios(host, port, base_env):
+    """Yield (label, DATABASES entry) pairs to compare."""
+    def build(**overrides):
+        env = dict(base_env, **overrides)
+        return postgres_database(
+            env["BENCH_PG_NAME"],
+            env["BENCH_PG_USER"],
+            env.get("BENCH_PG_PASSWORD", ""),
+            host,
+            str(port),
+            sslmode=env.get("BENCH_PG_SSLMODE", "disable"),
+            env=env,
+        )
+
+    yield "direct, CONN_MAX_AGE=0", build(DB_POOL_MODE="direct", DB_CONN_MAX_AGE="0")
+    yield "direct, CONN_MAX_AGE=60", build(DB_POOL_MODE="direct", DB_CONN_MAX_AGE="60")
+    yield "pgbouncer, CONN_MAX_AGE=60", build(
+        DB_POOL_MODE="pgbouncer", DB_CONN_MAX_AGE="60"
+    )
+    pooled = build(DB_POOL_MODE="psycopg")
+    if "pool" in pooled["OPTIONS"]:
+        yield "psycopg pool", pooled
+
+
+def simulate_requests(config, requests):
+    """Run ``requests`` request cycles and return per-request latency in ms."""
+    handler = ConnectionHandler({"default": config})
+    conn = handler["default"]
+    timings = []
+    try:
+        for _ in range(requests):
+            start = time.perf_counter()
+            # Same calls Django makes on request_started / request_finished.
+            conn.close_if_unusable_or_obsolete()
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
+                cursor.fetchone()
+            conn.close_if_unusable_or_obsolete()
+            timings.append((time.perf_counter() - start) * 1000)
+    finally:
+        conn.close()
+        if hasattr(conn, "close_pool"):
+            conn.close_pool()
+    return timings
+
+
+def summarise(label, timings):
+    ordered = sorted(timings)
+    return {
+        "scenario": label,
+        "requests": len(ordered),
+        "mean_ms": round(statistics.fmean(ordered), 3),
+        "p50_ms": round(ordered[len(ordered) // 2], 3),
+        "p95_ms": round(ordered[int(len(ordered) * 0.95) - 1], 3),
+        "max_ms": round(ordered[-1], 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument(
+        "--latency-ms",
+        type=float,
+        default=0.0,
+        help="delay added to every packet by a local proxy (0 = connect directly)",
+    )
+    parser.add_argument("--out", help="write JSON results to this file")
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    if not env.get("BENCH_PG_NAME") or not env.get("BENCH_PG_USER"):
+        parser.error("set BENCH_PG_NAME and BENCH_PG_USER (and BENCH_PG_HOST/PORT)")
+
+    host = env.get("BENCH_PG_HOST", "127.0.0.1")
+    port = int(env.get("BENCH_PG_PORT", "5432"))
+    proxy = None
+    if args.latency_ms:
+        proxy = LatencyProxy(host, port, args.latency_ms / 1000).start()
+        host, port = "127.0.0.1", proxy.port
+
+    results = []
+    try:
+        for label, config in scenarios(host, port, env):
+            result = summarise(label, simulate_requests(config, args.requests))
+            results.append(result)
+            print(
+                f"{label:<28} mean {result['mean_ms']:>8.2f} ms"
+                f"   p50 {result['p50_ms']:>8.2f} ms   p95 {result['p95_ms']:>8.2f} ms"
+            )
+    finally:
+        if proxy:
+            proxy.close()
+
+    payload = {
+        "benchmark": "connection_pooling",
+        "latency_ms": args.latency_ms,
+        "results": results,
+    }
+    if args.out:
+        Path(args.out).write_text(json.dumps(payload, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+#!/usr/bin/env python
+"""
+Load-test the GPS polling endpoints: sync views vs their async variants.
+
+Opens ``--concurrency`` keep-alive connections that poll an endpoint as fast
+as the server answers for ``--duration`` seconds, then reports throughput and
+latency for each sync/async pair. Run it against the ASGI app so both kinds of
+view are served by the same process:
+
+  uvicorn wakafine_bus.asgi:application --port 8000 &
+  python benchmarks/gps_pollers.py --base-url http://127.0.0.1:8000 \\
+      --concurrency 50 --duration 10
+
+``--spawn`` starts (and stops) uvicorn itself.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from urllib.parse import urlparse
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+ENDPOINT_PAIRS = [
+    ("bus locations", "/gps/api/buses/locations/", "/gps/api/async/buses/locations/"),
+    ("passenger buses", "/gps/api/passenger/buses/", "/gps/api/async/passenger/buses/"),
+]
+
+
+async def _get(reader, writer, host, path):
+    writer.write(
+        f"GET {path} HTTP/1.1\r\nHost: {host}\r\nConnection: keep-alive\r\n\r\n".encode()
+    )
+    await writer.drain()
+    status_line = await reader.readline()
+    length = 0
+    chunked = False
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.lower() == "content-length":
+            length = int(value.strip())
+        elif name.lower() == "transfer-encoding" and "chunked" in value.lower():
+            chunked = True
+    if chunked:
+        while True:
+            size = int((await reader.readline()).strip(), 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    elif length:
+        await reader.readexactly(length)
+    return int(status_line.split()[1])
+
+
+async def _poller(host, port, path, deadline, latencies, errors):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            status = await _get(reader, writer, host, path)
+            latencies.append((time.perf_counter() - start) * 1000)
+            if status != 200:
+                errors.append(status)
+    except (ConnectionError, asyncio.IncompleteReadError) as exc:
+        errors.append(type(exc).__name__)
+    finally:
+        writer.close()
+
+
+async def run_load(base_url, path, concurrency, duration):
+    parsed = urlparse(base_url)
+    host, port = parsed.hostname, parsed.port or 80
+    latencies, errors = [], []
+    deadline = time.perf_counter() + duration
+    await asyncio.gather(
+        *(
+            _poller(host, port, path, deadline, latencies, errors)
+            for _ in range(concurrency)
+        )
+    )
+    ordered = sorted(latencies) or [0.0]
+    return {
+        "path": path,
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": len(errors),
+        "requests_per_sec": round(len(latencies) / duration, 1),
+        "p50_ms": round(ordered[len(ordered) // 2], 2),
+        "p95_ms": round(ordered[max(int(len(ordered) * 0.95) - 1, 0)], 2),
+        "mean_ms": round(statistics.fmean(ordered), 2),
+    }
+
+
+def spawn_server(port):
+    process = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "wakafine_bus.asgi:application",
+            "--port", str(port), "--log-level", "warning",
+        ],
+        cwd=PROJECT_ROOT,
+        env=dict(os.environ),
+    )
+    time.sleep(3)
+    return process
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--spawn", action="store_true", help="start uvicorn for the run")
+    parser.add_argument("--out", help="write JSON results to this file")
+    args = parser.parse_args()
+
+    server = spawn_server(urlparse(args.base_url).port or 8000) if args.spawn else None
+    results = []
+    try:
+        for label, sync_path, async_path in ENDPOINT_PAIRS:
+            for kind, path in (("sync", sync_path), ("async", async_path)):
+                result = asyncio.run(
+                    run_load(args.base_url, path, args.concurrency, args.duration)
+                )
+                result.update(endpoint=label, kind=kind)
+                results.append(result)
+                print(
+                    f"{label:<16} {kind:<6} {result['requests_per_sec']:>8} req/s"
+                    f"   p50 {result['p50_ms']:>8} ms   p95 {result['p95_ms']:>8} ms"
+                    f"   errors {result['errors']}"
+                )
+    finally:
+        if server:
+            server.terminate()
+            server.wait()
+
+    if args.out:
+        Path(args.out).write_text(
+            json.dumps({"benchmark": "gps_pollers", "results": results}, indent=2)
+        )
+
+
+if __name__ == "__main__":
+    main()
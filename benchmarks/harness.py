@@ -0,0 +1,105 @@
+"""
+Timing harness shared by the benchmark cases.
+
+A case is a function registered with ``@benchmark`` that receives a
+``Context`` and returns a zero-argument callable to time (plus an optional
+teardown). The harness runs warm-up iterations, then measures latency,
+throughput and the number of SQL queries per call. Cases that produce
+several items per call (e.g. PDF pages) pass ``unit`` and ``per_call`` and
+also get ``<unit>_per_sec``.
+"""
+
+import statistics
+import subprocess
+import time
+from dataclasses import dataclass, field
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+REGISTRY = {}
+
+
+def benchmark(name, iterations=50, warmup=5, unit=None, per_call=1):
+    """Register a benchmark case under ``name``."""
+    def decorator(func):
+        REGISTRY[name] = Case(name, func, iterations, warmup, unit, per_call)
+        return func
+    return decorator
+
+
+@dataclass
+class Case:
+    name: str
+    setup: object
+    iterations: int
+    warmup: int
+    unit: str = None
+    per_call: int = 1
+
+
+@dataclass
+class Context:
+    """Shared fixtures handed to every case's setup function."""
+    scale: str
+    data: dict = field(default_factory=dict)
+
+
+def _percentile(ordered, fraction):
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, int(round(fraction * len(ordered))) - 1))
+    return ordered[index]
+
+
+def measure(func, iterations, warmup):
+    """Time ``func`` and return latency, throughput and query statistics."""
+    for _ in range(warmup):
+        func()
+
+    latencies = []
+    queries = []
+    started = time.perf_counter()
+    for _ in range(iterations):
+        with CaptureQueriesContext(connection) as captured:
+            start = time.perf_counter()
+            func()
+            latencies.append((time.perf_counter() - start) * 1000)
+        queries.append(len(captured.captured_queries))
+    elapsed = time.perf_counter() - started
+
+    ordered = sorted(latencies)
+    return {
+        "iterations": iterations,
+        "mean_ms": round(statistics.fmean(ordered), 3),
+        "p50_ms": round(_percentile(ordered, 0.50), 3),
+        "p95_ms": round(_percentile(ordered, 0.95), 3),
+        "p99_ms": round(_percentile(ordered, 0.99), 3),
+        "max_ms": round(ordered[-1], 3),
+        "throughput_per_sec": round(iterations / elapsed, 2) if elapsed else None,
+        "queries_mean": round(statistics.fmean(queries), 2),
+        "queries_max": max(queries),
+    }
+
+
+def run_case(case, context, iterations=None):
+    prepared = case.setup(context)
+    func, teardown = prepared if isinstance(prepared, tuple) else (prepared, None)
+    try:
+        result = measure(func, iterations or case.iterations, case.warmup)
+    finally:
+        if teardown:
+            teardown()
+    if case.unit and result["throughput_per_sec"]:
+        result[f"{case.unit}_per_sec"] = round(result["throughput_per_sec"] * case.per_call, 1)
+    result["name"] = case.name
+    return result
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except Exception:
+        return None
@@ -0,0 +1,177 @@
+#!/usr/bin/env python
+"""
+Microbenchmark PNR generation against a table with millions of PNRs.
+
+Compares the old generator (random code, then an ``exists()`` query per
+attempt) with the block allocator in bookings/pnr.py, for single bookings
+and for group-sized batches. It reports time and database queries per PNR.
+The query count is what matters against a hosted database, where every
+query is a network round trip.
+
+The extra bookings are inserted into the benchmark database
+(benchmarks/settings.py) inside a transaction that is rolled back at the
+end, so the seeded dataset is left as it was. Seed it first:
+
+  python benchmarks/run.py --scale tiny --seed --only seat_availability
+  python benchmarks/pnr_allocation.py --existing 2000000 --allocations 2000
+"""
+
+import argparse
+import json
+import os
+import random
+import string
+import sys
+import time
+from datetime import timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ["DJANGO_SETTINGS_MODULE"] = os.environ.get(
+    "BENCH_SETTINGS_MODULE", "benchmarks.settings"
+)
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.core.management import call_command  # noqa: E402
+from django.db import connection, transaction  # noqa: E402
+from django.test.utils import CaptureQueriesContext  # noqa: E402
+
+from benchmarks.seed import is_seeded  # noqa: E402
+from bookings import pnr  # noqa: E402
+from bookings.models import Booking  # noqa: E402
+
+INSERT_BATCH = 10_000
+GROUP_SIZE = 20
+FUTURE_DAYS = 50 * 365
+
+
+def legacy_generate_pnr():
+    """The generator Booking.generate_pnr used before bookings/pnr.py."""
+    while True:
+        code = "".join(random.choices(string.ascii_uppercase + string.digits, k=8))
+        if not Booking.objects.filter(pnr_code=code).exists():
+            return code
+
+
+def insert_existing(count, log):
+    """Add ``count`` bookings with random legacy-style PNRs, copied from a seeded row."""
+    template = Booking.objects.order_by("pk").first()
+    fields = [f for f in Booking._meta.concrete_fields if not f.primary_key]
+    columns = ", ".join(connection.ops.quote_name(f.column) for f in fields)
+    placeholders = ", ".join(["%s"] * len(fields))
+    sql = f"INSERT INTO {Booking._meta.db_table} ({columns}) VALUES ({placeholders})"
+
+    base = [f.get_db_prep_save(getattr(template, f.attname), connection) for f in fields]
+    pnr_index = fields.index(Booking._meta.get_field("pnr_code"))
+    date_index = fields.index(Booking._meta.get_field("travel_date"))
+    date_field = fields[date_index]
+    seen = set(Booking.objects.values_list("pnr_code", flat=True))
+    alphabet = string.ascii_uppercase + string.digits
+
+    start = time.perf_counter()
+    inserted = 0
+    with connection.cursor() as cursor:
+        while inserted < count:
+            rows = []
+            for _ in range(min(INSERT_BATCH, count - inserted)):
+                code = "".join(random.choices(alphabet, k=8))
+                if code in seen:
+                    continue
+                seen.add(code)
+                row = list(base)
+                row[pnr_index] = code
+                # Distinct far-future departures keep (bus, seat, travel_date) unique.
+                departure = template.travel_date + timedelta(days=FUTURE_DAYS, seconds=len(seen))
+                row[date_index] = date_field.get_db_prep_save(departure, connection)
+                rows.append(row)
+            cursor.executemany(sql, rows)
+            inserted += len(rows)
+    log(f"inserted {inserted:,} existing PNRs in {time.perf_counter() - start:.1f}s")
+    return inserted
+
+
+def measure(label, allocate, pnrs_per_call, calls):
+    with CaptureQueriesContext(connection) as queries:
+        start = time.perf_counter()
+        codes = []
+        for _ in range(calls):
+            codes.extend(allocate())
+        elapsed = time.perf_counter() - start
+    assert len(codes) == len(set(codes)) == pnrs_per_call * calls, f"{label}: duplicate PNRs"
+    return {
+        "name": label,
+        "pnrs": len(codes),
+        "us_per_pnr": round(elapsed / len(codes) * 1e6, 2),
+        "queries_per_pnr": round(len(queries) / len(codes), 3),
+    }
+
+
+def verify_encoding(count):
+    """Encode ``count`` sequence numbers: all distinct, all pass the check character."""
+    start = time.perf_counter()
+    codes = [pnr.encode(number) for number in range(count)]
+    elapsed = time.perf_counter() - start
+    distinct = len(set(codes))
+    valid = sum(1 for code in codes if pnr.is_valid(code))
+    return {
+        "encoded": count,
+        "distinct": distinct,
+        "valid": valid,
+        "us_per_encode": round(elapsed / count * 1e6, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--existing", type=int, default=1_000_000, help="PNRs to add before measuring")
+    parser.add_argument("--allocations", type=int, default=2_000, help="PNRs to allocate per strategy")
+    parser.add_argument("--verify", type=int, default=1_000_000, help="sequence numbers to encode and check")
+    parser.add_argument("--out", help="write JSON results to this file")
+    args = parser.parse_args()
+
+    call_command("migrate", interactive=False, verbosity=0)
+    if not is_seeded():
+        parser.error("the benchmark database is not seeded; run benchmarks/run.py --seed first")
+
+    results = []
+    with transaction.atomic():
+        insert_existing(args.existing, print)
+        total = Booking.objects.count()
+        print(f"bookings table: {total:,} rows")
+
+        allocator = pnr.PnrAllocator()
+        groups = max(1, args.allocations // GROUP_SIZE)
+        results = [
+            measure("legacy exists() loop", lambda: [legacy_generate_pnr()], 1, args.allocations),
+            measure("allocator, single", lambda: allocator.allocate(1), 1, args.allocations),
+            measure(f"allocator, groups of {GROUP_SIZE}", lambda: allocator.allocate(GROUP_SIZE), GROUP_SIZE, groups),
+        ]
+        transaction.set_rollback(True)
+
+    for result in results:
+        print(
+            f"{result['name']:<26} {result['us_per_pnr']:>9.1f} us/PNR"
+            f"   {result['queries_per_pnr']:>6.3f} queries/PNR"
+        )
+    encoding = verify_encoding(args.verify)
+    print(
+        f"encoded {encoding['encoded']:,} sequence numbers: {encoding['distinct']:,} distinct,"
+        f" {encoding['valid']:,} valid, {encoding['us_per_encode']:.2f} us each"
+    )
+
+    payload = {
+        "benchmark": "pnr_allocation",
+        "database": connection.vendor,
+        "existing": total,
+        "results": results,
+        "encoding": encoding,
+    }
+    if args.out:
+        Path(args.out).write_text(json.dumps(payload, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+"""
+Run the benchmark suite and write JSON results.
+
+Examples:
+  python benchmarks/run.py --scale small --seed --out results/before.json
+  BENCH_DB=postgres BENCH_PG_NAME=wakafine_bench python benchmarks/run.py --scale medium --seed
+  python benchmarks/run.py --only seat_availability ticket_pdf
+  python benchmarks/compare.py results/before.json results/after.json
+
+The database is selected by benchmarks/settings.py (SQLite by default).
+``--seed`` recreates the schema and seeds ``--scale``; without it an
+already-seeded database is reused.
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ["DJANGO_SETTINGS_MODULE"] = os.environ.get(
+    "BENCH_SETTINGS_MODULE", "benchmarks.settings"
+)
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.core.management import call_command  # noqa: E402
+from django.db import connection  # noqa: E402
+
+from benchmarks import cases  # noqa: E402,F401  (registers the cases)
+from benchmarks.harness import REGISTRY, Context, git_revision, run_case  # noqa: E402
+from benchmarks.seed import SCALES, is_seeded, seed  # noqa: E402
+
+
+def reset_database():
+    if connection.vendor == "sqlite":
+        connection.close()
+        Path(settings.DATABASES["default"]["NAME"]).unlink(missing_ok=True)
+    else:
+        call_command("flush", interactive=False, verbosity=0)
+    call_command("migrate", interactive=False, verbosity=0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small")
+    parser.add_argument("--seed", action="store_true", help="recreate and seed the database")
+    parser.add_argument("--only", nargs="+", metavar="CASE", help="run only these cases")
+    parser.add_argument("--iterations", type=int, help="override per-case iterations")
+    parser.add_argument("--out", help="write JSON results to this file")
+    parser.add_argument("--list", action="store_true", help="list cases and exit")
+    args = parser.parse_args()
+
+    if args.list:
+        for name, case in REGISTRY.items():
+            print(f"{name:<28} {case.iterations} iterations")
+        return
+
+    dataset = None
+    if args.seed:
+        reset_database()
+        started = time.perf_counter()
+        dataset = seed(args.scale)
+        dataset["seed_seconds"] = round(time.perf_counter() - started, 1)
+    else:
+        call_command("migrate", interactive=False, verbosity=0)
+        if not is_seeded():
+            parser.error("benchmark database is empty; run with --seed first")
+
+    names = args.only or list(REGISTRY)
+    unknown = set(names) - set(REGISTRY)
+    if unknown:
+        parser.error(f"unknown cases: {', '.join(sorted(unknown))}")
+
+    context = Context(scale=args.scale)
+    results = []
+    for name in names:
+        try:
+            case = REGISTRY[name]
+            result = run_case(case, context, args.iterations)
+            rate = result.get(f"{case.unit}_per_sec")
+            print(
+                f"{name:<28} p50 {result['p50_ms']:>9.2f} ms   p95 {result['p95_ms']:>9.2f} ms"
+                f"   {result['throughput_per_sec']:>8} /s   queries {result['queries_mean']}"
+                + (f"   {rate} {case.unit}/s" if rate else "")
+            )
+        except Exception as exc:
+            result = {"name": name, "error": f"{type(exc).__name__}: {exc}"}
+            print(f"{name:<28} ERROR {result['error']}")
+        results.append(result)
+
+    payload = {
+        "suite": "wakafine",
+        "revision": git_revision(),
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "database": connection.vendor,
+        "scale": args.scale,
+        "dataset": dataset,
+        "python": platform.python_version(),
+        "django": django.get_version(),
+        "results": results,
+    }
+    if args.out:
+        Path(args.out).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.out).write_text(json.dumps(payload, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+"""
+Seed a benchmark database with realistic volumes.
+
+Everything is inserted with ``bulk_create`` in batches, bypassing the
+per-row ``save()`` work (PNR generation, QR images, bus position updates)
+that would otherwise make seeding take hours at the larger scales.
+"""
+
+import random
+from contextlib import contextmanager
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.utils import timezone
+
+from bookings.models import Booking
+from buses.models import Bus, Seat
+from gps_tracking.models import BusLocation, Driver
+from routes.models import Route
+
+User = get_user_model()
+
+SCALES = {
+    # buses, GPS fixes, bookings, customers
+    "tiny": dict(buses=20, locations=10_000, bookings=1_000, customers=100),
+    "small": dict(buses=200, locations=200_000, bookings=20_000, customers=2_000),
+    "medium": dict(buses=1_000, locations=1_000_000, bookings=100_000, customers=10_000),
+    "full": dict(buses=3_000, locations=3_000_000, bookings=300_000, customers=30_000),
+}
+
+SEATS_PER_BUS = 25
+BATCH_SIZE = 5_000
+
+# Rough bounding box of the Freetown peninsula.
+LAT_RANGE = (8.38, 8.50)
+LNG_RANGE = (-13.30, -13.10)
+
+
+@contextmanager
+def explicit_timestamps(*fields):
+    """Let bulk_create write our own values into auto_now_add fields."""
+    previous = [(field, field.auto_now_add) for field in fields]
+    for field, _ in previous:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, value in previous:
+            field.auto_now_add = value
+
+
+def _bulk(model, objects, log=None):
+    created = 0
+    for start in range(0, len(objects), BATCH_SIZE):
+        model.objects.bulk_create(objects[start:start + BATCH_SIZE])
+        created += len(objects[start:start + BATCH_SIZE])
+    if log:
+        log(f"  {model.__name__}: {created:,}")
+
+
+def _stream_bulk(model, rows, total, log=None):
+    """bulk_create from a generator without holding every row in memory."""
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= BATCH_SIZE:
+            model.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        model.objects.bulk_create(batch)
+    if log:
+        log(f"  {model.__name__}: {total:,}")
+
+
+def seed(scale="small", seed_value=42, log=print):
+    """Populate the database for ``scale`` and return a summary dict."""
+    sizes = SCALES[scale]
+    rng = random.Random(seed_value)
+    now = timezone.now()
+    log(f"Seeding '{scale}' dataset: {sizes}")
+
+    with transaction.atomic():
+        locations = [code for code, _ in Route.LOCATION_CHOICES]
+        routes = []
+        for index, (origin, destination) in enumerate(
+            (a, b) for a in locations for b in locations if a != b
+        ):
+            routes.append(
+                Route(
+                    name=f"Bench route {index}",
+                    origin=origin,
+                    destination=destination,
+                    price=Decimal(rng.choice([5, 10, 15, 20, 25])),
+                    departure_time=time(6 + index % 14, 0),
+                    arrival_time=time(7 + index % 14, 0),
+                    duration_minutes=rng.choice([30, 45, 60, 90]),
+                )
+            )
+        _bulk(Route, routes, log)
+        routes = list(Route.objects.all())
+
+        staff = User.objects.create_user(
+            "bench_admin", "bench_admin@example.com", "bench", role="admin",
+            is_staff=True, is_superuser=True,
+        )
+        customers = [
+            User(
+                username=f"bench_customer_{i}",
+                email=f"bench_customer_{i}@example.com",
+                password=staff.password,
+                role="customer",
+            )
+            for i in range(sizes["customers"])
+        ]
+        _bulk(User, customers, log)
+        customer_ids = list(
+            User.objects.filter(role="customer").values_list("id", flat=True)
+        )
+
+        buses = [
+            Bus(
+                bus_number=f"BN-{i:05d}",
+                bus_name=f"Bench Bus {i}",
+                bus_type="standard",
+                seat_capacity=SEATS_PER_BUS,
+                assigned_route=routes[i % len(routes)],
+                current_latitude=Decimal(str(round(rng.uniform(*LAT_RANGE), 6))),
+                current_longitude=Decimal(str(round(rng.uniform(*LNG_RANGE), 6))),
+                last_location_update=now,
+            )
+            for i in range(sizes["buses"])
+        ]
+        _bulk(Bus, buses, log)
+        buses = list(Bus.objects.order_by("id"))
+
+        drivers = []
+        for i, bus in enumerate(buses[: max(1, len(buses) // 10)]):
+            drivers.append(
+                User(
+                    username=f"bench_driver_{i}",
+                    email=f"bench_driver_{i}@example.com",
+                    password=staff.password,
+                    role="staff",
+                )
+            )
+        _bulk(User, drivers, log)
+        driver_users = list(User.objects.filter(username__startswith="bench_driver_"))
+        _bulk(
+            Driver,
+            [
+                Driver(
+                    user=user,
+                    license_number=f"BENCH-{user.pk}",
+                    phone_number="+23276000000",
+                    assigned_bus=bus,
+                )
+                for user, bus in zip(driver_users, buses)
+            ],
+            log,
+        )
+
+        _bulk(
+            Seat,
+            [
+                Seat(bus=bus, seat_number=str(n), is_window=n % 4 in (0, 1))
+                for bus in buses
+                for n in range(1, SEATS_PER_BUS + 1)
+            ],
+            log,
+        )
+        seats_by_bus = {}
+        for seat_id, bus_id in Seat.objects.values_list("id", "bus_id").iterator():
+            seats_by_bus.setdefault(bus_id, []).append(seat_id)
+
+    # GPS history: fixes every 30 seconds going back from now, spread over buses.
+    bus_ids = [bus.id for bus in buses]
+    per_bus = max(1, sizes["locations"] // len(bus_ids))
+
+    def location_rows():
+        for bus_id in bus_ids:
+            lat = rng.uniform(*LAT_RANGE)
+            lng = rng.uniform(*LNG_RANGE)
+            for step in range(per_bus):
+                lat += rng.uniform(-0.0005, 0.0005)
+                lng += rng.uniform(-0.0005, 0.0005)
+                speed = max(0.0, rng.gauss(28, 15))
+                yield BusLocation(
+                    bus_id=bus_id,
+                    latitude=Decimal(f"{lat:.8f}"),
+                    longitude=Decimal(f"{lng:.8f}"),
+                    speed=round(speed, 1),
+                    heading=rng.uniform(0, 360),
+                    accuracy=rng.uniform(3, 25),
+                    is_moving=speed > 1,
+                    timestamp=now - timedelta(seconds=30 * (per_bus - step)),
+                )
+
+    with explicit_timestamps(BusLocation._meta.get_field("timestamp")):
+        with transaction.atomic():
+            _stream_bulk(BusLocation, location_rows(), per_bus * len(bus_ids), log)
+
+    # Bookings: fill buses seat by seat across consecutive travel days.
+    today = timezone.localdate()
+    bus_routes = {bus.id: bus.assigned_route for bus in buses}
+    slots_per_day = len(bus_ids) * SEATS_PER_BUS
+    statuses = ["confirmed"] * 7 + ["pending"] * 2 + ["cancelled"]
+    methods = [code for code, _ in Booking.PAYMENT_METHOD_CHOICES]
+
+    def booking_rows():
+        for index in range(sizes["bookings"]):
+            day, slot = divmod(index, slots_per_day)
+            bus_id = bus_ids[slot // SEATS_PER_BUS]
+            route = bus_routes[bus_id]
+            travel_date = timezone.make_aware(
+                datetime.combine(today + timedelta(days=day - 2), route.departure_time)
+            )
+            yield Booking(
+                pnr_code=f"BN{index:08d}",
+                customer_id=customer_ids[index % len(customer_ids)],
+                route=route,
+                bus_id=bus_id,
+                seat_id=seats_by_bus[bus_id][slot % SEATS_PER_BUS],
+                travel_date=travel_date,
+                payment_method=rng.choice(methods),
+                amount_paid=route.price,
+                status=rng.choice(statuses),
+            )
+
+    with transaction.atomic():
+        _stream_bulk(Booking, booking_rows(), sizes["bookings"], log)
+
+    return {
+        "scale": scale,
+        "routes": len(routes),
+        "buses": len(bus_ids),
+        "locations": per_bus * len(bus_ids),
+        "bookings": sizes["bookings"],
+        "customers": len(customer_ids),
+    }
+
+
+def is_seeded():
+    return User.objects.filter(username="bench_admin").exists()
@@ -0,0 +1,62 @@
+"""
+Settings for the benchmark suite.
+
+Inherits the project settings and points the default database at a
+dedicated benchmark database so seeding never touches db.sqlite3:
+
+- ``BENCH_DB=sqlite`` (default): ``BENCH_SQLITE_PATH`` or
+  ``benchmarks/.data/bench.sqlite3``
+- ``BENCH_DB=postgres``: a local Postgres from ``BENCH_PG_NAME``,
+  ``BENCH_PG_USER``, ``BENCH_PG_PASSWORD``, ``BENCH_PG_HOST``, ``BENCH_PG_PORT``
+"""
+
+import os
+
+from wakafine_bus.settings import *  # noqa: F401,F403
+from wakafine_bus.settings import BASE_DIR
+from wakafine_bus.database import postgres_database
+
+BENCH_DATA_DIR = BASE_DIR / "benchmarks" / ".data"
+BENCH_DATA_DIR.mkdir(parents=True, exist_ok=True)
+
+BENCH_DB = os.environ.get("BENCH_DB", "sqlite")
+
+if BENCH_DB == "postgres":
+    DATABASES = {
+        "default": postgres_database(
+            os.environ.get("BENCH_PG_NAME", "wakafine_bench"),
+            os.environ.get("BENCH_PG_USER", "postgres"),
+            os.environ.get("BENCH_PG_PASSWORD", ""),
+            os.environ.get("BENCH_PG_HOST", "127.0.0.1"),
+            os.environ.get("BENCH_PG_PORT", "5432"),
+            sslmode=os.environ.get("BENCH_PG_SSLMODE", "disable"),
+        )
+    }
+else:
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": os.environ.get(
+                "BENCH_SQLITE_PATH", str(BENCH_DATA_DIR / "bench.sqlite3")
+            ),
+        }
+    }
+
+DEBUG = False
+ALLOWED_HOSTS = ["*"]
+
+# Generated QR codes and PDFs go to a scratch directory.
+MEDIA_ROOT = BENCH_DATA_DIR / "media"
+
+# Seeding creates thousands of users; the default hasher would dominate.
+PASSWORD_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"]
+
+# Match production sampling so its overhead is part of what we measure.
+INSTRUMENTATION_SAMPLE_RATE = float(os.environ.get("INSTRUMENTATION_SAMPLE_RATE", "0.05"))
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {"null": {"class": "logging.NullHandler"}},
+    "loggers": {"django.request": {"handlers": ["null"], "propagate": False}},
+}
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Booking
+from .models import Booking, Payment
 
 
 @admin.register(Booking)
@@ -20,3 +20,34 @@ class BookingAdmin(admin.ModelAdmin):
     readonly_fields = ("pnr_code", "qr_code", "booking_date")
     list_editable = ("status",)
     ordering = ("-booking_date",)
+
+
+@admin.register(Payment)
+class PaymentAdmin(admin.ModelAdmin):
+    list_display = (
+        "booking",
+        "method",
+        "amount",
+        "status",
+        "payer",
+        "provider_reference",
+        "attempts",
+        "created_at",
+    )
+    list_filter = ("status", "method", "created_at")
+    list_select_related = ("booking__customer",)
+    search_fields = ("booking__pnr_code", "idempotency_key", "provider_reference", "payer")
+    readonly_fields = (
+        "booking",
+        "method",
+        "amount",
+        "status",
+        "idempotency_key",
+        "payer",
+        "provider_reference",
+        "failure_reason",
+        "attempts",
+        "created_at",
+        "updated_at",
+    )
+    ordering = ("-created_at",)
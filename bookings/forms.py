@@ -1,6 +1,7 @@
 from django import forms
 from django.utils import timezone
 from .models import Booking
+from routes import fares
 from routes.models import Route
 from buses.models import Bus, Seat
 from sierra_leone_validator import SierraLeoneMobileValidator
@@ -34,6 +35,7 @@ class BookingForm(forms.ModelForm):
             "bus",
             "seat",
             "trip_type",
+            "fare_class",
             "travel_date",
             "return_date",
             "return_bus",
@@ -275,19 +277,19 @@ class BookingForm(forms.ModelForm):
         return cleaned_data
 
     def calculate_total_amount(self):
-        """Calculate total amount based on trip type and route price"""
+        """Fare for the selected route, dates, trip type and fare class"""
         route = self.cleaned_data.get("route")
-        trip_type = self.cleaned_data.get("trip_type")
 
         if not route:
             return 0
 
-        base_price = route.price
-
-        if trip_type == "round_trip":
-            return base_price * 2  # Round trip is double the price
-        else:
-            return base_price
+        return fares.quote(
+            route,
+            self.cleaned_data.get("travel_date"),
+            trip_type=self.cleaned_data.get("trip_type") or "one_way",
+            return_date=self.cleaned_data.get("return_date"),
+            fare_class=self.cleaned_data.get("fare_class") or fares.STANDARD,
+        )
 
 
 class BookingSearchForm(forms.Form):
@@ -300,3 +302,59 @@ class BookingSearchForm(forms.Form):
             }
         ),
     )
+
+
+class GroupBookingForm(forms.Form):
+    """Several one-way seats on one bus and date, for families and agents."""
+
+    INPUT_CLASS = "w-full p-3 border border-gray-300 rounded-lg focus:ring-2 focus:ring-primary focus:border-transparent transition-all duration-200"
+
+    route = forms.ModelChoiceField(queryset=Route.objects.filter(is_active=True))
+    bus = forms.ModelChoiceField(queryset=Bus.objects.filter(is_active=True))
+    travel_date = forms.DateField(widget=forms.DateInput(attrs={"type": "date"}))
+    fare_class = forms.ChoiceField(
+        choices=Booking._meta.get_field("fare_class").choices,
+        initial=fares.STANDARD,
+        required=False,
+        help_text="Passenger class every seat in the group is priced at",
+    )
+    seat_count = forms.IntegerField(
+        min_value=1,
+        required=False,
+        help_text="Number of seats; the first free seats are assigned",
+    )
+    seats = forms.CharField(
+        required=False,
+        widget=forms.HiddenInput(),
+        help_text="Comma-separated seat ids chosen on the seat map",
+    )
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        for field in self.fields.values():
+            field.widget.attrs["class"] = self.INPUT_CLASS
+        self.fields["travel_date"].widget.attrs["min"] = timezone.now().strftime(
+            "%Y-%m-%d"
+        )
+
+    def clean_seats(self):
+        seats = self.cleaned_data.get("seats") or ""
+        try:
+            return [int(value) for value in seats.split(",") if value.strip()]
+        except (TypeError, ValueError):
+            raise forms.ValidationError("Invalid seat selection.")
+
+    def clean(self):
+        cleaned_data = super().clean()
+        route = cleaned_data.get("route")
+        bus = cleaned_data.get("bus")
+        if route and bus and route != bus.assigned_route:
+            raise forms.ValidationError(
+                "The selected bus is not assigned to the selected route."
+            )
+        cleaned_data["fare_class"] = cleaned_data.get("fare_class") or fares.STANDARD
+        if not cleaned_data.get("seats") and not cleaned_data.get("seat_count"):
+            raise forms.ValidationError(
+                "Select seats on the seat map or enter the number of seats."
+            )
+        return cleaned_data
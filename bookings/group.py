@@ -0,0 +1,162 @@
+"""
+Group bookings: N seats on one bus and date in a single transaction.
+
+``Booking.save()`` is built for one passenger at a time: it inserts the row,
+then renders the QR code and saves again. Booking a school group that way
+costs several queries per seat and holds the seats one by one. Here the
+seats are checked with one query, PNRs for the whole group come from one
+allocator call (bookings/pnr.py) and the bookings are written with a single
+``bulk_create``. QR codes are rendered after the transaction commits and
+stored with one ``bulk_update``.
+"""
+
+from datetime import datetime
+from io import BytesIO
+
+from django.core.files import File
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from core import metrics
+from routes import fares
+
+from . import pnr
+from .manifests import seat_key
+from .models import Booking, PNR_INSERT_ATTEMPTS
+
+MAX_GROUP_SEATS = 60
+
+
+class GroupBookingError(Exception):
+    """The group cannot be booked as requested (seats taken, bad input...)."""
+
+
+def departure_datetime(route, travel_date):
+    """The trip's departure as an aware datetime, as BookingCreateView stores it."""
+    departure = datetime.combine(travel_date, route.departure_time)
+    if timezone.is_naive(departure):
+        departure = timezone.make_aware(departure)
+    return departure
+
+
+def taken_seat_ids(bus, departure):
+    """Seats already held on ``bus`` for the trip leaving at ``departure``."""
+    return set(
+        Booking.objects.filter(bus=bus)
+        .filter(
+            Q(travel_date__date=departure.date(), status__in=["confirmed", "pending"])
+            | Q(travel_date=departure)
+        )
+        .values_list("seat_id", flat=True)
+    )
+
+
+def choose_seats(bus, departure, seat_ids=None, count=None):
+    """
+    The seats to book: exactly ``seat_ids`` if given, otherwise the first
+    ``count`` free seats in numeric seat order, so a group sits together.
+    """
+    seats = sorted(
+        (seat for seat in bus.seats.all() if seat.is_available),
+        key=lambda seat: seat_key(seat.seat_number),
+    )
+    taken = taken_seat_ids(bus, departure)
+    if seat_ids:
+        wanted = set(seat_ids)
+        chosen = [seat for seat in seats if seat.pk in wanted]
+        if len(chosen) != len(wanted):
+            raise GroupBookingError("Some of the selected seats do not belong to this bus.")
+        unavailable = [seat.seat_number for seat in chosen if seat.pk in taken]
+        if unavailable:
+            raise GroupBookingError(
+                f"Seats already booked for this date: {', '.join(unavailable)}."
+            )
+        return chosen
+    free = [seat for seat in seats if seat.pk not in taken]
+    if len(free) < count:
+        raise GroupBookingError(
+            f"Only {len(free)} seats are free on this bus for the selected date."
+        )
+    return free[:count]
+
+
+def create_group_booking(customer, route, bus, travel_date, seat_ids=None, count=None,
+                         fare_class=fares.STANDARD):
+    """
+    Book several one-way seats on ``bus`` for ``travel_date`` (a date).
+
+    Either pass the exact ``seat_ids`` or a ``count`` of seats to pick. All
+    bookings are created pending, under ``customer``, in one transaction,
+    each priced at the ``fare_class`` fare; returns them in seat order.
+    """
+    if bus.assigned_route_id != route.pk:
+        raise GroupBookingError("The selected bus is not assigned to the selected route.")
+    if travel_date < timezone.localdate():
+        raise GroupBookingError("Travel date cannot be in the past.")
+    size = len(set(seat_ids)) if seat_ids else (count or 0)
+    if not 1 <= size <= MAX_GROUP_SEATS:
+        raise GroupBookingError(f"A group booking is for 1 to {MAX_GROUP_SEATS} seats.")
+
+    departure = departure_datetime(route, travel_date)
+    fare = fares.fare(route, departure, fare_class)
+    try:
+        with transaction.atomic():
+            # Serialises group bookings for one bus on databases with row locks.
+            type(bus).objects.select_for_update().filter(pk=bus.pk).first()
+            seats = choose_seats(bus, departure, seat_ids=seat_ids, count=size)
+            bookings = [
+                Booking(
+                    pnr_code=pnr_code,
+                    customer=customer,
+                    route=route,
+                    bus=bus,
+                    seat=seat,
+                    travel_date=departure,
+                    trip_type="one_way",
+                    fare_class=fare_class,
+                    amount_paid=fare,
+                    status="pending",
+                )
+                for pnr_code, seat in zip(pnr.allocate(len(seats)), seats)
+            ]
+            insert_bookings(bookings)
+            transaction.on_commit(lambda: generate_artefacts(bookings))
+    except IntegrityError:
+        # Another booking took one of the seats between the check and the insert.
+        raise GroupBookingError("Some of the selected seats were just booked. Please try again.")
+
+    metrics.bookings.labels(event="created").inc(len(bookings))
+    return bookings
+
+
+def insert_bookings(bookings):
+    """``bulk_create`` the bookings, swapping in fresh PNRs if any already exist."""
+    for attempt in range(PNR_INSERT_ATTEMPTS):
+        try:
+            with transaction.atomic():
+                return Booking.objects.bulk_create(bookings)
+        except IntegrityError:
+            codes = [booking.pnr_code for booking in bookings]
+            clashes = set(
+                Booking.objects.filter(pnr_code__in=codes).values_list("pnr_code", flat=True)
+            )
+            if attempt == PNR_INSERT_ATTEMPTS - 1 or not clashes:
+                raise
+            clashing = [booking for booking in bookings if booking.pnr_code in clashes]
+            for booking, pnr_code in zip(clashing, pnr.allocate(len(clashing))):
+                booking.pnr_code = pnr_code
+
+
+def generate_artefacts(bookings):
+    """Render the QR codes for freshly created bookings and store them in one UPDATE."""
+    bookings = [booking for booking in bookings if booking.pk and not booking.qr_code]
+    for booking in bookings:
+        image = booking.qr_image()
+        if image is None:
+            return
+        buffer = BytesIO()
+        image.save(buffer, format="PNG")
+        buffer.seek(0)
+        booking.qr_code.save(f"qr_{booking.pnr_code}.png", File(buffer), save=False)
+    Booking.objects.bulk_update(bookings, ["qr_code"])
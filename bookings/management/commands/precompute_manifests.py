@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from bookings.manifests import precompute_upcoming
+
+
+class Command(BaseCommand):
+    help = "Render boarding manifest PDFs for the next departures so terminals can print instantly"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--departures", type=int, default=20,
+            help="How many upcoming departures to prepare (default 20)",
+        )
+        parser.add_argument(
+            "--every", type=int, default=0, metavar="SECONDS",
+            help="Keep running and refresh every SECONDS (for a worker process or dyno)",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            started = time.perf_counter()
+            rendered, unchanged = precompute_upcoming(options["departures"])
+            elapsed = time.perf_counter() - started
+            self.stdout.write(self.style.SUCCESS(
+                f"✅ Manifests: {rendered} rendered, {unchanged} unchanged in {elapsed:.1f}s"
+            ))
+            if not options["every"]:
+                break
+            time.sleep(options["every"])
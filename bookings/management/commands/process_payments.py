@@ -0,0 +1,29 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from bookings.payments import sweep
+
+
+class Command(BaseCommand):
+    help = "Retry payments left pending (e.g. after a restart) and expire ones the provider never answered"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--stale-after", type=int, default=60, metavar="SECONDS",
+            help="Only retry payments unchanged for this long (default 60)",
+        )
+        parser.add_argument(
+            "--every", type=int, default=0, metavar="SECONDS",
+            help="Keep running and sweep every SECONDS (for a worker process or dyno)",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            retried, expired = sweep(options["stale_after"])
+            self.stdout.write(self.style.SUCCESS(
+                f"✅ Payments: {retried} retried, {expired} expired"
+            ))
+            if not options["every"]:
+                break
+            time.sleep(options["every"])
@@ -0,0 +1,73 @@
+import time
+import zipfile
+from datetime import date as date_cls
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from bookings.models import Booking
+from bookings.ticket_pdf import TICKETS_PER_FILE, render_batch, ticket_fields
+
+
+class Command(BaseCommand):
+    help = "Render ticket PDFs for many bookings at once into a zip archive"
+
+    def add_arguments(self, parser):
+        parser.add_argument("output", help="Path of the zip archive to write")
+        parser.add_argument("--bus", type=int, help="Only bookings on this bus id")
+        parser.add_argument("--date", help="Only bookings travelling on this date (YYYY-MM-DD)")
+        parser.add_argument("--pnr", nargs="+", default=[], help="Only these PNR codes")
+        parser.add_argument(
+            "--status", default="confirmed", help="Booking status to include (default confirmed)"
+        )
+        parser.add_argument(
+            "--per-file", type=int, default=TICKETS_PER_FILE,
+            help=f"Tickets per PDF in the archive; 1 gives one PDF per booking (default {TICKETS_PER_FILE})",
+        )
+        parser.add_argument(
+            "--workers", type=int, default=None,
+            help="Render processes (default: one per CPU)",
+        )
+
+    def handle(self, *args, **options):
+        bookings = Booking.objects.filter(status=options["status"]).select_related(
+            "route", "bus", "seat", "return_seat", "customer"
+        )
+        if options["bus"]:
+            bookings = bookings.filter(bus_id=options["bus"])
+        if options["date"]:
+            try:
+                travel_date = date_cls.fromisoformat(options["date"])
+            except ValueError:
+                raise CommandError("--date must be YYYY-MM-DD")
+            bookings = bookings.filter(travel_date__date=travel_date)
+        if options["pnr"]:
+            bookings = bookings.filter(pnr_code__in=[code.upper() for code in options["pnr"]])
+        if options["per_file"] < 1:
+            raise CommandError("--per-file must be at least 1")
+
+        bookings = list(bookings.order_by("travel_date", "bus_id", "seat__seat_number"))
+        if not bookings:
+            raise CommandError("No bookings match")
+
+        started = time.perf_counter()
+        tickets = [ticket_fields(booking) for booking in bookings]
+        generated = timezone.localtime().strftime("%d/%m/%Y %H:%M")
+        files = render_batch(
+            tickets, generated, per_file=options["per_file"], workers=options["workers"]
+        )
+
+        per_file = options["per_file"]
+        with zipfile.ZipFile(options["output"], "w", zipfile.ZIP_STORED) as archive:
+            for index, pdf in enumerate(files):
+                if per_file == 1:
+                    name = f"ticket_{tickets[index]['pnr_code']}.pdf"
+                else:
+                    name = f"tickets_{index + 1:03d}.pdf"
+                archive.writestr(name, pdf)
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {len(tickets)} tickets in {len(files)} PDFs written to {options['output']}"
+            f" in {elapsed:.1f}s ({len(tickets) / elapsed:.0f} pages/s)"
+        ))
@@ -0,0 +1,281 @@
+"""
+Boarding manifests: every confirmed passenger on a bus for a date.
+
+Two queries with ``select_related``, each in departure and seat order, fetch
+the outbound legs departing on the bus that day and the return legs coming
+back on it; their rows are merged as they are read. The rows are written
+either as CSV, streamed as they come from the database, or as a multi-page
+ReportLab PDF, spooled to a temporary file and streamed from there.
+
+``precompute_upcoming()`` (``manage.py precompute_manifests``) renders the
+PDFs for the next departures into media storage. The stored file name
+carries a fingerprint of every value the manifest prints (plus the latest
+payment change), read back from the database rather than from
+``updated_at``, so ``QuerySet.update()`` writes count too. The view serves
+the stored copy while nothing has changed and renders afresh after any
+booking is added, edited or cancelled.
+"""
+
+import csv
+import hashlib
+import heapq
+import tempfile
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db.models import Case, IntegerField, Max, Q, Value, When
+from django.db.models.functions import Length
+from django.utils import timezone
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfgen import canvas
+
+from core import metrics
+
+from .models import Booking
+
+STORAGE_DIR = "manifests"
+CSV_HEADER = ["Seat", "PNR", "Passenger", "Phone", "Leg", "Departure", "Route", "Trip type"]
+ROWS_PER_PAGE = 38
+SPOOL_BYTES = 2 * 1024 * 1024
+
+
+@dataclass
+class ManifestRow:
+    seat: str
+    pnr_code: str
+    passenger: str
+    phone: str
+    leg: str
+    departure: datetime
+    route: str
+    trip_type: str
+
+    def as_list(self):
+        return [
+            self.seat,
+            self.pnr_code,
+            self.passenger,
+            self.phone,
+            self.leg,
+            timezone.localtime(self.departure).strftime("%Y-%m-%d %H:%M"),
+            self.route,
+            self.trip_type,
+        ]
+
+
+# Every column the manifest shows, for fingerprint().
+FINGERPRINT_FIELDS = [
+    "pk", "pnr_code", "trip_type", "travel_date", "return_date",
+    "bus_id", "return_bus_id", "seat__seat_number", "return_seat__seat_number",
+    "route__origin", "route__destination", "mobile_money_number",
+    "customer__username", "customer__first_name", "customer__last_name",
+    "customer__phone_number",
+]
+
+
+def _legs(bus, date):
+    outbound = Q(bus=bus, travel_date__date=date)
+    inbound = Q(return_bus=bus, return_date__date=date)
+    return Booking.objects.filter(outbound | inbound, status="confirmed")
+
+
+def fingerprint(bus, date):
+    """Short hash of the manifest's contents; changes whenever any of them does."""
+    rows = (
+        _legs(bus, date)
+        .annotate(paid=Max("payments__updated_at"))
+        .order_by("pk")
+        .values_list(*FINGERPRINT_FIELDS, "paid")
+    )
+    digest = hashlib.sha1(f"{bus.pk}:{date}".encode())
+    for row in rows.iterator():
+        digest.update(repr(row).encode())
+    return digest.hexdigest()[:12]
+
+
+def _seat_order(seat):
+    """Numbered seats first, in numeric order (for seat numbers without leading zeros)."""
+    numbered = Case(
+        When(**{f"{seat}__seat_number__regex": r"^[0-9]+$"}, then=Value(0)),
+        default=Value(1),
+        output_field=IntegerField(),
+    )
+    return [numbered, Length(f"{seat}__seat_number"), f"{seat}__seat_number"]
+
+
+def _leg_rows(bookings, leg, seat_field, departure_field):
+    for booking in bookings.iterator(chunk_size=500):
+        seat = getattr(booking, seat_field)
+        yield ManifestRow(
+            seat=seat.seat_number if seat else "-",
+            pnr_code=booking.pnr_code,
+            passenger=booking.customer.get_full_name() or booking.customer.username,
+            phone=booking.customer.phone_number or booking.mobile_money_number or "",
+            leg=leg,
+            departure=getattr(booking, departure_field),
+            route=str(booking.route),
+            trip_type=booking.get_trip_type_display(),
+        )
+
+
+def manifest_rows(bus, date):
+    """Yield the bus's passengers for ``date`` in departure and seat order."""
+    confirmed = Booking.objects.filter(status="confirmed").select_related(
+        "customer", "seat", "return_seat", "route"
+    )
+    outbound = confirmed.filter(bus=bus, travel_date__date=date).order_by(
+        "travel_date", *_seat_order("seat")
+    )
+    inbound = confirmed.filter(return_bus=bus, return_date__date=date).order_by(
+        "return_date", *_seat_order("return_seat")
+    )
+    return heapq.merge(
+        _leg_rows(outbound, "Outbound", "seat", "travel_date"),
+        _leg_rows(inbound, "Return", "return_seat", "return_date"),
+        key=lambda row: (row.departure, seat_key(row.seat)),
+    )
+
+
+def seat_key(seat):
+    """Sort key for a seat number, matching ``_seat_order``: 2 before 10, numbers before "A1"."""
+    return (0, int(seat), "") if seat.isdigit() else (1, 0, seat)
+
+
+class _Echo:
+    """File-like object whose write() returns the line, for streaming csv.writer."""
+
+    def write(self, value):
+        return value
+
+
+def iter_csv(rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(CSV_HEADER)
+    for row in rows:
+        yield writer.writerow(row.as_list())
+
+
+@metrics.timed(metrics.pdf_render_seconds, document="manifest")
+def write_pdf(output, bus, date, rows):
+    """Draw the manifest onto ``output``, repeating the header on every page."""
+    pdf = canvas.Canvas(output, pagesize=A4, pageCompression=1)
+    width, height = A4
+    columns = [(40, "Seat"), (80, "PNR"), (160, "Passenger"), (310, "Phone"), (400, "Leg"), (460, "Departs")]
+    pages = max(1, -(-len(rows) // ROWS_PER_PAGE))
+    generated = timezone.localtime().strftime("%Y-%m-%d %H:%M")
+
+    for page in range(pages):
+        pdf.setFont("Helvetica-Bold", 14)
+        pdf.drawString(40, height - 50, f"Boarding manifest - {bus.bus_name} ({bus.bus_number})")
+        pdf.setFont("Helvetica", 9)
+        pdf.drawString(40, height - 66, f"{date:%A %d %B %Y}   {len(rows)} passengers")
+        pdf.drawRightString(width - 40, height - 66, f"Page {page + 1} of {pages}   generated {generated}")
+
+        y = height - 95
+        pdf.setFillColor(colors.HexColor("#1e3a8a"))
+        pdf.rect(35, y - 4, width - 70, 16, stroke=0, fill=1)
+        pdf.setFillColor(colors.white)
+        pdf.setFont("Helvetica-Bold", 9)
+        for x, title in columns:
+            pdf.drawString(x, y, title)
+        pdf.setFillColor(colors.black)
+        pdf.setFont("Helvetica", 9)
+
+        for index, row in enumerate(rows[page * ROWS_PER_PAGE:(page + 1) * ROWS_PER_PAGE]):
+            y -= 18
+            if index % 2:
+                pdf.setFillColor(colors.HexColor("#f3f4f6"))
+                pdf.rect(35, y - 5, width - 70, 18, stroke=0, fill=1)
+                pdf.setFillColor(colors.black)
+            values = [
+                row.seat,
+                row.pnr_code,
+                row.passenger[:28],
+                row.phone,
+                row.leg,
+                timezone.localtime(row.departure).strftime("%H:%M"),
+            ]
+            for (x, _), value in zip(columns, values):
+                pdf.drawString(x, y, value)
+        if not rows:
+            pdf.drawString(40, y - 18, "No confirmed passengers.")
+        pdf.showPage()
+    pdf.save()
+
+
+def render_pdf(bus, date):
+    """The manifest PDF in a spooled temporary file, rewound for reading."""
+    rows = list(manifest_rows(bus, date))  # the header needs the passenger count
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_BYTES)
+    write_pdf(spool, bus, date, rows)
+    spool.seek(0)
+    return spool
+
+
+def storage_name(bus, date, print_hash):
+    return f"{STORAGE_DIR}/{bus.pk}/{date:%Y-%m-%d}-{print_hash}.pdf"
+
+
+def stored_pdf(bus, date):
+    """The precomputed PDF if it is still current, else None."""
+    name = storage_name(bus, date, fingerprint(bus, date))
+    if default_storage.exists(name):
+        metrics.record_cache("manifest_pdf", True)
+        return default_storage.open(name, "rb")
+    metrics.record_cache("manifest_pdf", False)
+    return None
+
+
+def store_pdf(bus, date):
+    """Render and store the manifest, removing older versions for the same day."""
+    print_hash = fingerprint(bus, date)
+    name = storage_name(bus, date, print_hash)
+    if default_storage.exists(name):
+        return name, False
+    folder = f"{STORAGE_DIR}/{bus.pk}"
+    if default_storage.exists(folder):
+        _, files = default_storage.listdir(folder)
+        for stale in files:
+            if stale.startswith(f"{date:%Y-%m-%d}-"):
+                default_storage.delete(f"{folder}/{stale}")
+    with render_pdf(bus, date) as spool:
+        default_storage.save(name, File(spool))
+    return name, True
+
+
+def upcoming_departures(count, now=None):
+    """The next ``count`` (bus, date) departures of active buses on active routes."""
+    from buses.models import Bus
+
+    now = timezone.localtime(now or timezone.now())
+    buses = list(
+        Bus.objects.filter(is_active=True, assigned_route__is_active=True)
+        .select_related("assigned_route")
+    )
+    departures = []
+    day = now.date()
+    while len(departures) < count and buses and day <= now.date() + timedelta(days=7):
+        todays = []
+        for bus in buses:
+            leaves = timezone.make_aware(datetime.combine(day, bus.assigned_route.departure_time))
+            if leaves >= now:
+                todays.append((leaves, bus))
+        todays.sort(key=lambda item: item[0])
+        departures.extend((bus, day) for _, bus in todays)
+        day += timedelta(days=1)
+    return departures[:count]
+
+
+def precompute_upcoming(count):
+    """Store manifests for the next ``count`` departures; returns (rendered, unchanged)."""
+    rendered = unchanged = 0
+    for bus, date in upcoming_departures(count):
+        _, fresh = store_pdf(bus, date)
+        if fresh:
+            rendered += 1
+        else:
+            unchanged += 1
+    return rendered, unchanged
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.1 on 2026-10-19 12:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0004_booking_return_bus_booking_return_seat'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PnrSequence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('next_value', models.BigIntegerField(default=0)),
+            ],
+        ),
+    ]
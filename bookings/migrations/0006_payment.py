@@ -0,0 +1,36 @@
+# Generated by Django 5.2.1 on 2026-10-19 12:58
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0005_pnrsequence'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Payment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('method', models.CharField(choices=[('afrimoney', 'Afrimoney'), ('qmoney', 'Qmoney'), ('orange_money', 'Orange Money'), ('paypal', 'PayPal')], max_length=20)),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('status', models.CharField(choices=[('initiated', 'Initiated'), ('authorised', 'Authorised'), ('captured', 'Captured'), ('failed', 'Failed')], default='initiated', max_length=20)),
+                ('idempotency_key', models.CharField(help_text='Client-supplied key; a repeated submission reuses the payment', max_length=64, unique=True)),
+                ('payer', models.CharField(blank=True, help_text='Mobile money number or masked card', max_length=30)),
+                ('provider_reference', models.CharField(blank=True, max_length=64)),
+                ('failure_reason', models.CharField(blank=True, max_length=200)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('booking', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='payments', to='bookings.booking')),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status', 'updated_at'], name='bookings_pa_status_de2c51_idx')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('status', 'captured')), fields=('booking',), name='one_captured_payment_per_booking')],
+            },
+        ),
+    ]
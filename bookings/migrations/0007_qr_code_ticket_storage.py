@@ -0,0 +1,19 @@
+# Generated by Django 5.2.1 on 2026-10-19 13:11
+
+import core.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0006_payment'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='booking',
+            name='qr_code',
+            field=models.ImageField(blank=True, null=True, storage=core.storage.ticket_storage, upload_to='qr_codes/'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-19 13:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0007_qr_code_ticket_storage'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='booking',
+            name='fare_class',
+            field=models.CharField(choices=[('standard', 'Standard'), ('student', 'Student')], default='standard', help_text='Passenger class the fare is quoted for', max_length=20),
+        ),
+    ]
@@ -4,12 +4,29 @@ from django.utils import timezone
 import logging
 from io import BytesIO
 from django.core.files import File
-import uuid
-import string
-import random
+from django.db import IntegrityError, transaction
+
+from core import metrics
+from core.storage import ticket_storage
+from routes.models import FareTable
+
+from . import pnr, tracking
+from .ticket_token import issue as issue_ticket_token
 
 User = get_user_model()
 
+PNR_INSERT_ATTEMPTS = 3
+
+
+class PnrSequence(models.Model):
+    """Next unallocated PNR sequence number (see bookings/pnr.py)"""
+
+    name = models.CharField(max_length=50, unique=True)
+    next_value = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.name}: {self.next_value}"
+
 
 class Booking(models.Model):
     PAYMENT_METHOD_CHOICES = [
@@ -46,6 +63,12 @@ class Booking(models.Model):
     return_date = models.DateTimeField(
         blank=True, null=True, help_text="Required for round trip bookings"
     )
+    fare_class = models.CharField(
+        max_length=20,
+        choices=FareTable.FARE_CLASS_CHOICES,
+        default="standard",
+        help_text="Passenger class the fare is quoted for",
+    )
 
     # Return Journey Details (for round trips)
     return_bus = models.ForeignKey(
@@ -96,7 +119,9 @@ class Booking(models.Model):
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="pending")
 
     # QR Code
-    qr_code = models.ImageField(upload_to="qr_codes/", blank=True, null=True)
+    qr_code = models.ImageField(
+        upload_to="qr_codes/", storage=ticket_storage, blank=True, null=True
+    )
 
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
@@ -105,65 +130,52 @@ class Booking(models.Model):
     class Meta:
         unique_together = ["bus", "seat", "travel_date"]
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored status so save() can count transitions.
+        instance._saved_status = instance.__dict__.get("status")
+        return instance
+
     def save(self, *args, **kwargs):
         if not self.pnr_code:
             self.pnr_code = self.generate_pnr()
-        super().save(*args, **kwargs)
+        adding = self._state.adding
+        if adding:
+            self._insert_with_retry(*args, **kwargs)
+        else:
+            super().save(*args, **kwargs)
+        self._record_status_metrics(adding)
+        tracking.invalidate(self.pnr_code)
         if not self.qr_code:
             self.generate_qr_code()
 
+    def _record_status_metrics(self, adding):
+        if adding:
+            metrics.bookings.labels(event="created").inc()
+        previous = getattr(self, "_saved_status", None)
+        if self.status != previous and self.status in ("confirmed", "cancelled"):
+            metrics.bookings.labels(event=self.status).inc()
+        self._saved_status = self.status
+
+    def _insert_with_retry(self, *args, **kwargs):
+        """Insert, taking a fresh PNR if the unique constraint reports a clash"""
+        for attempt in range(PNR_INSERT_ATTEMPTS):
+            try:
+                with transaction.atomic():
+                    return super().save(*args, **kwargs)
+            except IntegrityError:
+                last_attempt = attempt == PNR_INSERT_ATTEMPTS - 1
+                if last_attempt or not Booking.objects.filter(pnr_code=self.pnr_code).exists():
+                    raise
+                self.pnr_code = self.generate_pnr()
+
     def generate_pnr(self):
         """Generate a unique PNR code"""
-        while True:
-            pnr = "".join(random.choices(string.ascii_uppercase + string.digits, k=8))
-            if not Booking.objects.filter(pnr_code=pnr).exists():
-                return pnr
-
-    def generate_qr_code(self):
-        """Generate QR code for the booking with destination and terminal info"""
-        # Get terminal information
-        origin_terminal = "N/A"
-        destination_terminal = "N/A"
-
-        if hasattr(self.route, "origin_terminal") and self.route.origin_terminal:
-            origin_terminal = self.route.origin_terminal.name
-        if (
-            hasattr(self.route, "destination_terminal")
-            and self.route.destination_terminal
-        ):
-            destination_terminal = self.route.destination_terminal.name
-
-        qr_data = {
-            "pnr": self.pnr_code,
-            "route": str(self.route),
-            "origin_terminal": origin_terminal,
-            "destination_terminal": destination_terminal,
-            "bus": (
-                self.bus.bus_name if hasattr(self.bus, "bus_name") else str(self.bus)
-            ),
-            "seat": (
-                self.seat.seat_number
-                if hasattr(self.seat, "seat_number")
-                else str(self.seat)
-            ),
-            "date": self.travel_date.strftime("%Y-%m-%d %H:%M"),
-            "passenger": self.customer.get_full_name() or self.customer.username,
-            "destination": self.route.get_destination_display(),
-        }
-
-        qr_string = (
-            f"WAKA-FINE BUS TICKET\\n"
-            f"PNR: {qr_data['pnr']}\\n"
-            f"Route: {qr_data['route']}\\n"
-            f"From: {qr_data['origin_terminal']}\\n"
-            f"To: {qr_data['destination_terminal']}\\n"
-            f"Destination: {qr_data['destination']}\\n"
-            f"Bus: {qr_data['bus']}\\n"
-            f"Seat: {qr_data['seat']}\\n"
-            f"Date: {qr_data['date']}\\n"
-            f"Passenger: {qr_data['passenger']}"
-        )
+        return pnr.allocate()[0]
 
+    def qr_image(self):
+        """QR code image holding the booking's signed ticket token"""
         # Import qrcode lazily and handle missing dependency gracefully so
         # application startup doesn't fail if the package isn't available
         try:
@@ -171,13 +183,19 @@ class Booking(models.Model):
         except Exception:
             logger = logging.getLogger(__name__)
             logger.warning("qrcode package not installed; skipping QR generation")
-            return
+            return None
 
         qr = qrcode.QRCode(version=1, box_size=10, border=5)
-        qr.add_data(qr_string)
+        qr.add_data(self.ticket_token)
         qr.make(fit=True)
 
-        qr_image = qr.make_image(fill_color="black", back_color="white")
+        return qr.make_image(fill_color="black", back_color="white")
+
+    def generate_qr_code(self):
+        """Generate and store the QR code image for the booking"""
+        qr_image = self.qr_image()
+        if qr_image is None:
+            return
         buffer = BytesIO()
         qr_image.save(buffer, format="PNG")
         buffer.seek(0)
@@ -189,6 +207,11 @@ class Booking(models.Model):
     def __str__(self):
         return f"PNR: {self.pnr_code} - {self.customer.username}"
 
+    @property
+    def ticket_token(self):
+        """Signed compact payload for the ticket QR code (see bookings/ticket_verify.py)"""
+        return issue_ticket_token(self)
+
     @property
     def is_round_trip(self):
         """Check if this booking is a round trip"""
@@ -197,3 +220,57 @@ class Booking(models.Model):
     @property
     def is_past_travel_date(self):
         return timezone.now() > self.travel_date
+
+
+class Payment(models.Model):
+    """One attempt to pay for a booking (see bookings/payments.py for the pipeline)"""
+
+    STATUS_CHOICES = [
+        ("initiated", "Initiated"),
+        ("authorised", "Authorised"),
+        ("captured", "Captured"),
+        ("failed", "Failed"),
+    ]
+
+    # Allowed moves of the payment state machine
+    TRANSITIONS = {
+        "initiated": ("authorised", "failed"),
+        "authorised": ("captured", "failed"),
+        "captured": (),
+        "failed": (),
+    }
+
+    booking = models.ForeignKey(Booking, on_delete=models.CASCADE, related_name="payments")
+    method = models.CharField(max_length=20, choices=Booking.PAYMENT_METHOD_CHOICES)
+    amount = models.DecimalField(max_digits=10, decimal_places=2)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="initiated")
+    idempotency_key = models.CharField(
+        max_length=64, unique=True, help_text="Client-supplied key; a repeated submission reuses the payment"
+    )
+    payer = models.CharField(
+        max_length=30, blank=True, help_text="Mobile money number or masked card"
+    )
+    provider_reference = models.CharField(max_length=64, blank=True)
+    failure_reason = models.CharField(max_length=200, blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [models.Index(fields=["status", "updated_at"])]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["booking"],
+                condition=models.Q(status="captured"),
+                name="one_captured_payment_per_booking",
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.get_method_display()} {self.amount} for {self.booking.pnr_code} ({self.status})"
+
+    @property
+    def is_pending(self):
+        return self.status in ("initiated", "authorised")
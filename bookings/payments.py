@@ -0,0 +1,266 @@
+"""
+Payment pipeline: idempotent submission and asynchronous provider confirmation.
+
+Each payment moves through a small state machine::
+
+    initiated -> authorised -> captured
+        |             |
+        +-------------+-------> failed
+
+``start_payment()`` runs in the web request. It records a ``Payment`` under
+the client's idempotency key and queues it, but never calls the provider, so
+a double-submitted form or a retried request on a flaky network finds the
+payment it already made. ``process()`` then runs on a background thread.
+It authorises and captures with the provider and confirms the booking in
+the same transaction as the capture.
+
+Every step is a conditional UPDATE from the state the caller saw, so if two
+workers process one payment (a retry racing the original, or the sweep
+racing the thread) only one of them moves it. Providers get our idempotency
+key, so a repeated authorise does not charge twice.
+
+The providers here are local mocks that wait ``PAYMENT_MOCK_LATENCY``
+seconds per call. They decline mobile numbers ending in 0000 and cards with
+CVC 000, to exercise the failure path. A payment left pending by a
+restart, or by a host that freezes background threads once the response is
+sent (Vercel), is retried with ``retry()`` by the status page the customer
+is waiting on, and by ``manage.py process_payments`` where that runs.
+"""
+
+import hashlib
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from core import metrics
+
+from .models import Booking, Payment
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = 5
+STALLED_REASON = "The payment provider did not respond."
+
+
+class PaymentError(Exception):
+    """A payment could not be started."""
+
+
+class PaymentDeclined(Exception):
+    """The provider refused the payment."""
+
+
+class InvalidTransition(Exception):
+    """The state machine does not allow the requested move."""
+
+
+class MockProvider:
+    """Stands in for a provider API: fixed latency, deterministic references."""
+
+    def __init__(self, name, reference_prefix):
+        self.name = name
+        self.reference_prefix = reference_prefix
+
+    def _wait(self):
+        time.sleep(getattr(settings, "PAYMENT_MOCK_LATENCY", 1.0))
+
+    def authorise(self, payment):
+        """Reserve the funds; returns the provider's reference."""
+        self._wait()
+        if payment.method == "paypal":
+            if payment.booking.card_cvc == "000":
+                raise PaymentDeclined("The card was declined.")
+        elif payment.payer.endswith("0000"):
+            raise PaymentDeclined(f"{self.name} declined the payment: insufficient balance.")
+        digest = hashlib.sha1(payment.idempotency_key.encode()).hexdigest()[:10].upper()
+        return f"{self.reference_prefix}-{digest}"
+
+    def capture(self, payment):
+        self._wait()
+
+
+PROVIDERS = {
+    "afrimoney": MockProvider("Afrimoney", "AFM"),
+    "orange_money": MockProvider("Orange Money", "OM"),
+    "qmoney": MockProvider("Qmoney", "QM"),
+    "paypal": MockProvider("PayPal", "PP"),
+}
+
+
+def advance(payment, status, **changes):
+    """Move ``payment`` to ``status`` unless another worker moved it first.
+
+    Returns True if this call made the move.
+    """
+    if status not in Payment.TRANSITIONS[payment.status]:
+        raise InvalidTransition(f"{payment.status} -> {status}")
+    changes.update(status=status, updated_at=timezone.now())
+    moved = Payment.objects.filter(pk=payment.pk, status=payment.status).update(**changes)
+    if moved:
+        for field, value in changes.items():
+            setattr(payment, field, value)
+        metrics.payments.labels(method=payment.method, status=status).inc()
+    return bool(moved)
+
+
+def start_payment(booking, method, idempotency_key, payer="", booking_changes=None):
+    """The booking's payment for ``idempotency_key``, created and queued if new.
+
+    Returns ``(payment, created)``. A booking with a payment still pending
+    or already captured gets that payment back rather than a second one.
+    ``booking_changes`` (payment details for the booking) are saved only
+    with a new payment.
+    """
+    if method not in PROVIDERS:
+        raise PaymentError("Invalid payment method selected.")
+    with transaction.atomic():
+        existing = Payment.objects.filter(idempotency_key=idempotency_key).first()
+        if existing is None:
+            existing = booking.payments.exclude(status="failed").first()
+        if existing is not None:
+            if existing.booking_id != booking.pk:
+                raise PaymentError("This payment request belongs to another booking.")
+            return existing, False
+        try:
+            with transaction.atomic():
+                payment = Payment.objects.create(
+                    booking=booking,
+                    method=method,
+                    amount=booking.amount_paid,
+                    idempotency_key=idempotency_key,
+                    payer=payer,
+                )
+        except IntegrityError:
+            # A concurrent submission with the same key won the insert.
+            payment = Payment.objects.get(idempotency_key=idempotency_key)
+            if payment.booking_id != booking.pk:
+                raise PaymentError("This payment request belongs to another booking.")
+            return payment, False
+
+        if booking_changes:
+            for field, value in booking_changes.items():
+                setattr(booking, field, value)
+            booking.payment_method = method
+            booking.save(update_fields=[*booking_changes, "payment_method", "updated_at"])
+        metrics.payments.labels(method=method, status="initiated").inc()
+        transaction.on_commit(lambda: enqueue(payment.pk))
+    return payment, True
+
+
+def process(payment_id):
+    """Authorise and capture one payment; safe to call again at any point."""
+    payment = Payment.objects.select_related("booking").get(pk=payment_id)
+    if not payment.is_pending:
+        return payment
+    Payment.objects.filter(pk=payment.pk).update(attempts=F("attempts") + 1)
+    provider = PROVIDERS[payment.method]
+    try:
+        if payment.status == "initiated":
+            reference = provider.authorise(payment)
+            if not advance(payment, "authorised", provider_reference=reference):
+                return payment
+        provider.capture(payment)
+        capture(payment)
+    except PaymentDeclined as exc:
+        advance(payment, "failed", failure_reason=str(exc)[:200])
+    return payment
+
+
+def capture(payment):
+    """Mark ``payment`` captured and confirm its booking, atomically."""
+    with transaction.atomic():
+        if not advance(payment, "captured"):
+            return False
+        booking = Booking.objects.select_for_update().get(pk=payment.booking_id)
+        booking.status = "confirmed"
+        booking.payment_method = payment.method
+        booking.save()
+    return True
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _run(payment_id):
+    close_old_connections()
+    try:
+        process(payment_id)
+    except Exception:
+        # Left pending; the process_payments sweep retries it.
+        logger.exception("Processing payment %s failed", payment_id)
+    finally:
+        close_old_connections()
+
+
+def enqueue(payment_id):
+    """Process the payment on the background pool, or inline if PAYMENT_ASYNC is off."""
+    global _executor
+    if not getattr(settings, "PAYMENT_ASYNC", True):
+        _run(payment_id)
+        return
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, "PAYMENT_WORKERS", 4),
+                thread_name_prefix="payments",
+            )
+    _executor.submit(_run, payment_id)
+
+
+def retry(payment):
+    """Process a stalled ``payment`` inline, or fail it after MAX_ATTEMPTS.
+
+    Returns True if it was retried, False if it was failed.
+    """
+    if payment.attempts >= MAX_ATTEMPTS:
+        advance(payment, "failed", failure_reason=STALLED_REASON)
+        return False
+    _run(payment.pk)
+    return True
+
+
+def give_up(payment):
+    """Fail ``payment`` if it is still pending; True if this call failed it."""
+    return payment.is_pending and advance(payment, "failed", failure_reason=STALLED_REASON)
+
+
+def sweep(stale_after=60):
+    """Retry payments pending for over ``stale_after`` seconds; returns (retried, expired)."""
+    cutoff = timezone.now() - timedelta(seconds=stale_after)
+    retried = expired = 0
+    stale = Payment.objects.filter(
+        status__in=("initiated", "authorised"), updated_at__lt=cutoff
+    ).select_related("booking")
+    for payment in stale:
+        if retry(payment):
+            retried += 1
+        else:
+            expired += 1
+    return retried, expired
+
+
+def success_message(payment):
+    """The confirmation shown to the customer once ``payment`` is captured."""
+    booking = payment.booking
+    if booking.trip_type == "round_trip" and booking.return_date:
+        trip_info = f" (Round trip - return on {booking.return_date.strftime('%B %d, %Y')})"
+    else:
+        trip_info = " (One way trip)"
+    if payment.method == "paypal":
+        return (
+            f"Payment successful via PayPal! Your booking is confirmed{trip_info}. "
+            f"PayPal transaction ID: {payment.provider_reference}. "
+            "You will receive a PayPal receipt at your registered email."
+        )
+    return (
+        f"Payment successful via {payment.get_method_display()}! Your booking is "
+        f"confirmed{trip_info}. Payment will be processed to {payment.payer}."
+    )
@@ -0,0 +1,152 @@
+"""
+Collision-free PNR allocation.
+
+A PNR is a number from a database sequence, scrambled and written in base 36
+with a check character:
+
+* Numbers are handed out in blocks (``PNR_BLOCK_SIZE``, default 100) from the
+  ``PnrSequence`` row, so a process touches the database once per block
+  rather than once per booking, and never hands out the same number twice.
+* ``scramble`` is a bijection on the 7-character space (an affine map modulo
+  36**7), so consecutive bookings do not get guessable consecutive codes and
+  distinct numbers always give distinct codes.
+* The 8th character is a Luhn mod 36 check character. It catches any single
+  mistyped character and most swapped neighbours, so ``is_valid`` can reject
+  typos before a lookup.
+
+Codes from the old random generator share the same alphabet and length, so
+each new block is checked against existing PNRs with one ``IN`` query and any
+clashes are skipped. A block is claimed in its own committed statement: a
+caller inside a transaction (a group booking, say) claims it on a separate
+autocommit connection, so the sequence row is never locked for the length of
+the caller's transaction and a rollback there cannot hand the same numbers to
+another process. SQLite, which serialises writers across the whole database
+and is only used for local development, claims on the caller's connection;
+``Booking.save`` still retries the insert on a unique violation for that case.
+"""
+
+import threading
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connection, connections
+
+ALPHABET = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+BASE = len(ALPHABET)
+BODY_LENGTH = 7
+SPACE = BASE ** BODY_LENGTH  # ~78 billion codes
+MULTIPLIER = 48_271_393  # odd and not a multiple of 3, i.e. coprime with 36**7
+OFFSET = 20_938_114_417
+SEQUENCE_NAME = "booking"
+
+_VALUES = {char: value for value, char in enumerate(ALPHABET)}
+
+
+def scramble(number):
+    return (number * MULTIPLIER + OFFSET) % SPACE
+
+
+def check_character(body):
+    """Luhn mod 36 check character for ``body``."""
+    total = 0
+    factor = 2
+    for char in reversed(body):
+        addend = factor * _VALUES[char]
+        total += addend // BASE + addend % BASE
+        factor = 3 - factor
+    return ALPHABET[-total % BASE]
+
+
+def encode(number):
+    """The PNR for sequence number ``number``."""
+    value = scramble(number)
+    body = []
+    for _ in range(BODY_LENGTH):
+        value, digit = divmod(value, BASE)
+        body.append(ALPHABET[digit])
+    body = "".join(reversed(body))
+    return body + check_character(body)
+
+
+def is_valid(code):
+    """True if ``code`` is a well-formed allocator PNR (legacy PNRs may not be)."""
+    code = (code or "").upper()
+    if len(code) != BODY_LENGTH + 1 or any(char not in _VALUES for char in code):
+        return False
+    return check_character(code[:-1]) == code[-1]
+
+
+def reserve_block(size):
+    """Claim ``size`` consecutive sequence numbers; returns the first one.
+
+    The claim is committed before this returns, whatever transaction the
+    caller is in (see the module docstring).
+    """
+    if connection.in_atomic_block and connection.vendor != "sqlite":
+        own_connection = connections.create_connection(DEFAULT_DB_ALIAS)
+        try:
+            return _advance_sequence(own_connection, size)
+        finally:
+            own_connection.close()
+    return _advance_sequence(connection, size)
+
+
+def _advance_sequence(db, size):
+    """Advance the sequence row by ``size`` in single statements on ``db``."""
+    from .models import PnrSequence
+
+    table = db.ops.quote_name(PnrSequence._meta.db_table)
+    with db.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {table} (name, next_value) VALUES (%s, 0) "
+            f"ON CONFLICT (name) DO NOTHING",
+            [SEQUENCE_NAME],
+        )
+        # One UPDATE takes the row lock, advances and reads back, then commits.
+        cursor.execute(
+            f"UPDATE {table} SET next_value = next_value + %s "
+            f"WHERE name = %s RETURNING next_value",
+            [size, SEQUENCE_NAME],
+        )
+        (next_value,) = cursor.fetchone()
+    return next_value - size
+
+
+class PnrAllocator:
+    """Per-process cache of reserved PNRs, refilled a block at a time."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._codes = []
+
+    @property
+    def block_size(self):
+        return getattr(settings, "PNR_BLOCK_SIZE", 100)
+
+    def allocate(self, count=1):
+        """``count`` PNRs that no booking uses and no other caller will get."""
+        with self._lock:
+            while len(self._codes) < count:
+                self._codes.extend(self._fresh_block(max(self.block_size, count - len(self._codes))))
+            codes, self._codes = self._codes[:count], self._codes[count:]
+        return codes
+
+    def reset(self):
+        with self._lock:
+            self._codes = []
+
+    def _fresh_block(self, size):
+        from .models import Booking
+
+        start = reserve_block(size)
+        codes = [encode(number) for number in range(start, start + size)]
+        legacy = set(
+            Booking.objects.filter(pnr_code__in=codes).values_list("pnr_code", flat=True)
+        )
+        return [code for code in codes if code not in legacy]
+
+
+allocator = PnrAllocator()
+
+
+def allocate(count=1):
+    return allocator.allocate(count)
@@ -0,0 +1,246 @@
+"""
+Ticket PDF rendering, one ticket or thousands.
+
+Everything that is the same on every ticket (header and footer bands, boxes,
+labels, rules) is drawn once per document into a ReportLab Form XObject and
+placed on each page with ``doForm``; a page then only adds the booking's own
+text and its QR code, drawn as vector rectangles rather than an embedded
+PNG. A multi-page document therefore stores the layout once.
+
+Rendering works on plain dicts from ``ticket_fields()`` and needs only
+ReportLab and qrcode, not Django, so ``render_batch()`` can hand chunks of
+tickets to a process pool: bulk reprints (``manage.py reprint_tickets``),
+per-booking email attachments (``per_file=1``) and the single-ticket
+download all go through the same code.
+"""
+
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+import qrcode
+from reportlab.lib import colors
+from reportlab.lib.colors import HexColor
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfgen import canvas
+
+GREEN = HexColor("#10b981")
+BLUE = HexColor("#3b82f6")
+GRAY_BG = HexColor("#f9fafb")
+DARK_TEXT = HexColor("#1f2937")
+MEDIUM_TEXT = HexColor("#6b7280")
+
+WIDTH, HEIGHT = A4
+LAYOUT_FORM = "ticket_layout"
+TICKETS_PER_FILE = 200
+
+# Fixed positions shared by the static layout and the per-booking fields.
+TOP = HEIGHT - 60
+ROUTE_Y = TOP - 80
+DETAILS_Y = ROUTE_Y - 50
+BOX_WIDTH = (WIDTH - 120) / 2
+BOX_HEIGHT = 30
+DETAILS_Y2 = DETAILS_Y - 40
+PASSENGER_Y = DETAILS_Y2 - 60
+PAYMENT_Y = PASSENGER_Y - 90
+QR_Y = PAYMENT_Y - 105
+QR_SIZE = 80
+QR_BORDER = 2
+QR_MASK = 4
+FOOTER_Y = QR_Y - 160
+
+
+def ticket_fields(booking):
+    """The values printed on ``booking``'s ticket, as a picklable dict.
+
+    Expects ``route``, ``bus``, ``seat``, ``return_seat`` and ``customer``
+    to be loaded (``select_related``) when called for many bookings.
+    """
+    customer = booking.customer
+    seat = booking.seat.seat_number if booking.seat else "Not assigned"
+    if booking.trip_type == "round_trip" and booking.return_seat:
+        seat = f"{seat} (return {booking.return_seat.seat_number})"
+    return {
+        "pnr_code": booking.pnr_code,
+        "origin": booking.route.origin,
+        "destination": booking.route.destination,
+        "departs": booking.route.departure_time.strftime("%H:%M"),
+        "arrives": booking.route.arrival_time.strftime("%H:%M"),
+        "date": booking.travel_date.strftime("%b %d, %Y"),
+        "bus": booking.bus.bus_name,
+        "seat": seat,
+        "amount": f"Le {booking.amount_paid:.0f}",
+        "passenger": customer.get_full_name() or customer.username,
+        "email": customer.email,
+        "payment_method": booking.get_payment_method_display(),
+        "mobile": booking.mobile_money_number or "",
+        "token": booking.ticket_token,
+    }
+
+
+def _box(pdf, x, y, label):
+    pdf.setFillColor(GRAY_BG)
+    pdf.rect(x, y - BOX_HEIGHT, BOX_WIDTH - 10, BOX_HEIGHT, fill=1, stroke=0)
+    pdf.setFillColor(MEDIUM_TEXT)
+    pdf.setFont("Helvetica", 8)
+    pdf.drawString(x + 10, y - 10, label)
+
+
+def _rule(pdf, y):
+    pdf.setStrokeColor(colors.lightgrey)
+    pdf.line(60, y, WIDTH - 60, y)
+
+
+def draw_layout(pdf):
+    """Draw the parts of the ticket that do not depend on the booking."""
+    pdf.setFillColor(GREEN)
+    pdf.rect(40, TOP - 40, WIDTH - 80, 60, fill=1, stroke=0)
+    pdf.setFillColor(colors.white)
+    pdf.setFont("Helvetica-Bold", 18)
+    pdf.drawString(60, TOP - 15, "Digital Ticket")
+    pdf.setFont("Helvetica", 12)
+    pdf.drawString(60, TOP - 30, "Waka-Fine Bus")
+    pdf.setFont("Helvetica", 10)
+    pdf.drawString(WIDTH - 160, TOP - 15, "PNR")
+
+    # Dashed line between origin and destination, with a dot for the bus
+    pdf.setDash(3, 3)
+    pdf.setStrokeColor(MEDIUM_TEXT)
+    pdf.line(160, ROUTE_Y - 5, WIDTH - 240, ROUTE_Y - 5)
+    pdf.setDash()
+    pdf.setFillColor(BLUE)
+    pdf.circle((160 + WIDTH - 240) / 2, ROUTE_Y - 5, 4, fill=1, stroke=0)
+
+    _box(pdf, 60, DETAILS_Y, "DATE")
+    _box(pdf, 60 + BOX_WIDTH, DETAILS_Y, "BUS")
+    _box(pdf, 60, DETAILS_Y2, "SEAT")
+    _box(pdf, 60 + BOX_WIDTH, DETAILS_Y2, "AMOUNT")
+
+    _rule(pdf, PASSENGER_Y)
+    _rule(pdf, PAYMENT_Y)
+    _rule(pdf, QR_Y)
+    pdf.setFillColor(MEDIUM_TEXT)
+    pdf.setFont("Helvetica", 8)
+    pdf.drawString(60, PASSENGER_Y - 20, "PASSENGER")
+    pdf.drawString(60, PAYMENT_Y - 20, "PAYMENT DETAILS")
+    pdf.drawCentredString(WIDTH / 2, QR_Y - QR_SIZE - 35, "Scan QR code for verification")
+
+    pdf.setFillColor(BLUE)
+    pdf.rect(40, FOOTER_Y - 40, WIDTH - 80, 40, fill=1, stroke=0)
+    pdf.setFillColor(colors.white)
+    pdf.drawCentredString(
+        WIDTH / 2,
+        FOOTER_Y - 15,
+        "Please present this ticket at the boarding point. Keep your ID ready for verification.",
+    )
+
+
+def draw_qr(pdf, data, x, y, size):
+    """Draw ``data`` as a QR code of ``size`` points with its lower-left corner at (x, y)."""
+    # A fixed mask skips scoring all eight, most of qrcode's time; any mask is valid.
+    qr = qrcode.QRCode(
+        error_correction=qrcode.constants.ERROR_CORRECT_M, border=QR_BORDER, mask_pattern=QR_MASK
+    )
+    qr.add_data(data)
+    qr.make(fit=True)
+    modules = qr.modules
+    count = len(modules)
+
+    # Draw in module units, one filled path with each horizontal run of dark
+    # modules as one rectangle.
+    pdf.saveState()
+    pdf.translate(x, y)
+    pdf.scale(size / (count + 2 * QR_BORDER), size / (count + 2 * QR_BORDER))
+    path = pdf.beginPath()
+    for row_index, row in enumerate(modules):
+        row_y = count + QR_BORDER - row_index - 1
+        start = None
+        for column, dark in enumerate(row + [False]):
+            if dark and start is None:
+                start = column
+            elif not dark and start is not None:
+                path.rect(QR_BORDER + start, row_y, column - start, 1)
+                start = None
+    pdf.setFillColor(BLUE)
+    pdf.drawPath(path, fill=1, stroke=0)
+    pdf.restoreState()
+
+
+def draw_ticket(pdf, fields, generated):
+    """Draw one booking's fields over the layout, grouped by font to limit state changes."""
+    pdf.setFillColor(colors.white)
+    pdf.setFont("Helvetica-Bold", 14)
+    pdf.drawString(WIDTH - 160, TOP - 30, fields["pnr_code"])
+
+    pdf.setFillColor(DARK_TEXT)
+    pdf.setFont("Helvetica-Bold", 16)
+    pdf.drawString(80, ROUTE_Y, fields["origin"])
+    pdf.drawString(WIDTH - 180, ROUTE_Y, fields["destination"])
+    pdf.setFont("Helvetica", 10)
+    pdf.drawString(80, ROUTE_Y - 15, fields["departs"])
+    pdf.drawString(WIDTH - 180, ROUTE_Y - 15, fields["arrives"])
+    pdf.drawString(60, PAYMENT_Y - 35, f"Method: {fields['payment_method']}")
+    if fields["mobile"]:
+        pdf.drawString(60, PAYMENT_Y - 50, f"Mobile Number: {fields['mobile']}")
+
+    pdf.setFont("Helvetica-Bold", 10)
+    pdf.drawString(70, DETAILS_Y - 22, fields["date"])
+    pdf.drawString(70 + BOX_WIDTH, DETAILS_Y - 22, fields["bus"])
+    pdf.drawString(70 + BOX_WIDTH, DETAILS_Y2 - 22, fields["amount"])
+    pdf.setFont("Helvetica-Bold", 12)
+    pdf.drawString(60, PASSENGER_Y - 35, fields["passenger"])
+
+    pdf.setFillColor(MEDIUM_TEXT)
+    pdf.setFont("Helvetica", 10)
+    pdf.drawString(60, PASSENGER_Y - 50, fields["email"])
+
+    pdf.setFillColor(BLUE)
+    pdf.setFont("Helvetica-Bold", 10)
+    pdf.drawString(70, DETAILS_Y2 - 22, fields["seat"])
+    pdf.drawString(60, PAYMENT_Y - 65, f"Amount: {fields['amount']}")
+
+    draw_qr(pdf, fields["token"], (WIDTH - QR_SIZE) / 2, QR_Y - QR_SIZE - 20, QR_SIZE)
+
+    pdf.setFillColor(colors.white)
+    pdf.setFont("Helvetica", 8)
+    pdf.drawCentredString(
+        WIDTH / 2, FOOTER_Y - 28, f"Support: +232 785 45477 | Generated: {generated}"
+    )
+
+
+def render_tickets(tickets, generated, output=None):
+    """Render ``tickets`` (dicts from ``ticket_fields``) one per page.
+
+    Writes to ``output`` when given, otherwise returns the PDF as bytes.
+    ``generated`` is the timestamp text printed in every footer.
+    """
+    target = output if output is not None else io.BytesIO()
+    pdf = canvas.Canvas(target, pagesize=A4, pageCompression=1)
+    pdf.beginForm(LAYOUT_FORM)
+    draw_layout(pdf)
+    pdf.endForm()
+    for fields in tickets:
+        pdf.doForm(LAYOUT_FORM)
+        draw_ticket(pdf, fields, generated)
+        pdf.showPage()
+    pdf.save()
+    if output is None:
+        return target.getvalue()
+    return None
+
+
+def render_batch(tickets, generated, per_file=TICKETS_PER_FILE, workers=None):
+    """Render ``tickets`` into PDFs of up to ``per_file`` pages each, in order.
+
+    Files are rendered in a pool of ``workers`` processes (default: one per
+    CPU) when there is more than one; pass ``per_file=1`` for one PDF per
+    booking, e.g. for email attachments.
+    """
+    tickets = list(tickets)
+    chunks = [tickets[start:start + per_file] for start in range(0, len(tickets), per_file)]
+    workers = min(workers or os.cpu_count() or 1, len(chunks))
+    if workers <= 1:
+        return [render_tickets(chunk, generated) for chunk in chunks]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(render_tickets, chunks, repeat(generated)))
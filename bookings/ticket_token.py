@@ -0,0 +1,105 @@
+"""
+Issue signed ticket tokens and the trip manifests used to check them offline.
+
+The token format and the verifier live in ``bookings/ticket_verify.py``
+(standard library only, so conductor devices can run it). This module adds
+the server side: per-trip keys derived from ``TICKET_SIGNING_KEY`` (falling
+back to ``SECRET_KEY``), tokens for bookings, and manifests listing every
+booking on a bus for a date.
+"""
+
+from itertools import chain
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.crypto import salted_hmac
+
+from .ticket_verify import Ticket, encode
+
+KEY_SALT = "bookings.ticket_token"
+
+
+def departure_minute(when):
+    return int(when.timestamp() // 60)
+
+
+def trip_key(bus_id, minute):
+    """MAC key for the trip of ``bus_id`` leaving at ``minute``."""
+    secret = getattr(settings, "TICKET_SIGNING_KEY", "") or settings.SECRET_KEY
+    return salted_hmac(
+        KEY_SALT, f"trip:{bus_id}:{minute}", secret=secret, algorithm="sha256"
+    ).digest()
+
+
+def ticket_for(booking):
+    round_trip = booking.trip_type == "round_trip"
+    return_leg = {}
+    if round_trip and booking.return_bus_id and booking.return_date:
+        return_leg = {
+            "return_bus_id": booking.return_bus_id,
+            "return_departure_minute": departure_minute(booking.return_date),
+            "return_seat_number": booking.return_seat.seat_number if booking.return_seat_id else "",
+        }
+    return Ticket(
+        booking_id=booking.pk,
+        bus_id=booking.bus_id,
+        departure_minute=departure_minute(booking.travel_date),
+        seat_number=booking.seat.seat_number,
+        pnr_code=booking.pnr_code,
+        round_trip=round_trip,
+        **return_leg,
+    )
+
+
+def issue(booking):
+    """The QR payload for ``booking``: ``WF1:`` + base45, around 60 characters.
+
+    A round trip with a return bus adds its return leg and a second MAC
+    (around 90 characters), so one QR code boards both buses.
+    """
+    ticket = ticket_for(booking)
+    return encode(ticket, [trip_key(*trip) for trip in ticket.trips])
+
+
+def build_manifest(bus, date):
+    """Every trip of ``bus`` on ``date`` with its key and bookings, as a JSON-ready dict.
+
+    Round trips are listed on their outbound trip and, with their return
+    seat, on the return bus's trip.
+    """
+    from .models import Booking
+
+    outbound = (
+        Booking.objects.filter(bus=bus, travel_date__date=date)
+        .order_by("travel_date", "seat__seat_number")
+        .values_list("pk", "pnr_code", "seat__seat_number", "status", "travel_date")
+    )
+    returning = (
+        Booking.objects.filter(trip_type="round_trip", return_bus=bus, return_date__date=date)
+        .order_by("return_date", "return_seat__seat_number")
+        .values_list("pk", "pnr_code", "return_seat__seat_number", "status", "return_date")
+    )
+    trips = {}
+    for booking_id, pnr_code, seat_number, status, travel_date in chain(outbound, returning):
+        seat_number = seat_number or ""
+        minute = departure_minute(travel_date)
+        trip = trips.get(minute)
+        if trip is None:
+            trip = trips[minute] = {
+                "bus_id": bus.pk,
+                "departure_minute": minute,
+                "departure": travel_date.isoformat(),
+                "key": trip_key(bus.pk, minute).hex(),
+                "tickets": [],
+            }
+        trip["tickets"].append([booking_id, pnr_code, seat_number, status])
+
+    for trip in trips.values():
+        trip["tickets"].sort(key=lambda ticket: ticket[2])
+    return {
+        "version": 1,
+        "generated_at": timezone.now().isoformat(),
+        "bus": {"id": bus.pk, "number": bus.bus_number, "name": bus.bus_name},
+        "date": date.isoformat(),
+        "trips": sorted(trips.values(), key=lambda trip: trip["departure_minute"]),
+    }
@@ -0,0 +1,299 @@
+"""
+Compact signed ticket tokens and offline verification.
+
+A ticket QR code holds ``WF1:`` followed by a base45 (RFC 9285) string, so
+the whole code uses the QR alphanumeric mode. The binary payload is::
+
+    version  u8     1
+    booking  u32    Booking.pk
+    bus      u32    Booking.bus_id
+    minute   u32    departure, minutes since the Unix epoch
+    flags    u8     bit 0: round trip, bit 1: return leg follows
+    seat     u8 length + ASCII seat number
+    pnr      u8 length + ASCII PNR
+    [return leg, when flag bit 1 is set:
+    bus      u32    Booking.return_bus_id
+    minute   u32    return departure
+    seat     u8 length + ASCII return seat number]
+    mac      10 bytes of HMAC-SHA256 over everything above, per leg
+
+The MAC key is per trip (bus and departure minute). It is derived on the
+server from ``TICKET_SIGNING_KEY`` and shipped only inside that trip's
+manifest, so a conductor device can only verify, and at worst forge, tickets
+for the trips it was given. A round trip's token carries one MAC per leg,
+so the same QR code boards the outbound and the return bus.
+
+This module uses only the standard library, so it can run on a conductor's
+device with a manifest downloaded from ``/bookings/manifest/<bus>/<date>/``.
+Scanned tokens are read one per line (base45 includes the space character)::
+
+    scanner | python bookings/ticket_verify.py manifest.json
+"""
+
+import hashlib
+import hmac
+import json
+import struct
+import sys
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+PREFIX = "WF1:"
+VERSION = 1
+MAC_LENGTH = 10
+HEADER = struct.Struct(">BIIIB")
+RETURN_LEG = struct.Struct(">II")
+ROUND_TRIP_FLAG = 1
+RETURN_LEG_FLAG = 2
+BOARDING_STATUSES = ("confirmed",)
+
+BASE45_ALPHABET = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ $%*+-./:"
+_BASE45_VALUES = {char: value for value, char in enumerate(BASE45_ALPHABET)}
+
+
+class TokenError(ValueError):
+    """The text is not a well-formed ticket token."""
+
+
+def b45encode(data):
+    out = []
+    for index in range(0, len(data) - 1, 2):
+        value = data[index] * 256 + data[index + 1]
+        value, c = divmod(value, 45)
+        e, d = divmod(value, 45)
+        out.append(BASE45_ALPHABET[c] + BASE45_ALPHABET[d] + BASE45_ALPHABET[e])
+    if len(data) % 2:
+        d, c = divmod(data[-1], 45)
+        out.append(BASE45_ALPHABET[c] + BASE45_ALPHABET[d])
+    return "".join(out)
+
+
+def b45decode(text):
+    try:
+        values = [_BASE45_VALUES[char] for char in text]
+    except KeyError:
+        raise TokenError("invalid base45 character")
+    if len(values) % 3 == 1:
+        raise TokenError("invalid base45 length")
+    out = bytearray()
+    for index in range(0, len(values), 3):
+        chunk = values[index:index + 3]
+        value = sum(digit * 45 ** position for position, digit in enumerate(chunk))
+        if len(chunk) == 3:
+            if value > 0xFFFF:
+                raise TokenError("invalid base45 triplet")
+            out.extend(divmod(value, 256))
+        else:
+            if value > 0xFF:
+                raise TokenError("invalid base45 pair")
+            out.append(value)
+    return bytes(out)
+
+
+@dataclass(frozen=True)
+class Ticket:
+    booking_id: int
+    bus_id: int
+    departure_minute: int
+    seat_number: str
+    pnr_code: str
+    round_trip: bool = False
+    return_bus_id: int = None
+    return_departure_minute: int = None
+    return_seat_number: str = ""
+
+    @property
+    def trip(self):
+        return (self.bus_id, self.departure_minute)
+
+    @property
+    def return_trip(self):
+        if self.return_bus_id is None:
+            return None
+        return (self.return_bus_id, self.return_departure_minute)
+
+    @property
+    def trips(self):
+        """The trips the token boards, in MAC order."""
+        return [self.trip] if self.return_trip is None else [self.trip, self.return_trip]
+
+    @property
+    def departure(self):
+        return datetime.fromtimestamp(self.departure_minute * 60, tz=timezone.utc)
+
+
+def _short_string(value):
+    data = value.encode("ascii")
+    if len(data) > 255:
+        raise TokenError("field too long")
+    return bytes([len(data)]) + data
+
+
+def pack(ticket):
+    """The signed part of the token for ``ticket``."""
+    flags = ROUND_TRIP_FLAG if ticket.round_trip else 0
+    if ticket.return_trip is not None:
+        flags |= RETURN_LEG_FLAG
+    body = (
+        HEADER.pack(
+            VERSION,
+            ticket.booking_id,
+            ticket.bus_id,
+            ticket.departure_minute,
+            flags,
+        )
+        + _short_string(ticket.seat_number)
+        + _short_string(ticket.pnr_code)
+    )
+    if ticket.return_trip is not None:
+        body += RETURN_LEG.pack(*ticket.return_trip) + _short_string(ticket.return_seat_number)
+    return body
+
+
+def sign(trip_key, body):
+    return hmac.new(trip_key, body, hashlib.sha256).digest()[:MAC_LENGTH]
+
+
+def encode(ticket, trip_keys):
+    """The token for ``ticket``, signed with the key of each of ``ticket.trips``."""
+    body = pack(ticket)
+    if len(trip_keys) != len(ticket.trips):
+        raise ValueError("one trip key is needed per leg")
+    return PREFIX + b45encode(body + b"".join(sign(key, body) for key in trip_keys))
+
+
+def _read_string(data, offset):
+    if offset >= len(data):
+        raise TokenError("token truncated")
+    length = data[offset]
+    end = offset + 1 + length
+    if end > len(data):
+        raise TokenError("token truncated")
+    return data[offset + 1:end].decode("ascii", "replace"), end
+
+
+def decode(token):
+    """Parse a token into ``(ticket, signed_body, macs)`` without checking the MACs.
+
+    ``macs`` holds one MAC per entry of ``ticket.trips``.
+    """
+    # Space is a base45 digit, so only line endings are trimmed at the end.
+    token = token.lstrip().rstrip("\r\n")
+    if not token.startswith(PREFIX):
+        raise TokenError("not a ticket token")
+    data = b45decode(token[len(PREFIX):])
+    if len(data) < HEADER.size + 2 + MAC_LENGTH:
+        raise TokenError("token too short")
+    version, booking_id, bus_id, minute, flags = HEADER.unpack_from(data)
+    if version != VERSION:
+        raise TokenError(f"unsupported token version {version}")
+    seat_number, offset = _read_string(data, HEADER.size)
+    pnr_code, offset = _read_string(data, offset)
+    return_leg = {}
+    if flags & RETURN_LEG_FLAG:
+        if offset + RETURN_LEG.size > len(data):
+            raise TokenError("token truncated")
+        return_bus_id, return_minute = RETURN_LEG.unpack_from(data, offset)
+        return_seat, offset = _read_string(data, offset + RETURN_LEG.size)
+        return_leg = {
+            "return_bus_id": return_bus_id,
+            "return_departure_minute": return_minute,
+            "return_seat_number": return_seat,
+        }
+    ticket = Ticket(
+        booking_id, bus_id, minute, seat_number, pnr_code,
+        bool(flags & ROUND_TRIP_FLAG), **return_leg,
+    )
+    body, signatures = data[:offset], data[offset:]
+    expected = MAC_LENGTH * len(ticket.trips)
+    if len(signatures) < expected:
+        raise TokenError("token truncated")
+    if len(signatures) > expected:
+        raise TokenError("token has trailing data")
+    macs = [signatures[index:index + MAC_LENGTH] for index in range(0, len(signatures), MAC_LENGTH)]
+    return ticket, body, macs
+
+
+@dataclass
+class Result:
+    valid: bool
+    reason: str
+    ticket: Ticket = None
+    seat_number: str = ""
+
+    def __str__(self):
+        if self.ticket is None:
+            return f"REJECT  {self.reason}"
+        verdict = "BOARD " if self.valid else "REJECT"
+        return f"{verdict}  {self.reason:<16} PNR {self.ticket.pnr_code}  seat {self.seat_number}"
+
+
+class Manifest:
+    """Trips downloaded from the server: per-trip MAC keys and booking rows."""
+
+    def __init__(self, data):
+        self.generated_at = data.get("generated_at")
+        self.trips = {}
+        for trip in data["trips"]:
+            tickets = {
+                booking_id: {"pnr_code": pnr_code, "seat_number": seat, "status": status}
+                for booking_id, pnr_code, seat, status in trip["tickets"]
+            }
+            self.trips[(trip["bus_id"], trip["departure_minute"])] = {
+                "key": bytes.fromhex(trip["key"]),
+                "tickets": tickets,
+            }
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding="utf-8") as handle:
+            return cls(json.load(handle))
+
+
+class Verifier:
+    """Checks scanned tokens against a manifest and remembers who has boarded."""
+
+    def __init__(self, manifest):
+        self.manifest = manifest
+        self.boarded = set()
+
+    def check(self, token):
+        try:
+            ticket, body, macs = decode(token)
+        except TokenError as exc:
+            return Result(False, f"malformed: {exc}")
+        for trip_id, mac, seat_number in zip(
+            ticket.trips, macs, (ticket.seat_number, ticket.return_seat_number)
+        ):
+            trip = self.manifest.trips.get(trip_id)
+            if trip is not None:
+                break
+        else:
+            return Result(False, "wrong_trip", ticket, ticket.seat_number)
+        if not hmac.compare_digest(sign(trip["key"], body), mac):
+            return Result(False, "bad_signature", ticket, seat_number)
+        entry = trip["tickets"].get(ticket.booking_id)
+        if entry is None or entry["pnr_code"] != ticket.pnr_code:
+            # Genuine, but booked after the manifest was downloaded.
+            return Result(False, "not_on_manifest", ticket, seat_number)
+        if entry["status"] not in BOARDING_STATUSES:
+            return Result(False, entry["status"], ticket, entry["seat_number"])
+        if (trip_id, ticket.booking_id) in self.boarded:
+            return Result(False, "already_boarded", ticket, entry["seat_number"])
+        self.boarded.add((trip_id, ticket.booking_id))
+        return Result(True, "ok", ticket, entry["seat_number"])
+
+
+def main(argv):
+    if len(argv) != 2:
+        print("usage: ticket_verify.py MANIFEST.json < tokens (one per line)")
+        return 2
+    verifier = Verifier(Manifest.load(argv[1]))
+    for line in sys.stdin:
+        if line.strip():
+            print(verifier.check(line), flush=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
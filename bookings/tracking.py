@@ -0,0 +1,152 @@
+"""
+PNR -> (bus, trip) index and the passenger "where is my bus" payload.
+
+A PNR keeps the same bus and trip unless the booking is edited, so the
+lookup is cached and invalidated from ``Booking.save``. That invalidation
+reaches only this process's local-memory cache, and ``QuerySet.update()``
+skips it, so without a shared cache (``SHARED_CACHE``) entries live for
+``LOCAL_PNR_TIMEOUT`` only. Combined with the live position cache in
+``gps_tracking.live``, a warm refresh of the tracking endpoint runs no
+database queries at all.
+"""
+
+import math
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from core import metrics
+
+PNR_TIMEOUT = 6 * 60 * 60
+LOCAL_PNR_TIMEOUT = 30
+MISSING_PNR_TIMEOUT = 60
+ROAD_FACTOR = 1.3  # straight-line to road distance across Freetown's streets
+CITY_SPEED_KMH = 20.0  # assumed speed when the bus is stopped or crawling
+AT_TERMINAL_KM = 0.2
+EARTH_RADIUS_KM = 6371.0
+
+
+def pnr_key(pnr_code):
+    return f"pnr-index:{pnr_code}"
+
+
+def pnr_timeout():
+    return PNR_TIMEOUT if getattr(settings, "SHARED_CACHE", False) else LOCAL_PNR_TIMEOUT
+
+
+def invalidate(pnr_code):
+    cache.delete(pnr_key(pnr_code))
+
+
+def index_entry(booking):
+    route = booking.route
+    latitude, longitude = route.polyline[0]
+    return {
+        "booking_id": booking.pk,
+        "pnr_code": booking.pnr_code,
+        "status": booking.status,
+        "bus_id": booking.bus_id,
+        "bus_name": booking.bus.bus_name,
+        "route_id": route.pk,
+        "travel_date": booking.travel_date.isoformat(),
+        "boarding": {
+            "name": route.origin_display,
+            "latitude": latitude,
+            "longitude": longitude,
+        },
+    }
+
+
+def lookup(pnr_code):
+    """Cached index entry for ``pnr_code``, or None if there is no such booking."""
+    from .models import Booking
+
+    key = pnr_key(pnr_code)
+    entry = cache.get(key)
+    metrics.record_cache("pnr_index", entry is not None)
+    if entry is not None:
+        return entry or None  # {} caches a PNR that does not exist
+
+    booking = (
+        Booking.objects.select_related("bus", "route", "route__origin_terminal")
+        .filter(pnr_code=pnr_code)
+        .first()
+    )
+    if booking is None:
+        cache.set(key, {}, min(MISSING_PNR_TIMEOUT, pnr_timeout()))
+        return None
+    entry = index_entry(booking)
+    cache.set(key, entry, pnr_timeout())
+    return entry
+
+
+async def alookup(pnr_code):
+    """Async ``lookup`` for the ASGI tracking view."""
+    from .models import Booking
+
+    key = pnr_key(pnr_code)
+    entry = await cache.aget(key)
+    metrics.record_cache("pnr_index", entry is not None)
+    if entry is not None:
+        return entry or None
+
+    booking = await (
+        Booking.objects.select_related("bus", "route", "route__origin_terminal")
+        .filter(pnr_code=pnr_code)
+        .afirst()
+    )
+    if booking is None:
+        await cache.aset(key, {}, min(MISSING_PNR_TIMEOUT, pnr_timeout()))
+        return None
+    entry = index_entry(booking)
+    await cache.aset(key, entry, pnr_timeout())
+    return entry
+
+
+def distance_km(lat1, lng1, lat2, lng2):
+    lat1, lng1, lat2, lng2 = map(math.radians, (lat1, lng1, lat2, lng2))
+    a = (
+        math.sin((lat2 - lat1) / 2) ** 2
+        + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def etag(entry, position):
+    return f'"{entry["booking_id"]}-{entry["status"]}-{position["epoch"]:.3f}"'
+
+
+def tracking_payload(entry, position, now=None):
+    """Position, ETA to the boarding terminal and update age for one booking."""
+    now = now or timezone.now()
+    boarding = entry["boarding"]
+    distance = ROAD_FACTOR * distance_km(
+        position["latitude"], position["longitude"],
+        boarding["latitude"], boarding["longitude"],
+    )
+    if distance <= AT_TERMINAL_KM:
+        eta_minutes = 0
+    else:
+        speed = max(position["speed"], CITY_SPEED_KMH)
+        eta_minutes = round(distance / speed * 60)
+
+    return {
+        "success": True,
+        "pnr_code": entry["pnr_code"],
+        "booking_status": entry["status"],
+        "bus_id": entry["bus_id"],
+        "bus_name": entry["bus_name"],
+        "travel_date": entry["travel_date"],
+        "latitude": position["latitude"],
+        "longitude": position["longitude"],
+        "speed": position["speed"],
+        "heading": position["heading"],
+        "is_moving": position["is_moving"],
+        "timestamp": position["timestamp"],
+        "last_update_age_seconds": max(0, int(now.timestamp() - position["epoch"])),
+        "boarding_terminal": boarding["name"],
+        "distance_to_boarding_km": round(distance, 2),
+        "eta_to_boarding_minutes": eta_minutes,
+        "route_progress": position.get("progress"),
+    }
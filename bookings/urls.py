@@ -7,8 +7,15 @@ urlpatterns = [
     path("", views.BookingListView.as_view(), name="list"),
     path("<int:pk>/", views.BookingDetailView.as_view(), name="detail"),
     path("create/", views.BookingCreateView.as_view(), name="create"),
+    path("group/", views.GroupBookingView.as_view(), name="group_create"),
+    path("api/group/", views.GroupBookingAPIView.as_view(), name="api_group_create"),
     path("search/", views.BookingSearchView.as_view(), name="search"),
     path("payment/<int:pk>/", views.PaymentView.as_view(), name="payment"),
+    path(
+        "payment-status/<int:pk>/",
+        views.PaymentStatusView.as_view(),
+        name="payment_status",
+    ),
     path(
         "payment-success/<int:pk>/",
         views.PaymentSuccessView.as_view(),
@@ -26,12 +33,28 @@ urlpatterns = [
         views.get_route_buses_ajax,
         name="ajax_get_route_buses",
     ),
+    path(
+        "ajax/fare-quote/",
+        views.get_fare_quote_ajax,
+        name="ajax_fare_quote",
+    ),
     path(
         "bus-seats/",
         views.get_seat_availability,
         name="bus_seats",
     ),
     path("debug/", views.BookingDebugView.as_view(), name="debug"),
+    path(
+        "manifest/<int:bus_id>/<str:date>/",
+        views.TripManifestView.as_view(),
+        name="trip_manifest",
+    ),
+    path(
+        "boarding-manifest/<int:bus_id>/<str:date>.<str:fmt>",
+        views.BoardingManifestView.as_view(),
+        name="boarding_manifest",
+    ),
     path('track/<str:pnr_code>/', views.track_booking_by_pnr, name='track_booking_by_pnr'),
+    path('track/<str:pnr_code>/async/', views.track_booking_by_pnr_async, name='track_booking_by_pnr_async'),
 
 ]
\ No newline at end of file
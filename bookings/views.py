@@ -1,16 +1,16 @@
 from django.shortcuts import render, get_object_or_404, redirect
-from django.views.generic import ListView, DetailView, CreateView, TemplateView
-from django.contrib.auth.mixins import LoginRequiredMixin
+from django.views.generic import ListView, DetailView, CreateView, TemplateView, FormView, View
+from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.contrib import messages
 from django.urls import reverse_lazy, reverse
 from django.utils import timezone
-from django.http import JsonResponse, HttpResponse, Http404
+from django.http import JsonResponse, HttpResponse, Http404, StreamingHttpResponse, FileResponse
 from django.conf import settings
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import letter, A4
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+from reportlab.lib.pagesizes import letter
 from reportlab.lib.units import inch
 from reportlab.lib import colors
-from reportlab.lib.colors import HexColor
 from reportlab.platypus import Table, TableStyle
 from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfbase.ttfonts import TTFont
@@ -18,15 +18,24 @@ from reportlab.graphics.shapes import Drawing
 from reportlab.graphics.charts.piecharts import Pie
 from reportlab.graphics import renderPDF
 import io
+import json
+import uuid
 import qrcode
 import base64
-from qrcode.image.styledpil import StyledPilImage
-from qrcode.image.styles.colormasks import SolidFillColorMask
 from PIL import Image
-from .models import Booking
-from .forms import BookingForm, BookingSearchForm
+from .models import Booking, Payment
+from .forms import BookingForm, BookingSearchForm, GroupBookingForm
+from .group import GroupBookingError, create_group_booking
 from sierra_leone_validator import SierraLeoneMobileValidator
-from gps_tracking.models import BusLocation
+from core import metrics
+from core.instrumentation import span
+from gps_tracking import live
+from routes import fares
+from buses.seatmap import seat_map_payload
+from . import manifests, payments, ticket_pdf, ticket_token, tracking
+
+# Passengers poll the tracking modal; browsers may reuse a position this long.
+TRACKING_MAX_AGE = 5
 
 
 class BookingListView(LoginRequiredMixin, ListView):
@@ -86,6 +95,8 @@ class BookingCreateView(LoginRequiredMixin, CreateView):
                         travel_date = (
                             timezone.now().date()
                         )  # Get seats and their availability
+                if "route" in context:
+                    context["route_fare"] = fares.fare(context["route"], travel_date)
                 seats = bus.seats.all().order_by("seat_number")
                 print(f"DEBUG: Found {seats.count()} seats for bus")
 
@@ -138,18 +149,15 @@ class BookingCreateView(LoginRequiredMixin, CreateView):
     def form_valid(self, form):
         form.instance.customer = self.request.user
 
-        # Calculate amount based on trip type and route price
-        route_price = form.instance.route.price
+        # Fare for the travel date(s) from the fare table
+        form.instance.amount_paid = form.calculate_total_amount()
         trip_type = form.cleaned_data.get("trip_type", "one_way")
 
         if trip_type == "round_trip":
-            form.instance.amount_paid = route_price * 2  # Double price for round trip
             # Ensure return fields are set
             form.instance.return_bus = form.cleaned_data.get("return_bus")
             form.instance.return_seat = form.cleaned_data.get("return_seat")
             form.instance.return_date = form.cleaned_data.get("return_date")
-        else:
-            form.instance.amount_paid = route_price
 
         # Convert travel_date (date) to datetime using route departure time
         travel_date = form.cleaned_data["travel_date"]
@@ -195,6 +203,110 @@ class BookingCreateView(LoginRequiredMixin, CreateView):
         return redirect("bookings:payment", pk=booking.pk)
 
 
+class GroupBookingView(LoginRequiredMixin, FormView):
+    """Book several seats on one bus and date in one submission."""
+
+    form_class = GroupBookingForm
+    template_name = "bookings/group_create.html"
+
+    def get_initial(self):
+        initial = super().get_initial()
+        initial["route"] = self.request.GET.get("route")
+        initial["bus"] = self.request.GET.get("bus")
+        initial["travel_date"] = self.request.GET.get("date")
+        return initial
+
+    def form_valid(self, form):
+        try:
+            bookings = create_group_booking(
+                self.request.user,
+                form.cleaned_data["route"],
+                form.cleaned_data["bus"],
+                form.cleaned_data["travel_date"],
+                seat_ids=form.cleaned_data["seats"],
+                count=form.cleaned_data["seat_count"],
+                fare_class=form.cleaned_data["fare_class"],
+            )
+        except GroupBookingError as e:
+            form.add_error(None, str(e))
+            return self.form_invalid(form)
+
+        total = sum(booking.amount_paid for booking in bookings)
+        messages.success(
+            self.request,
+            f"Group booking created for {len(bookings)} seats "
+            f"({', '.join(booking.seat.seat_number for booking in bookings)}). "
+            f"PNRs: {', '.join(booking.pnr_code for booking in bookings)}. "
+            f"Total amount: Le {total}",
+        )
+        return redirect("bookings:list")
+
+
+class GroupBookingAPIView(View):
+    """
+    JSON endpoint for agents: POST {route, bus, travel_date, seats: [ids]}
+    or {route, bus, travel_date, count} to book the group in one transaction.
+    An optional "fare_class" (default "standard") prices every seat.
+    """
+
+    def post(self, request):
+        if not request.user.is_authenticated:
+            return JsonResponse({"error": "Authentication required"}, status=401)
+        try:
+            data = json.loads(request.body)
+            form = GroupBookingForm(
+                {
+                    "route": data.get("route"),
+                    "bus": data.get("bus"),
+                    "travel_date": data.get("travel_date"),
+                    "seat_count": data.get("count"),
+                    "fare_class": data.get("fare_class"),
+                    "seats": ",".join(str(seat) for seat in data.get("seats") or []),
+                }
+            )
+            if not form.is_valid():
+                return JsonResponse(
+                    {"error": "Invalid booking request", "errors": form.errors},
+                    status=400,
+                )
+            bookings = create_group_booking(
+                request.user,
+                form.cleaned_data["route"],
+                form.cleaned_data["bus"],
+                form.cleaned_data["travel_date"],
+                seat_ids=form.cleaned_data["seats"],
+                count=form.cleaned_data["seat_count"],
+                fare_class=form.cleaned_data["fare_class"],
+            )
+        except json.JSONDecodeError:
+            return JsonResponse({"error": "Invalid JSON data"}, status=400)
+        except GroupBookingError as e:
+            return JsonResponse({"error": str(e)}, status=409)
+        except Exception as e:
+            return JsonResponse({"error": str(e)}, status=500)
+
+        return JsonResponse(
+            {
+                "success": True,
+                "count": len(bookings),
+                "travel_date": bookings[0].travel_date.isoformat(),
+                "total_amount": str(sum(booking.amount_paid for booking in bookings)),
+                "bookings": [
+                    {
+                        "id": booking.pk,
+                        "pnr_code": booking.pnr_code,
+                        "seat_id": booking.seat_id,
+                        "seat_number": booking.seat.seat_number,
+                        "amount": str(booking.amount_paid),
+                        "status": booking.status,
+                    }
+                    for booking in bookings
+                ],
+            },
+            status=201,
+        )
+
+
 class BookingDetailView(DetailView):
     model = Booking
     template_name = "bookings/detail.html"
@@ -237,6 +349,8 @@ class PaymentView(LoginRequiredMixin, TemplateView):
         try:
             booking = Booking.objects.get(pk=kwargs["pk"], customer=self.request.user)
             context["booking"] = booking
+            # Sent back with the form so a double submit reuses one payment
+            context["idempotency_key"] = uuid.uuid4().hex
         except Booking.DoesNotExist:
             # This should rarely happen due to dispatch method, but handle it gracefully
             raise Http404("Booking not found or access denied")
@@ -276,6 +390,7 @@ class PaymentView(LoginRequiredMixin, TemplateView):
                         request,
                         f"Mobile money number is required for {payment_method.replace('_', ' ').title()} payments.",
                     )
+                    self.record_validation_failure(payment_method, "missing_number")
                     return redirect("bookings:payment", pk=booking.pk)
 
                 # Validate mobile money number using new validator
@@ -286,6 +401,7 @@ class PaymentView(LoginRequiredMixin, TemplateView):
                 )
                 if error_message:
                     messages.error(request, error_message)
+                    self.record_validation_failure(payment_method, "wrong_network")
                     return redirect("bookings:payment", pk=booking.pk)
 
                 # Normalize the number using new validator
@@ -296,19 +412,11 @@ class PaymentView(LoginRequiredMixin, TemplateView):
                     messages.error(
                         request, "Please enter a valid Sierra Leone mobile number."
                     )
+                    self.record_validation_failure(payment_method, "invalid_number")
                     return redirect("bookings:payment", pk=booking.pk)
 
-                booking.mobile_money_number = normalized_number
-                payment_display = payment_method.replace("_", " ").title()
-
-                # Get trip type information for enhanced messaging
-                trip_info = ""
-                if booking.trip_type == "round_trip" and booking.return_date:
-                    trip_info = f" (Round trip - return on {booking.return_date.strftime('%B %d, %Y')})"
-                else:
-                    trip_info = " (One way trip)"
-
-                success_message = f"Payment successful via {payment_display}! Your booking is confirmed{trip_info}. Payment will be processed to {normalized_number}."
+                payer = normalized_number
+                booking_changes = {"mobile_money_number": normalized_number}
 
             elif payment_method == "paypal":
                 # Get PayPal form data
@@ -325,40 +433,47 @@ class PaymentView(LoginRequiredMixin, TemplateView):
                 if validation_errors:
                     for error in validation_errors:
                         messages.error(request, error)
+                    self.record_validation_failure(payment_method, "invalid_card")
                     return redirect("bookings:payment", pk=booking.pk)
 
-                # Store PayPal card data
-                booking.mobile_money_number = ""  # Clear mobile money number for PayPal
-                booking.card_number = card_number
-                booking.card_owner_name = card_owner_name
-                booking.card_cvc = card_cvc
-                booking.card_expiry = card_expiry
-
-                payment_display = "PayPal"
-
-                # Get trip type information for enhanced messaging
-                trip_info = ""
-                if booking.trip_type == "round_trip" and booking.return_date:
-                    trip_info = f" (Round trip - return on {booking.return_date.strftime('%B %d, %Y')})"
-                else:
-                    trip_info = " (One way trip)"
-
-                success_message = f"Payment successful via {payment_display}! Your booking is confirmed{trip_info}. PayPal transaction ID: PP-{booking.pnr_code}-{timezone.now().strftime('%Y%m%d')}. You will receive a PayPal receipt at your registered email."
+                payer = f"card ending {card_number.replace(' ', '')[-4:]}"
+                booking_changes = {
+                    "mobile_money_number": "",  # Clear mobile money number for PayPal
+                    "card_number": card_number,
+                    "card_owner_name": card_owner_name,
+                    "card_cvc": card_cvc,
+                    "card_expiry": card_expiry,
+                }
 
             else:
                 messages.error(request, "Invalid payment method selected.")
-                return redirect(
-                    "bookings:payment", pk=booking.pk
-                )  # Process payment (simulation)            booking.payment_method = payment_method
-            booking.status = "confirmed"
-            booking.save()
-
-            messages.success(request, success_message)
-            return redirect("bookings:payment_success", pk=booking.pk)
+                self.record_validation_failure("unknown", "invalid_method")
+                return redirect("bookings:payment", pk=booking.pk)
+
+            # Record the payment and hand it to the provider in the background;
+            # a resubmitted form carries the same key and gets the same payment.
+            idempotency_key = (
+                request.POST.get("idempotency_key")
+                or request.headers.get("Idempotency-Key")
+                or uuid.uuid4().hex
+            )[:64]
+            try:
+                payment, _ = payments.start_payment(
+                    booking, payment_method, idempotency_key, payer, booking_changes
+                )
+            except payments.PaymentError as e:
+                messages.error(request, str(e))
+                return redirect("bookings:payment", pk=booking.pk)
+            return redirect("bookings:payment_status", pk=payment.pk)
 
         messages.error(request, "Please select a payment method.")
+        self.record_validation_failure("none", "missing_method")
         return redirect("bookings:payment", pk=booking.pk)
 
+    @staticmethod
+    def record_validation_failure(method, reason):
+        metrics.payment_validation_failures.labels(method=method, reason=reason).inc()
+
     def validate_paypal_fields(
         self, card_number, card_owner_name, card_cvc, card_expiry
     ):
@@ -432,6 +547,60 @@ class PaymentView(LoginRequiredMixin, TemplateView):
         return checksum % 10 == 0
 
 
+class PaymentStatusView(LoginRequiredMixin, DetailView):
+    """
+    Waits for the provider: refreshes until the payment is captured or fails.
+
+    A payment untouched for ``stale_seconds`` (its background run was lost or
+    frozen) is retried here. After ``max_polls`` refreshes it is failed, so
+    the customer can pay again instead of waiting forever.
+    """
+
+    model = Payment
+    template_name = "bookings/payment_processing.html"
+    context_object_name = "payment"
+    refresh_seconds = 2
+    stale_seconds = 10
+    max_polls = 30
+
+    def get_queryset(self):
+        return Payment.objects.select_related("booking__route").filter(
+            booking__customer=self.request.user
+        )
+
+    def get(self, request, *args, **kwargs):
+        payment = self.get_object()
+        try:
+            polls = max(0, int(request.GET.get("poll", 0)))
+        except ValueError:
+            polls = 0
+        stale = timezone.now() - timezone.timedelta(seconds=self.stale_seconds)
+        if payment.is_pending and payment.updated_at < stale:
+            payments.retry(payment)
+            payment.refresh_from_db()
+        if payment.is_pending and polls >= self.max_polls:
+            payments.give_up(payment)
+            payment.refresh_from_db()
+        if payment.status == "captured":
+            messages.success(request, payments.success_message(payment))
+            return redirect("bookings:payment_success", pk=payment.booking_id)
+        if payment.status == "failed":
+            messages.error(
+                request, payment.failure_reason or "The payment could not be completed."
+            )
+            return redirect("bookings:payment", pk=payment.booking_id)
+        self.object = payment
+        refresh_url = f"?poll={polls + 1}"
+        response = self.render_to_response(
+            self.get_context_data(
+                object=payment, refresh_seconds=self.refresh_seconds, refresh_url=refresh_url
+            )
+        )
+        response["Refresh"] = f"{self.refresh_seconds}; url={refresh_url}"
+        patch_cache_control(response, no_store=True)
+        return response
+
+
 class PaymentSuccessView(LoginRequiredMixin, DetailView):
     model = Booking
     template_name = "bookings/payment_success.html"
@@ -446,47 +615,9 @@ class PaymentSuccessView(LoginRequiredMixin, DetailView):
         context = super().get_context_data(**kwargs)
         booking = self.get_object()
 
-        # --- Server-Side QR Code Generation with Round Trip Support ---
-        passenger_name = booking.customer.get_full_name() or booking.customer.username
-        qr_data_lines = [
-            "WAKA-FINE TICKET",
-            f"PNR: {booking.pnr_code}",
-            f"Passenger: {passenger_name}",
-            f"Route: {booking.route.origin} to {booking.route.destination}",
-            f"Date: {booking.travel_date.strftime('%b %d, %Y at %H:%M')}",
-            f"Bus: {booking.bus.bus_name}",
-            f"Seat: {booking.seat.seat_number}",
-        ]
-
-        # Add trip type and return trip details if available
-        if booking.trip_type == "round_trip":
-            qr_data_lines.append("Trip Type: Round Trip")
-
-            # Add return trip details when they exist
-            if booking.return_date:
-                qr_data_lines.append(
-                    f"Return Date: {booking.return_date.strftime('%b %d, %Y at %H:%M')}"
-                )
-            if booking.return_bus:
-                qr_data_lines.append(f"Return Bus: {booking.return_bus.bus_name}")
-            if booking.return_seat:
-                qr_data_lines.append(f"Return Seat: {booking.return_seat.seat_number}")
-        else:
-            qr_data_lines.append("Trip Type: One Way")
-
-        # Add payment and status info
-        qr_data_lines.extend(
-            [
-                f"Amount: Le {booking.amount_paid}",
-                f"Payment: {booking.get_payment_method_display()}",
-                f"Status: {booking.get_status_display()}",
-                "",
-                f"Ticket URL: {self.request.build_absolute_uri(reverse('bookings:ticket', kwargs={'pk': booking.pk}))}",
-            ]
-        )
-
-        # Generate QR code
-        qr_data_string = "\n".join(qr_data_lines)
+        # --- Server-Side QR Code Generation ---
+        # The QR holds the signed ticket token that conductors verify offline.
+        qr_data_string = booking.ticket_token
 
         try:
             # Generate QR code image
@@ -515,11 +646,12 @@ class PaymentSuccessView(LoginRequiredMixin, DetailView):
             print(f"PaymentSuccess QR Code generation error: {e}")
             context["qr_code_error"] = str(e)
 
-        # --- End Server-Side QR Code Generation with Round Trip Support ---
+        # --- End Server-Side QR Code Generation ---
 
         return context
 
 
+@metrics.timed(metrics.seat_map_seconds)
 def get_seat_availability(request):
     """AJAX view to get seat availability for a specific bus and date."""
     if request.method == "GET":
@@ -532,7 +664,7 @@ def get_seat_availability(request):
         try:
             from buses.models import Bus
 
-            bus = Bus.objects.get(id=bus_id)
+            bus = Bus.objects.select_related("layout").get(id=bus_id)
 
             # Parse travel date
             try:
@@ -540,39 +672,14 @@ def get_seat_availability(request):
             except ValueError:
                 return JsonResponse({"error": "Invalid date format"}, status=400)
 
-            # Get all seats for the bus
-            seats = bus.seats.all().order_by("seat_number")
-
-            # Get booked seats for this date
-            booked_seats = Booking.objects.filter(
-                bus=bus,
-                travel_date__date=travel_date,
-                status__in=["confirmed", "pending"],
-            ).values_list(
-                "seat_id", flat=True
-            )  # Prepare seat data
-            seat_data = []
-            for seat in seats:
-                seat_data.append(
-                    {
-                        "id": seat.id,
-                        "number": seat.seat_number,
-                        "is_window": seat.is_window,
-                        "is_available": seat.is_available
-                        and seat.id not in booked_seats,
-                        "is_booked": seat.id in booked_seats,
-                    }
-                )
-
-            return JsonResponse(
-                {
-                    "seats": seat_data,
-                    "bus_name": bus.bus_name,
-                    "total_seats": len(seat_data),
-                    "available_seats": len([s for s in seat_data if s["is_available"]]),
-                }
+            # ?format=compact: layout id + availability bits (see buses/seatmap.py)
+            payload = seat_map_payload(
+                bus, travel_date, compact=request.GET.get("format") == "compact"
             )
 
+            with span("serialize"):
+                return JsonResponse({**payload, "bus_name": bus.bus_name})
+
         except Bus.DoesNotExist:
             return JsonResponse({"error": "Bus not found"}, status=404)
         except Exception as e:
@@ -587,268 +694,19 @@ class TicketPDFView(LoginRequiredMixin, DetailView):
     model = Booking
 
     def get_queryset(self):
+        queryset = Booking.objects.select_related("route", "bus", "seat", "return_seat", "customer")
         if self.request.user.is_staff or self.request.user.is_admin:
-            return Booking.objects.all()
-        return Booking.objects.filter(customer=self.request.user)
+            return queryset
+        return queryset.filter(customer=self.request.user)
 
+    @metrics.timed(metrics.pdf_render_seconds, document="ticket")
     def get(self, request, *args, **kwargs):
         booking = self.get_object()
-
-        # Create PDF in memory
-        buffer = io.BytesIO()
-        p = canvas.Canvas(buffer, pagesize=A4)
-        width, height = A4
-
-        # Colors matching the web design
-        green_color = HexColor("#10b981")  # Green header
-        blue_color = HexColor("#3b82f6")  # Blue footer
-        gray_bg = HexColor("#f9fafb")  # Gray background
-        dark_text = HexColor("#1f2937")  # Dark text
-        medium_text = HexColor("#6b7280")  # Medium text
-
-        # Start y position for content
-        y_pos = height - 60
-
-        # Header with green background
-        p.setFillColor(green_color)
-        p.rect(40, y_pos - 40, width - 80, 60, fill=1, stroke=0)
-
-        # Header text
-        p.setFillColor(colors.white)
-        p.setFont("Helvetica-Bold", 18)
-        p.drawString(60, y_pos - 15, "Digital Ticket")
-        p.setFont("Helvetica", 12)
-        p.drawString(60, y_pos - 30, "Waka-Fine Bus")
-
-        # PNR Code in header (right side)
-        p.setFont("Helvetica", 10)
-        p.drawString(width - 160, y_pos - 15, "PNR")
-        p.setFont("Helvetica-Bold", 14)
-        p.drawString(width - 160, y_pos - 30, booking.pnr_code)
-
-        y_pos -= 80
-
-        # Route section with visual line and bus icon
-        p.setFillColor(dark_text)
-        p.setFont("Helvetica-Bold", 16)
-
-        # Origin
-        p.drawString(80, y_pos, booking.route.origin)
-        p.setFont("Helvetica", 10)
-        p.drawString(80, y_pos - 15, booking.route.departure_time.strftime("%H:%M"))
-
-        # Destination
-        p.setFont("Helvetica-Bold", 16)
-        p.drawString(width - 180, y_pos, booking.route.destination)
-        p.setFont("Helvetica", 10)
-        p.drawString(
-            width - 180, y_pos - 15, booking.route.arrival_time.strftime("%H:%M")
-        )
-
-        # Dashed line between origin and destination
-        p.setDash(3, 3)
-        p.setStrokeColor(medium_text)
-        p.line(160, y_pos - 5, width - 240, y_pos - 5)
-        p.setDash()  # Reset to solid
-
-        # Bus icon representation (simple text)
-        p.setFont("Helvetica", 14)
-        p.drawCentredText((width) / 2, y_pos - 5, "\U0001f68c")
-
-        y_pos -= 50
-
-        # Travel details in grid format
-        details_y = y_pos
-        box_width = (width - 120) / 2
-        box_height = 30
-
-        # Date box
-        p.setFillColor(gray_bg)
-        p.rect(60, details_y - box_height, box_width - 10, box_height, fill=1, stroke=0)
-        p.setFillColor(medium_text)
-        p.setFont("Helvetica", 8)
-        p.drawString(70, details_y - 10, "DATE")
-        p.setFillColor(dark_text)
-        p.setFont("Helvetica-Bold", 10)
-        p.drawString(70, details_y - 22, booking.travel_date.strftime("%b %d, %Y"))
-
-        # Bus box
-        p.setFillColor(gray_bg)
-        p.rect(
-            60 + box_width,
-            details_y - box_height,
-            box_width - 10,
-            box_height,
-            fill=1,
-            stroke=0,
+        pdf = ticket_pdf.render_tickets(
+            [ticket_pdf.ticket_fields(booking)],
+            generated=timezone.localtime().strftime("%d/%m/%Y %H:%M"),
         )
-        p.setFillColor(medium_text)
-        p.setFont("Helvetica", 8)
-        p.drawString(70 + box_width, details_y - 10, "BUS")
-        p.setFillColor(dark_text)
-        p.setFont("Helvetica-Bold", 10)
-        p.drawString(70 + box_width, details_y - 22, booking.bus.bus_name)
-
-        details_y -= 40
-
-        # Seat box
-        p.setFillColor(gray_bg)
-        p.rect(60, details_y - box_height, box_width - 10, box_height, fill=1, stroke=0)
-        p.setFillColor(medium_text)
-        p.setFont("Helvetica", 8)
-        p.drawString(70, details_y - 10, "SEAT")
-        p.setFillColor(blue_color)
-        p.setFont("Helvetica-Bold", 10)
-        p.drawString(
-            70,
-            details_y - 22,
-            booking.seat.seat_number if booking.seat else "Not assigned",
-        )
-
-        # Amount box
-        p.setFillColor(gray_bg)
-        p.rect(
-            60 + box_width,
-            details_y - box_height,
-            box_width - 10,
-            box_height,
-            fill=1,
-            stroke=0,
-        )
-        p.setFillColor(medium_text)
-        p.setFont("Helvetica", 8)
-        p.drawString(70 + box_width, details_y - 10, "AMOUNT")
-        p.setFillColor(dark_text)
-        p.setFont("Helvetica-Bold", 10)
-        p.drawString(70 + box_width, details_y - 22, f"Le {booking.amount_paid:.0f}")
-
-        y_pos = details_y - 60
-
-        # Passenger Information section
-        p.setStrokeColor(colors.lightgrey)
-        p.line(60, y_pos, width - 60, y_pos)
-        y_pos -= 20
-
-        p.setFillColor(medium_text)
-        p.setFont("Helvetica", 8)
-        p.drawString(60, y_pos, "PASSENGER")
-        y_pos -= 15
-
-        p.setFillColor(dark_text)
-        p.setFont("Helvetica-Bold", 12)
-        passenger_name = booking.customer.get_full_name() or booking.customer.username
-        p.drawString(60, y_pos, passenger_name)
-        y_pos -= 15
-
-        p.setFillColor(medium_text)
-        p.setFont("Helvetica", 10)
-        p.drawString(60, y_pos, booking.customer.email)
-
-        y_pos -= 40
-
-        # Payment Information section
-        p.setStrokeColor(colors.lightgrey)
-        p.line(60, y_pos, width - 60, y_pos)
-        y_pos -= 20
-
-        p.setFillColor(medium_text)
-        p.setFont("Helvetica", 8)
-        p.drawString(60, y_pos, "PAYMENT DETAILS")
-        y_pos -= 15
-
-        p.setFillColor(dark_text)
-        p.setFont("Helvetica", 10)
-        p.drawString(60, y_pos, f"Method: {booking.get_payment_method_display()}")
-
-        if booking.mobile_money_number:
-            y_pos -= 15
-            p.drawString(60, y_pos, f"Mobile Number: {booking.mobile_money_number}")
-
-        y_pos -= 15
-        p.setFillColor(blue_color)
-        p.setFont("Helvetica-Bold", 10)
-        p.drawString(60, y_pos, f"Amount: Le {booking.amount_paid:.0f}")
-
-        y_pos -= 40
-
-        # QR Code section
-        p.setStrokeColor(colors.lightgrey)
-        p.line(60, y_pos, width - 60, y_pos)
-        y_pos -= 20
-
-        # Generate QR code
-        qr_data = f"""WAKA-FINE BUS TICKET\nPNR: {booking.pnr_code}\nPassenger: {passenger_name}\nRoute: {booking.route.origin} to {booking.route.destination}\nDate: {booking.travel_date.strftime('%b %d, %Y %H:%M')}\nBus: {booking.bus.bus_name}\nSeat: {booking.seat.seat_number if booking.seat else 'Not assigned'}\nAmount: Le {booking.amount_paid:.0f}"""
-
-        try:
-            # Create QR code
-            qr = qrcode.QRCode(
-                version=1,
-                error_correction=qrcode.constants.ERROR_CORRECT_M,
-                box_size=3,
-                border=2,
-            )
-            qr.add_data(qr_data)
-            qr.make(fit=True)
-
-            # Create QR code image with blue color
-            blue_rgb = (
-                int(blue_color.red * 255),
-                int(blue_color.green * 255),
-                int(blue_color.blue * 255),
-            )
-            qr_img = qr.make_image(
-                image_factory=StyledPilImage,
-                color_mask=SolidFillColorMask(front_color=blue_rgb),
-            )
-
-            # Save QR code to buffer
-            qr_buffer = io.BytesIO()
-            qr_img.save(qr_buffer, format="PNG")
-            qr_buffer.seek(0)
-
-            # Draw QR code on PDF (centered)
-            qr_size = 80
-            qr_x = (width - qr_size) / 2
-            p.drawInlineImage(qr_buffer, qr_x, y_pos - qr_size - 20, qr_size, qr_size)
-
-            # QR code label
-            p.setFillColor(medium_text)
-            p.setFont("Helvetica", 8)
-            p.drawCentredText(
-                width / 2, y_pos - qr_size - 35, "Scan QR code for verification"
-            )
-
-        except Exception as e:
-            # Fallback text if QR code generation fails
-            p.setFillColor(gray_bg)
-            p.rect((width - 80) / 2, y_pos - 100, 80, 80, fill=1, stroke=1)
-            p.setFillColor(medium_text)
-            p.setFont("Helvetica", 8)
-            p.drawCentredText(width / 2, y_pos - 55, "QR Code")
-            p.drawCentredText(width / 2, y_pos - 65, booking.pnr_code)
-
-        y_pos -= 140
-
-        # Footer with blue background
-        footer_height = 40
-        p.setFillColor(blue_color)
-        p.rect(40, y_pos - footer_height, width - 80, footer_height, fill=1, stroke=0)
-
-        p.setFillColor(colors.white)
-        p.setFont("Helvetica", 8)
-        footer_text = "Please present this ticket at the boarding point. Keep your ID ready for verification."
-        p.drawCentredText(width / 2, y_pos - 15, footer_text)
-
-        support_text = f"Support: +232 785 45477 | Generated: {timezone.now().strftime('%d/%m/%Y %H:%M')}"
-        p.drawCentredText(width / 2, y_pos - 28, support_text)
-
-        # Finalize PDF
-        p.showPage()
-        p.save()
-
-        # Return PDF response
-        buffer.seek(0)
-        response = HttpResponse(buffer.getvalue(), content_type="application/pdf")
+        response = HttpResponse(pdf, content_type="application/pdf")
         response["Content-Disposition"] = (
             f'attachment; filename="ticket_{booking.pnr_code}.pdf"'
         )
@@ -881,24 +739,9 @@ class TicketView(DetailView):
         booking = self.get_object()
         context['google_maps_api_key'] = settings.GOOGLE_MAPS_API_KEY
 
-        # --- Server-Side QR Code Generation with Round Trip Support ---
-        passenger_name = booking.customer.get_full_name() or booking.customer.username
-        qr_data_string = f"""WAKA-FINE TICKET\nPNR: {booking.pnr_code}\nPassenger: {passenger_name}\nRoute: {booking.route.origin} to {booking.route.destination}\nDate: {booking.travel_date.strftime('%b %d, %Y at %H:%M')}\nBus: {booking.bus.bus_name}\nSeat: {booking.seat.seat_number}"""
-
-        # Add round trip information if it exists
-        if booking.trip_type == "round_trip":
-            qr_data_string += f"\nTrip Type: Round Trip"
-
-            if booking.return_date:
-                qr_data_string += f"\nReturn Date: {booking.return_date.strftime('%b %d, %Y at %H:%M')}"
-            if booking.return_bus:
-                qr_data_string += f"\nReturn Bus: {booking.return_bus.bus_name}"
-            if booking.return_seat:
-                qr_data_string += f"\nReturn Seat: {booking.return_seat.seat_number}"
-        else:
-            qr_data_string += f"\nTrip Type: One Way"
-
-        qr_data_string += f"""\nAmount: Le {booking.amount_paid}\nStatus: {booking.get_status_display()}"""
+        # --- Server-Side QR Code Generation ---
+        # The QR holds the signed ticket token that conductors verify offline.
+        qr_data_string = booking.ticket_token
 
         # Generate QR code image
         qr = qrcode.QRCode(
@@ -922,7 +765,7 @@ class TicketView(DetailView):
         # Encode the image in base64 and add to context
         qr_code_image = base64.b64encode(buffer.getvalue()).decode("utf-8")
         context["qr_code_image"] = qr_code_image
-        # --- End Server-Side QR Code Generation with Round Trip Support ---
+        # --- End Server-Side QR Code Generation ---
 
         # Show print button and nav only if not in print mode
         context["print_view"] = self.request.GET.get(
@@ -949,6 +792,10 @@ def get_route_buses_ajax(request):
 
             route = Route.objects.get(id=route_id)
             buses = Bus.objects.filter(assigned_route=route, is_active=True)
+            try:
+                travel_date = timezone.datetime.strptime(request.GET.get("date", ""), "%Y-%m-%d").date()
+            except ValueError:
+                travel_date = None  # today
 
             bus_data = []
             for bus in buses:
@@ -965,7 +812,7 @@ def get_route_buses_ajax(request):
                 {
                     "buses": bus_data,
                     "route_name": f"{route.origin} \u2192 {route.destination}",
-                    "route_price": float(route.price),
+                    "route_price": float(fares.fare(route, travel_date)),
                     "departure_time": route.departure_time.strftime("%H:%M"),
                     "arrival_time": route.arrival_time.strftime("%H:%M"),
                 }
@@ -979,6 +826,42 @@ def get_route_buses_ajax(request):
     return JsonResponse({"error": "Method not allowed"}, status=405)
 
 
+def get_fare_quote_ajax(request):
+    """AJAX view pricing a trip the way BookingForm.calculate_total_amount will."""
+    from routes.models import Route
+
+    def parse_date(name):
+        try:
+            return timezone.datetime.strptime(request.GET.get(name, ""), "%Y-%m-%d").date()
+        except ValueError:
+            return None
+
+    try:
+        route = Route.objects.get(id=request.GET.get("route_id"))
+    except (Route.DoesNotExist, ValueError):
+        return JsonResponse({"error": "Route not found"}, status=404)
+
+    fare_class = request.GET.get("fare_class") or fares.STANDARD
+    if fare_class not in dict(Booking._meta.get_field("fare_class").choices):
+        return JsonResponse({"error": "Unknown fare class"}, status=400)
+
+    # The legs of fares.quote(), priced separately for the summary.
+    travel_date = parse_date("travel_date")
+    outbound = fares.fare(route, travel_date, fare_class)
+    inbound = None
+    if request.GET.get("trip_type") == "round_trip":
+        inbound = fares.fare(
+            route, parse_date("return_date") or travel_date, fare_class, reverse=True
+        )
+    return JsonResponse(
+        {
+            "outbound": float(outbound),
+            "return": float(inbound) if inbound is not None else None,
+            "total": float(outbound + (inbound or 0)),
+        }
+    )
+
+
 class BookingDebugView(TemplateView):
     template_name = "bookings/debug.html"
 
@@ -1055,26 +938,111 @@ class BookingDebugView(TemplateView):
 
         return context
 
+class TripCrewRequiredMixin(LoginRequiredMixin, UserPassesTestMixin):
+    """Admin/staff users, or the driver assigned to the bus in the URL."""
+
+    def test_func(self):
+        user = self.request.user
+        if user.is_admin or user.is_staff_member or user.is_staff:
+            return True
+        from gps_tracking.models import Driver
+
+        return Driver.objects.filter(
+            user=user, assigned_bus_id=self.kwargs["bus_id"], is_active=True
+        ).exists()
+
+    def get_bus_and_date(self):
+        """The URL's bus and date; raises Http404 for either being invalid."""
+        from buses.models import Bus
+
+        bus = get_object_or_404(Bus, pk=self.kwargs["bus_id"])
+        try:
+            travel_date = timezone.datetime.strptime(self.kwargs["date"], "%Y-%m-%d").date()
+        except ValueError:
+            raise Http404("Date must be YYYY-MM-DD")
+        return bus, travel_date
+
+
+class TripManifestView(TripCrewRequiredMixin, View):
+    """
+    Download the ticket manifest for a bus on a date (JSON), for conductor
+    devices verifying QR tickets offline with bookings/ticket_verify.py.
+    """
+
+    def get(self, request, bus_id, date):
+        bus, travel_date = self.get_bus_and_date()
+        response = JsonResponse(ticket_token.build_manifest(bus, travel_date))
+        response["Content-Disposition"] = (
+            f'attachment; filename="manifest-{bus.bus_number}-{travel_date}.json"'
+        )
+        response["Cache-Control"] = "no-store"
+        return response
+
+
+class BoardingManifestView(TripCrewRequiredMixin, View):
+    """
+    Printable boarding manifest for a bus on a date, as PDF or CSV. PDFs
+    precomputed by ``manage.py precompute_manifests`` are served directly
+    while the bookings are unchanged.
+    """
+
+    def get(self, request, bus_id, date, fmt):
+        bus, travel_date = self.get_bus_and_date()
+        filename = f"boarding-{bus.bus_number}-{travel_date}.{fmt}"
+
+        if fmt == "csv":
+            rows = manifests.manifest_rows(bus, travel_date)
+            response = StreamingHttpResponse(
+                manifests.iter_csv(rows), content_type="text/csv"
+            )
+            response["Content-Disposition"] = f'attachment; filename="{filename}"'
+            return response
+        if fmt != "pdf":
+            raise Http404("Unknown manifest format")
+
+        pdf = manifests.stored_pdf(bus, travel_date) or manifests.render_pdf(bus, travel_date)
+        return FileResponse(pdf, filename=filename, content_type="application/pdf")
+
+
+def _tracking_response(request, entry, position):
+    """Tracking JSON for ``entry`` at ``position``, or a 304 if unchanged."""
+    if entry is None:
+        return JsonResponse({'success': False, 'error': 'Booking not found.'}, status=404)
+    if position is None:
+        return JsonResponse({'success': False, 'error': 'No location data available for this booking.'}, status=404)
+
+    etag = tracking.etag(entry, position)
+    last_modified = int(position['epoch'])
+    not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if not_modified is not None:
+        not_modified['ETag'] = etag
+        return not_modified
+
+    response = JsonResponse(tracking.tracking_payload(entry, position))
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    patch_cache_control(response, private=True, max_age=TRACKING_MAX_AGE)
+    return response
+
+
 def track_booking_by_pnr(request, pnr_code):
+    """
+    Live position of the bus for a booking, for passengers refreshing the
+    tracking modal. Served from the PNR index and live position caches, with
+    ETag / Last-Modified so unchanged positions answer 304.
+    """
     try:
-        booking = get_object_or_404(Booking, pnr_code=pnr_code)
-        bus = booking.bus
-        latest_location = BusLocation.objects.filter(bus=bus).order_by('-timestamp').first()
-
-        if latest_location:
-            return JsonResponse({
-                'success': True,
-                'pnr_code': booking.pnr_code,
-                'bus_id': bus.id,
-                'bus_name': bus.bus_name,
-                'latitude': latest_location.latitude,
-                'longitude': latest_location.longitude,
-                'speed': latest_location.speed,
-                'timestamp': latest_location.timestamp,
-            })
-        else:
-            return JsonResponse({'success': False, 'error': 'No location data available for this booking.'}, status=404)
-    except Booking.DoesNotExist:
-        return JsonResponse({'success': False, 'error': 'Booking not found.'}, status=404)
+        entry = tracking.lookup(pnr_code)
+        position = live.current_position(entry['bus_id']) if entry else None
+        return _tracking_response(request, entry, position)
+    except Exception as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=500)
+
+async def track_booking_by_pnr_async(request, pnr_code):
+    """Async version of track_booking_by_pnr for the ASGI deployment."""
+    try:
+        entry = await tracking.alookup(pnr_code)
+        position = await live.acurrent_position(entry['bus_id']) if entry else None
+        return _tracking_response(request, entry, position)
     except Exception as e:
-        return JsonResponse({'success': False, 'error': str(e)}, status=500)
\ No newline at end of file
+        return JsonResponse({'success': False, 'error': str(e)}, status=500)
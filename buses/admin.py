@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Bus, Seat
+from .models import Bus, Seat, SeatLayout
 
 
 class SeatInline(admin.TabularInline):
@@ -22,13 +22,14 @@ class BusAdmin(admin.ModelAdmin):
     list_filter = ("bus_type", "is_active", "assigned_driver")
     search_fields = ("bus_name", "bus_number", "assigned_driver__user__first_name", "assigned_driver__user__last_name")
     list_editable = ("is_active",)
+    list_select_related = ("assigned_route", "assigned_driver__user")
     inlines = [SeatInline]
     
     readonly_fields = ("current_latitude", "current_longitude", "last_location_update", "gps_device_id", "driver_info_display")
     
     fieldsets = (
         ("Basic Information", {
-            "fields": ("bus_name", "bus_number", "bus_type", "seat_capacity", "is_active")
+            "fields": ("bus_name", "bus_number", "bus_type", "seat_capacity", "layout", "is_active")
         }),
         ("Route & Driver Assignment", {
             "fields": ("assigned_route", "assigned_driver", "driver_info_display")
@@ -44,6 +45,10 @@ class BusAdmin(admin.ModelAdmin):
         }),
     )
     
+    def get_queryset(self, request):
+        # Seats booked today and the latest GPS fix in the changelist query
+        return super().get_queryset(request).with_live_stats()
+
     def assigned_driver_display(self, obj):
         if obj.assigned_driver:
             return f"{obj.assigned_driver.user.first_name} {obj.assigned_driver.user.last_name}"
@@ -63,3 +68,9 @@ class SeatAdmin(admin.ModelAdmin):
     list_display = ("bus", "seat_number", "is_window", "is_available")
     list_filter = ("bus", "is_window", "is_available")
     search_fields = ("bus__bus_name", "seat_number")
+
+
+@admin.register(SeatLayout)
+class SeatLayoutAdmin(admin.ModelAdmin):
+    list_display = ("name", "bus_type", "seat_count", "updated_at")
+    search_fields = ("name",)
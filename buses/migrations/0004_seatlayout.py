@@ -0,0 +1,29 @@
+# Generated by Django 5.2.1 on 2026-10-19 13:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('buses', '0003_bus_assigned_driver_alter_bus_current_driver_name_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SeatLayout',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('bus_type', models.CharField(blank=True, help_text='Bus type that gets this layout by default', max_length=20)),
+                ('plan', models.TextField(help_text='One line per row: W window seat, S seat, . aisle')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='bus',
+            name='layout',
+            field=models.ForeignKey(blank=True, help_text='Seating plan; seats are generated from it', null=True, on_delete=django.db.models.deletion.PROTECT, related_name='buses', to='buses.seatlayout'),
+        ),
+    ]
@@ -0,0 +1,40 @@
+from django.db import migrations
+
+# The layouts generate_seats used to hard-code.
+DEFAULT_LAYOUTS = [
+    ("Mini bus (14 seats)", "mini", ["WS.SW", "WS.SW", "WS.SW", "W...W"]),
+    ("Standard bus (25 seats)", "standard", ["WS.SW"] * 6 + ["W"]),
+    ("Large bus (35 seats)", "large", ["WS.SW"] * 8 + ["W.S.W"]),
+]
+
+
+def create_layouts(apps, schema_editor):
+    SeatLayout = apps.get_model("buses", "SeatLayout")
+    Bus = apps.get_model("buses", "Bus")
+    for name, bus_type, rows in DEFAULT_LAYOUTS:
+        layout, _ = SeatLayout.objects.get_or_create(
+            name=name, defaults={"bus_type": bus_type, "plan": "\n".join(rows)}
+        )
+        seat_count = sum(row.count("W") + row.count("S") for row in rows)
+        Bus.objects.filter(
+            bus_type=bus_type, seat_capacity=seat_count, layout__isnull=True
+        ).update(layout=layout)
+
+
+def remove_layouts(apps, schema_editor):
+    SeatLayout = apps.get_model("buses", "SeatLayout")
+    Bus = apps.get_model("buses", "Bus")
+    names = [name for name, _, _ in DEFAULT_LAYOUTS]
+    Bus.objects.filter(layout__name__in=names).update(layout=None)
+    SeatLayout.objects.filter(name__in=names).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("buses", "0004_seatlayout"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_layouts, remove_layouts),
+    ]
@@ -1,8 +1,108 @@
 from django.db import models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
 from django.core.exceptions import ValidationError
+from django.utils import timezone
 from routes.models import Route
 
 
+class BusQuerySet(models.QuerySet):
+    def with_live_stats(self, date=None):
+        """Annotate confirmed seats booked on ``date`` (default today) and the
+        latest fix's speed and moving flag, as correlated subqueries in the
+        same SELECT. ``available_seats``, ``latest_speed`` and ``is_moving``
+        then read the annotations instead of querying per bus.
+        """
+        from bookings.models import Booking
+        from gps_tracking.models import BusLocation
+
+        date = date or timezone.now().date()
+        booked = (
+            Booking.objects.filter(bus=OuterRef("pk"), travel_date__date=date, status="confirmed")
+            .order_by()
+            .values("bus")
+            .annotate(count=Count("pk"))
+            .values("count")
+        )
+        latest = BusLocation.objects.filter(bus=OuterRef("pk")).order_by("-timestamp")
+        return self.annotate(
+            seats_booked=Coalesce(Subquery(booked), Value(0)),
+            live_speed=Subquery(latest.values("speed")[:1]),
+            live_is_moving=Subquery(latest.values("is_moving")[:1]),
+        )
+
+
+class SeatLayout(models.Model):
+    """
+    A seating plan shared by every bus built the same way.
+
+    ``plan`` has one line per row, front to back, one character per column:
+    ``W`` a window seat, ``S`` any other seat, ``.`` the aisle or an empty
+    position. Seats are numbered 1, 2, 3... reading the rows left to right,
+    so a bus's seat numbers index straight into the plan.
+    """
+
+    SEAT_CHARS = {"W": True, "S": False}
+    GAP = "."
+
+    name = models.CharField(max_length=50, unique=True)
+    bus_type = models.CharField(
+        max_length=20,
+        blank=True,
+        help_text="Bus type that gets this layout by default",
+    )
+    plan = models.TextField(help_text="One line per row: W window seat, S seat, . aisle")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} ({self.seat_count} seats)"
+
+    @property
+    def rows(self):
+        return [line.strip() for line in self.plan.strip().splitlines() if line.strip()]
+
+    def clean(self):
+        rows = self.rows
+        if not rows:
+            raise ValidationError("A layout needs at least one row.")
+        allowed = set(self.SEAT_CHARS) | {self.GAP}
+        for number, row in enumerate(rows, start=1):
+            if set(row) - allowed:
+                raise ValidationError(
+                    f"Row {number} may only contain W, S and '.' characters."
+                )
+        self.plan = "\n".join(rows)
+
+    def save(self, *args, **kwargs):
+        self.clean()
+        super().save(*args, **kwargs)
+
+    def positions(self):
+        """``(seat number, is_window, row, column)`` for every seat, in number order."""
+        positions = []
+        for row_index, row in enumerate(self.rows):
+            for column, char in enumerate(row):
+                if char in self.SEAT_CHARS:
+                    positions.append(
+                        (len(positions) + 1, self.SEAT_CHARS[char], row_index, column)
+                    )
+        return positions
+
+    @property
+    def seat_count(self):
+        return sum(char in self.SEAT_CHARS for char in self.plan)
+
+    def build_seats(self, bus):
+        """Unsaved ``Seat`` rows for ``bus``; pass them to ``bulk_create``."""
+        return [
+            Seat(bus=bus, seat_number=str(number), is_window=is_window, is_available=True)
+            for number, is_window, _, _ in self.positions()
+        ]
+
+    def as_json(self):
+        return {"id": self.pk, "name": self.name, "rows": self.rows}
+
+
 class Bus(models.Model):
     BUS_TYPE_CHOICES = [
         ("mini", "Mini Bus (14 seats)"),
@@ -16,6 +116,14 @@ class Bus(models.Model):
         max_length=20, choices=BUS_TYPE_CHOICES, default="standard"
     )
     seat_capacity = models.PositiveIntegerField()
+    layout = models.ForeignKey(
+        SeatLayout,
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name="buses",
+        help_text="Seating plan; seats are generated from it",
+    )
     assigned_route = models.ForeignKey(
         Route, on_delete=models.SET_NULL, null=True, blank=True
     )
@@ -72,9 +180,28 @@ class Bus(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = BusQuerySet.as_manager()
+
+    # Written on every GPS fix; saving only these keeps cached driver assignments.
+    LIVE_POSITION_FIELDS = {"current_latitude", "current_longitude", "last_location_update"}
+
     def __str__(self):
         return f"{self.bus_name} ({self.bus_number})"
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is None or not set(update_fields) <= self.LIVE_POSITION_FIELDS:
+            from gps_tracking.assignments import forget_bus
+
+            forget_bus(self)
+
+    def delete(self, *args, **kwargs):
+        from gps_tracking.assignments import forget_bus
+
+        forget_bus(self)
+        return super().delete(*args, **kwargs)
+
     @property
     def driver_name(self):
         """Get the name of the assigned driver"""
@@ -92,7 +219,9 @@ class Bus(models.Model):
     @property
     def available_seats(self):
         from bookings.models import Booking
-        from django.utils import timezone
+
+        if "seats_booked" in self.__dict__:
+            return self.seat_capacity - self.seats_booked
 
         # Get today's bookings for this bus
         today_bookings = Booking.objects.filter(
@@ -116,6 +245,8 @@ class Bus(models.Model):
     @property
     def latest_speed(self):
         """Get the latest recorded speed from location history"""
+        if 'live_speed' in self.__dict__:
+            return self.live_speed or 0
         if hasattr(self, 'location_history'):
             latest = self.location_history.order_by('-timestamp').first()
             return latest.speed if latest else 0
@@ -124,6 +255,8 @@ class Bus(models.Model):
     @property
     def is_moving(self):
         """Check if bus is currently moving based on latest location data"""
+        if 'live_is_moving' in self.__dict__:
+            return bool(self.live_is_moving)
         if hasattr(self, 'location_history'):
             latest = self.location_history.order_by('-timestamp').first()
             return latest.is_moving if latest else False
@@ -131,8 +264,6 @@ class Bus(models.Model):
     
     def update_location(self, latitude, longitude, speed=0, **kwargs):
         """Update bus location and create location history record"""
-        from django.utils import timezone
-        
         self.current_latitude = latitude
         self.current_longitude = longitude
         self.last_location_update = timezone.now()
@@ -11,4 +11,5 @@ urlpatterns = [
     path("<int:pk>/delete/", views.BusDeleteView.as_view(), name="delete"),
     path("<int:pk>/seats/", views.BusSeatView.as_view(), name="seats"),
     path("ajax/seats/<int:bus_id>/", views.get_bus_seats_ajax, name="ajax_seats"),
+    path("layouts/<int:pk>/", views.SeatLayoutView.as_view(), name="layout"),
 ]
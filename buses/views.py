@@ -12,7 +12,10 @@ from django.urls import reverse_lazy
 from django.contrib import messages
 from django.utils import timezone
 from django.http import JsonResponse
-from .models import Bus, Seat
+from django.utils.cache import patch_cache_control
+from django.views import View
+from .models import Bus, Seat, SeatLayout
+from .seatmap import seat_map, seat_map_payload
 
 
 class AdminRequiredMixin(LoginRequiredMixin, UserPassesTestMixin):
@@ -38,6 +41,9 @@ class BusDetailView(DetailView):
     template_name = "buses/detail.html"
     context_object_name = "bus"
 
+    def get_queryset(self):
+        return Bus.objects.with_live_stats().select_related("assigned_route")
+
 
 class BusSeatView(TemplateView):
     template_name = "buses/seats.html"
@@ -54,34 +60,19 @@ class BusSeatView(TemplateView):
 
     def get_seat_availability(self, bus, travel_date):
         """Get seats with availability status"""
-        from bookings.models import Booking
-
-        seats = bus.seats.all().order_by("seat_number")
-        booked_seats = Booking.objects.filter(
-            bus=bus, travel_date__date=travel_date, status__in=["confirmed", "pending"]
-        ).values_list("seat_id", flat=True)
-
-        seat_data = []
-        for seat in seats:
-            seat_data.append(
-                {
-                    "id": seat.id,
-                    "number": seat.seat_number,
-                    "is_window": seat.is_window,
-                    "is_available": seat.is_available and seat.id not in booked_seats,
-                    "is_booked": seat.id in booked_seats,
-                }
-            )
-
-        return seat_data
+        return seat_map(bus, travel_date)
 
     def get(self, request, *args, **kwargs):
         # Handle AJAX requests for seat availability
         if request.headers.get("X-Requested-With") == "XMLHttpRequest":
-            bus = get_object_or_404(Bus, pk=kwargs["pk"], is_active=True)
+            bus = get_object_or_404(
+                Bus.objects.select_related("layout"), pk=kwargs["pk"], is_active=True
+            )
             travel_date = request.GET.get("date", timezone.now().date())
-            seats = self.get_seat_availability(bus, travel_date)
-            return JsonResponse({"seats": seats})
+            payload = seat_map_payload(
+                bus, travel_date, compact=request.GET.get("format") == "compact"
+            )
+            return JsonResponse(payload)
 
         return super().get(request, *args, **kwargs)
 
@@ -89,7 +80,9 @@ class BusSeatView(TemplateView):
 def get_bus_seats_ajax(request, bus_id):
     """AJAX endpoint for getting bus seat availability"""
     if request.method == "GET":
-        bus = get_object_or_404(Bus, pk=bus_id, is_active=True)
+        bus = get_object_or_404(
+            Bus.objects.select_related("layout"), pk=bus_id, is_active=True
+        )
         travel_date = request.GET.get("date", timezone.now().date())
 
         # Convert string date to date object if needed
@@ -99,37 +92,28 @@ def get_bus_seats_ajax(request, bus_id):
             except ValueError:
                 travel_date = timezone.now().date()
 
-        from bookings.models import Booking
-
-        seats = bus.seats.all().order_by("seat_number")
-        booked_seats = Booking.objects.filter(
-            bus=bus, travel_date__date=travel_date, status__in=["confirmed", "pending"]
-        ).values_list("seat_id", flat=True)
-
-        seat_data = []
-        for seat in seats:
-            seat_data.append(
-                {
-                    "id": seat.id,
-                    "number": seat.seat_number,
-                    "is_window": seat.is_window,
-                    "is_available": seat.is_available and seat.id not in booked_seats,
-                    "is_booked": seat.id in booked_seats,
-                }
-            )
-
-        return JsonResponse(
-            {
-                "success": True,
-                "seats": seat_data,
-                "bus_name": bus.bus_name,
-                "total_seats": bus.total_seats,
-            }
+        payload = seat_map_payload(
+            bus, travel_date, compact=request.GET.get("format") == "compact"
         )
+        return JsonResponse({"success": True, **payload, "bus_name": bus.bus_name})
 
     return JsonResponse({"success": False, "error": "Invalid request method"})
 
 
+
+class SeatLayoutView(View):
+    """A shared seat layout, for decoding compact seat maps on the client."""
+
+    # Compact seat maps link here with ?v=<updated_at>, so edits get a new URL.
+    max_age = 7 * 24 * 60 * 60
+
+    def get(self, request, pk):
+        layout = get_object_or_404(SeatLayout, pk=pk)
+        response = JsonResponse(layout.as_json())
+        patch_cache_control(response, public=True, max_age=self.max_age)
+        return response
+
+
 class BusCreateView(AdminRequiredMixin, CreateView):
     model = Bus
     template_name = "buses/create.html"
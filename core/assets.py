@@ -0,0 +1,103 @@
+"""
+JavaScript bundles built from ``static/js``.
+
+Each bundle concatenates its sources in order and minifies them with
+``rjsmin``. Bundles are written to ``static/bundles/`` under a name carrying
+a hash of their contents (``public-map.<hash>.min.js``), next to
+``manifest.json``, which maps each bundle name to its current file. Both are
+committed, so there is no build step in development or on Vercel, whose
+build never runs ``collectstatic`` and whose ``/static/`` route serves files
+as immutable for a year: every change to a bundle is a new URL. Templates
+load the current file with ``{% bundle "public-map.min.js" %}`` (the
+``bundles`` tag library). Where the deploy runs ``STATIC_MANIFEST=1 python
+manage.py build_assets`` with the production settings, ``collectstatic``
+also writes ``.gz`` and ``.br`` (with ``Brotli`` installed) files next to
+each asset through WhiteNoise's ``CompressedManifestStaticFilesStorage``,
+which WhiteNoise serves from ``STATIC_ROOT`` to browsers that accept them.
+
+Run ``python manage.py build_assets`` (or ``npm run build``) after editing a
+source script.
+"""
+
+import hashlib
+import json
+from pathlib import Path
+
+from django.conf import settings
+
+BUNDLE_DIR = "bundles"
+MANIFEST_NAME = "manifest.json"
+BUNDLE_SUFFIX = ".min.js"
+HASH_LENGTH = 12
+
+_manifest = {}  # manifest path -> (mtime, {bundle name: file name})
+
+# Output name under static/bundles/ -> sources under static/, in order.
+ASSET_BUNDLES = {
+    "public-map.min.js": ["js/pages/public_map.js"],
+    "ticket-qr.min.js": ["js/waka-fine-qr.js"],
+}
+
+
+def source_root():
+    return Path(settings.STATICFILES_DIRS[0])
+
+
+def minify_js(source):
+    from rjsmin import jsmin
+
+    return jsmin(source, keep_bang_comments=True)
+
+
+def hashed_name(name, output):
+    """``public-map.min.js`` -> ``public-map.<hash of output>.min.js``."""
+    digest = hashlib.sha256(output.encode()).hexdigest()[:HASH_LENGTH]
+    return f"{name.removesuffix(BUNDLE_SUFFIX)}.{digest}{BUNDLE_SUFFIX}"
+
+
+def build_bundle(name, sources, root=None):
+    """Write one bundle and return ``(path, source_bytes, bundle_bytes)``.
+
+    Older builds of the same bundle are removed.
+    """
+    root = Path(root or source_root())
+    parts = [(root / source).read_text(encoding="utf-8") for source in sources]
+    # ";" between sources guards against one that does not end its last statement.
+    output = ";\n".join(minify_js(part).strip() for part in parts) + "\n"
+    path = root / BUNDLE_DIR / hashed_name(name, output)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    for stale in path.parent.glob(f"{name.removesuffix(BUNDLE_SUFFIX)}.*{BUNDLE_SUFFIX}"):
+        if stale != path:
+            stale.unlink()
+    (path.parent / name).unlink(missing_ok=True)
+    path.write_text(output, encoding="utf-8")
+    return path, sum(len(part.encode()) for part in parts), len(output.encode())
+
+
+def build_all(root=None):
+    """Build every bundle in ``ASSET_BUNDLES`` and write the manifest.
+
+    Yields ``build_bundle()`` results.
+    """
+    root = Path(root or source_root())
+    files = {}
+    for name, sources in ASSET_BUNDLES.items():
+        result = build_bundle(name, sources, root)
+        files[name] = result[0].name
+        yield result
+    manifest = root / BUNDLE_DIR / MANIFEST_NAME
+    manifest.write_text(json.dumps(files, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+
+
+def bundle_path(name, root=None):
+    """Static path of the current build of bundle ``name``, e.g. for ``static()``."""
+    manifest = Path(root or source_root()) / BUNDLE_DIR / MANIFEST_NAME
+    mtime = manifest.stat().st_mtime
+    cached = _manifest.get(manifest)
+    if cached is None or cached[0] != mtime:
+        cached = (mtime, json.loads(manifest.read_text(encoding="utf-8")))
+        _manifest[manifest] = cached
+    try:
+        return f"{BUNDLE_DIR}/{cached[1][name]}"
+    except KeyError:
+        raise ValueError(f"Bundle {name!r} is not built; run manage.py build_assets")
@@ -0,0 +1,92 @@
+"""
+Signed-in users from the cache.
+
+``AuthenticationMiddleware`` loads ``request.user`` with a ``User`` query on
+every authenticated request. ``CachedAuthenticationMiddleware`` keeps the
+user in the default cache for ``IDENTITY_CACHE_SECONDS`` instead.
+``User.save()`` and ``User.delete()`` drop the entry (``forget_user``).
+
+The session is still checked against the cached user's auth hash and
+``is_active`` on every request, so a password change logs out other
+sessions as before. On a miss or a mismatch the lookup goes through
+``django.contrib.auth.get_user`` unchanged: fallback secrets, session flush
+and all. Invalidation reaches other processes only through a shared cache,
+so settings leave this off without one; ``QuerySet.update()`` on users is
+picked up when the entry expires. With ``cached_db`` sessions on a shared
+cache (see settings), a signed-in request then needs no query for either
+its session or its user.
+"""
+
+from functools import partial
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib import auth
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.core.cache import cache
+from django.utils.crypto import constant_time_compare
+from django.utils.functional import SimpleLazyObject
+
+from core import metrics
+
+
+def cache_seconds():
+    return getattr(settings, "IDENTITY_CACHE_SECONDS", 0)
+
+
+def user_key(user_id):
+    return f"auth-user:{user_id}"
+
+
+def forget_user(user_id):
+    cache.delete(user_key(user_id))
+
+
+def session_verified(request, user):
+    session_hash = request.session.get(HASH_SESSION_KEY)
+    return bool(session_hash) and constant_time_compare(
+        session_hash, user.get_session_auth_hash()
+    )
+
+
+def get_user(request):
+    """``auth.get_user(request)``, served from the cache when the session still matches."""
+    timeout = cache_seconds()
+    try:
+        user_id = request.session[SESSION_KEY]
+        backend_path = request.session[BACKEND_SESSION_KEY]
+    except KeyError:
+        return auth.get_user(request)  # anonymous; no query
+
+    if timeout and backend_path in settings.AUTHENTICATION_BACKENDS:
+        user = cache.get(user_key(user_id))
+        metrics.record_cache("identity", user is not None)
+        if user is not None and user.is_active and session_verified(request, user):
+            return user
+
+    user = auth.get_user(request)
+    if timeout and user.is_authenticated:
+        cache.set(user_key(user.pk), user, timeout)
+    return user
+
+
+def request_user(request):
+    if not hasattr(request, "_cached_user"):
+        request._cached_user = get_user(request)
+    return request._cached_user
+
+
+async def arequest_user(request):
+    if not hasattr(request, "_acached_user"):
+        request._acached_user = await sync_to_async(get_user)(request)
+    return request._acached_user
+
+
+class CachedAuthenticationMiddleware(AuthenticationMiddleware):
+    """``AuthenticationMiddleware`` whose user lookup goes through ``get_user`` above."""
+
+    def process_request(self, request):
+        super().process_request(request)
+        request.user = SimpleLazyObject(lambda: request_user(request))
+        request.auser = partial(arequest_user, request)
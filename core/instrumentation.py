@@ -0,0 +1,284 @@
+"""
+Request instrumentation: query counts, DB time, N+1 detection and timings.
+
+``InstrumentationMiddleware`` profiles a sampled fraction of requests. For a
+sampled request an ``execute_wrapper`` on every database connection times
+each query and counts repeated SQL (the same statement with different
+parameters is what an N+1 loop looks like), template rendering is timed, and
+any ``span()`` blocks opened by the view (e.g. JSON serialisation) are
+collected. The result is
+
+* sent back as a ``Server-Timing`` header, visible in browser dev tools,
+* logged as one JSON line on the ``wakafine.instrumentation`` logger,
+* folded into per-view totals shown on the admin performance page.
+
+Unsampled requests only pay for one ``random.random()`` call.
+
+Settings (all optional):
+  INSTRUMENTATION_ENABLED              default True
+  INSTRUMENTATION_SAMPLE_RATE          fraction of requests profiled, default 1.0
+  INSTRUMENTATION_SLOW_QUERY_MS        queries slower than this are logged, default 100
+  INSTRUMENTATION_DUPLICATE_THRESHOLD  repeats of one statement flagged as N+1, default 3
+  INSTRUMENTATION_SERVER_TIMING        emit the Server-Timing header, default True
+"""
+
+import json
+import logging
+import random
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+logger = logging.getLogger("wakafine.instrumentation")
+
+_current = ContextVar("request_profile", default=None)
+
+
+def _setting(name, default):
+    return getattr(settings, f"INSTRUMENTATION_{name}", default)
+
+
+class RequestProfile:
+    """Timings and query statistics collected for one request."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_ms = 0.0
+        self.statements = Counter()
+        self.slow_queries = []
+        self.spans = {}
+
+    def add_span(self, name, elapsed_ms):
+        self.spans[name] = self.spans.get(name, 0.0) + elapsed_ms
+
+    def duplicates(self, threshold):
+        return {sql: count for sql, count in self.statements.items() if count >= threshold}
+
+    def __call__(self, execute, sql, params, many, context):
+        # execute_wrapper hook
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = (time.perf_counter() - start) * 1000
+            self.queries += 1
+            self.db_ms += elapsed
+            self.statements[sql] += 1
+            if elapsed >= _setting("SLOW_QUERY_MS", 100):
+                self.slow_queries.append((round(elapsed, 2), sql))
+
+
+def current_profile():
+    """Return the profile of the request being handled, or None if unsampled."""
+    return _current.get()
+
+
+@contextmanager
+def span(name):
+    """Time a block of view code under ``name`` when the request is sampled."""
+    profile = _current.get()
+    if profile is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.add_span(name, (time.perf_counter() - start) * 1000)
+
+
+class ViewStats:
+    """Per-process running totals per view, used for the top offenders page."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._views = {}
+        self.since = time.time()
+
+    def record(self, view, status, total_ms, profile, duplicates):
+        with self._lock:
+            row = self._views.get(view)
+            if row is None:
+                row = self._views[view] = {
+                    "view": view,
+                    "requests": 0,
+                    "total_ms": 0.0,
+                    "db_ms": 0.0,
+                    "queries": 0,
+                    "max_queries": 0,
+                    "max_ms": 0.0,
+                    "n_plus_one": 0,
+                    "errors": 0,
+                    "worst_statement": "",
+                }
+            row["requests"] += 1
+            row["total_ms"] += total_ms
+            row["db_ms"] += profile.db_ms
+            row["queries"] += profile.queries
+            row["max_queries"] = max(row["max_queries"], profile.queries)
+            row["max_ms"] = max(row["max_ms"], total_ms)
+            if status >= 500:
+                row["errors"] += 1
+            if duplicates:
+                row["n_plus_one"] += 1
+                row["worst_statement"] = max(duplicates, key=duplicates.get)
+
+    def top(self, order_by="total_ms", limit=25):
+        with self._lock:
+            rows = [dict(row) for row in self._views.values()]
+        for row in rows:
+            requests = row["requests"]
+            row["avg_ms"] = row["total_ms"] / requests
+            row["avg_db_ms"] = row["db_ms"] / requests
+            row["avg_queries"] = row["queries"] / requests
+        rows.sort(key=lambda row: row[order_by], reverse=True)
+        return rows[:limit]
+
+    def reset(self):
+        with self._lock:
+            self._views.clear()
+            self.since = time.time()
+
+
+view_stats = ViewStats()
+
+
+def _view_name(request):
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return None
+    return match.view_name or match._func_path
+
+
+def server_timing(profile, total_ms, duplicates):
+    parts = [f'db;dur={profile.db_ms:.1f};desc="{profile.queries} queries"']
+    for name, elapsed in profile.spans.items():
+        parts.append(f"{name};dur={elapsed:.1f}")
+    if duplicates:
+        parts.append(f'dup;desc="{sum(duplicates.values())} repeated queries"')
+    parts.append(f"total;dur={total_ms:.1f}")
+    return ", ".join(parts)
+
+
+def _sampled():
+    return _setting("ENABLED", True) and random.random() < _setting("SAMPLE_RATE", 1.0)
+
+
+def _execute_hook(execute, sql, params, many, context):
+    profile = _current.get()
+    if profile is None:
+        return execute(sql, params, many, context)
+    return profile(execute, sql, params, many, context)
+
+
+def _install_hook(sender, connection, **kwargs):
+    # Connections are per thread and async ORM calls run in a worker thread,
+    # so every connection carries the hook; the request's profile reaches it
+    # through the context variable, which sync_to_async copies across.
+    if _execute_hook not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_execute_hook)
+
+
+connection_created.connect(_install_hook, dispatch_uid="core.instrumentation")
+
+
+@contextmanager
+def _profiling(profile):
+    """Make ``profile`` current for the queries of every database alias."""
+    for alias in connections:
+        _install_hook(None, connections[alias])
+    token = _current.set(profile)
+    try:
+        yield
+    finally:
+        _current.reset(token)
+
+
+class InstrumentationMiddleware:
+    """Profile a sample of requests; see the module docstring.
+
+    Runs natively in both modes, so under ASGI async views are not pushed
+    through a sync thread by this middleware.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not _sampled():
+            return self.get_response(request)
+
+        profile = RequestProfile()
+        with _profiling(profile):
+            response = self.get_response(request)
+        return self.finish(request, response, profile)
+
+    async def __acall__(self, request):
+        if not _sampled():
+            return await self.get_response(request)
+
+        profile = RequestProfile()
+        with _profiling(profile):
+            response = await self.get_response(request)
+        return self.finish(request, response, profile)
+
+    def finish(self, request, response, profile):
+        total_ms = (time.perf_counter() - profile.started) * 1000
+        duplicates = profile.duplicates(_setting("DUPLICATE_THRESHOLD", 3))
+        view = _view_name(request)
+        if view is not None:
+            # Static files and 404s never resolve; keep them off the offenders list.
+            view_stats.record(view, response.status_code, total_ms, profile, duplicates)
+
+        if _setting("SERVER_TIMING", True):
+            response["Server-Timing"] = server_timing(profile, total_ms, duplicates)
+
+        logger.info(json.dumps({
+            "event": "request_profile",
+            "view": view,
+            "method": request.method,
+            "path": request.path,
+            "status": response.status_code,
+            "total_ms": round(total_ms, 2),
+            "db_ms": round(profile.db_ms, 2),
+            "queries": profile.queries,
+            "spans": {name: round(value, 2) for name, value in profile.spans.items()},
+            "duplicates": len(duplicates),
+            "duplicated_queries": sum(duplicates.values()),
+        }))
+        for elapsed, sql in profile.slow_queries:
+            logger.warning(json.dumps({
+                "event": "slow_query", "view": view, "ms": elapsed, "sql": sql[:500],
+            }))
+        return response
+
+    def process_template_response(self, request, response):
+        # TemplateResponse renders after the view returns, so it can be timed
+        # separately. Views that call render() directly report it as view time.
+        profile = _current.get()
+        if profile is not None:
+            render = response.render
+
+            def timed_render():
+                del response.render
+                with span("render"):
+                    return render()
+
+            response.render = timed_render
+        return response
@@ -0,0 +1,134 @@
+"""
+Prometheus metrics for fleet and booking throughput.
+
+Metrics are plain ``prometheus_client`` counters and histograms, updated in
+process with no I/O on the request path. ``/metrics`` renders them in the
+Prometheus text format.
+
+Multi-process servers (gunicorn with several workers) must export
+``PROMETHEUS_MULTIPROC_DIR`` pointing at an empty, writable directory before
+the workers start. ``prometheus_client`` then keeps each worker's values in
+small memory-mapped files in that directory and ``/metrics`` sums them, so
+any worker can answer the scrape. Clear the directory on deploy and add a
+gunicorn ``child_exit`` hook calling ``mark_worker_dead(worker.pid)``.
+
+If ``prometheus_client`` is not installed every metric is a no-op and
+``/metrics`` returns 503, so the app still starts.
+"""
+
+import os
+import time
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+
+try:
+    import prometheus_client
+    from prometheus_client import CollectorRegistry, Counter, Histogram
+    from prometheus_client import multiprocess
+except ImportError:  # pragma: no cover - optional dependency
+    prometheus_client = None
+
+
+# Bucket edges in seconds, tuned per operation.
+FAST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+RENDER_BUCKETS = (0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class _NoopMetric:
+    def labels(self, *args, **kwargs):
+        return self
+
+    def inc(self, amount=1):
+        pass
+
+    def observe(self, amount):
+        pass
+
+
+def _counter(name, documentation, labelnames=()):
+    if prometheus_client is None:
+        return _NoopMetric()
+    return Counter(name, documentation, labelnames)
+
+
+def _histogram(name, documentation, labelnames=(), buckets=FAST_BUCKETS):
+    if prometheus_client is None:
+        return _NoopMetric()
+    return Histogram(name, documentation, labelnames, buckets=buckets)
+
+
+gps_fixes = _counter("wakafine_gps_fixes", "GPS fixes ingested", ["bus"])
+gps_ingest_seconds = _histogram(
+    "wakafine_gps_ingest_seconds", "Time to accept one GPS fix", ["endpoint"],
+)
+seat_map_seconds = _histogram(
+    "wakafine_seat_map_seconds", "Seat availability lookup latency",
+)
+bookings = _counter("wakafine_bookings", "Booking lifecycle events", ["event"])
+payments = _counter(
+    "wakafine_payments", "Payment state transitions", ["method", "status"],
+)
+payment_validation_failures = _counter(
+    "wakafine_payment_validation_failures", "Rejected payment submissions",
+    ["method", "reason"],
+)
+pdf_render_seconds = _histogram(
+    "wakafine_pdf_render_seconds", "Ticket PDF render time", ["document"],
+    buckets=RENDER_BUCKETS,
+)
+cache_requests = _counter(
+    "wakafine_cache_requests", "Application cache lookups", ["cache", "result"],
+)
+
+
+def record_cache(cache, hit):
+    """Count one lookup against ``cache``; the hit ratio is derived in PromQL."""
+    cache_requests.labels(cache=cache, result="hit" if hit else "miss").inc()
+
+
+def timed(histogram, **labels):
+    """Decorate a sync or async function so its duration lands in ``histogram``."""
+    metric = histogram.labels(**labels) if labels else histogram
+
+    def decorator(func):
+        if iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    metric.observe(time.perf_counter() - start)
+            return async_wrapper
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                metric.observe(time.perf_counter() - start)
+        return wrapper
+
+    return decorator
+
+
+def is_available():
+    return prometheus_client is not None
+
+
+def render_latest():
+    """Return ``(body, content_type)`` for a scrape of every process's metrics."""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = prometheus_client.REGISTRY
+    return prometheus_client.generate_latest(registry), prometheus_client.CONTENT_TYPE_LATEST
+
+
+def mark_worker_dead(pid):
+    """gunicorn ``child_exit`` hook: drop a dead worker's live gauges."""
+    if prometheus_client is not None and os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        multiprocess.mark_process_dead(pid)
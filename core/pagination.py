@@ -0,0 +1,54 @@
+"""
+Paginator for admin changelists over very large tables.
+
+Django's paginator runs ``SELECT COUNT(*)`` on every changelist page. On a
+table with millions of rows, such as the GPS fix history, that is a full
+index scan per click. ``EstimatedCountPaginator`` avoids it:
+
+* Unfiltered, it asks the database for an estimate: the planner's row
+  count from ``pg_class`` on PostgreSQL, or the primary key span elsewhere
+  (both indexed lookups).
+* Filtered, it counts exactly, but stops at ``exact_count_limit`` rows, so
+  a broad filter costs at most that many index entries.
+
+Use it with ``show_full_result_count = False`` so the changelist does not
+issue its own unfiltered count for the "x of y" label.
+"""
+
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Max, Min
+from django.utils.functional import cached_property
+
+
+class EstimatedCountPaginator(Paginator):
+    exact_count_limit = 10000
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not hasattr(queryset, "query"):
+            return super().count
+        if queryset.query.where:
+            limited = queryset.order_by()[: self.exact_count_limit + 1].count()
+            return min(limited, self.exact_count_limit)
+        estimate = self._estimate(queryset)
+        if estimate is None or estimate < self.exact_count_limit:
+            return super().count
+        return estimate
+
+    def _estimate(self, queryset):
+        connection = connections[queryset.db]
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                    [queryset.model._meta.db_table],
+                )
+                row = cursor.fetchone()
+            # reltuples is -1 (or 0) until the table is first analysed.
+            return row[0] if row and row[0] > 0 else None
+        span = queryset.order_by().aggregate(low=Min("pk"), high=Max("pk"))
+        if span["low"] is None or not isinstance(span["low"], int):
+            return None
+        return span["high"] - span["low"] + 1
@@ -0,0 +1,114 @@
+"""
+Media storage backends.
+
+Two storages are configured in ``settings.STORAGES``:
+
+* ``default``: manifests and other generated files, read back through Django.
+* ``tickets``: ticket QR codes, linked straight from pages and emails.
+
+Locally both write under ``MEDIA_ROOT``. With ``MEDIA_BUCKET`` set, both
+live in an S3-compatible object store (AWS S3, Cloudflare R2, MinIO; needs
+``django-storages[s3]``). This survives Vercel's read-only, per-instance
+filesystem and is shared by every instance. The bucket stays private:
+
+* Ticket files get content-hash names (``qr_codes/qr_AB12CD.3f9a1c0e5b2d4f67.png``).
+  A name never changes meaning, so objects carry a year-long ``immutable``
+  ``Cache-Control`` header and are never overwritten.
+* ``url()`` returns a signed URL that expires after ``MEDIA_SIGNED_URL_SECONDS``.
+  The browser or CDN fetches the image straight from the store, never
+  through Django. With ``MEDIA_CDN_DOMAIN`` and a CloudFront key pair the
+  URLs are CloudFront-signed and served from the edge. Otherwise they are
+  presigned URLs on the bucket endpoint.
+"""
+
+import hashlib
+import os
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files.storage import FileSystemStorage, storages
+
+try:
+    from storages.backends.s3 import S3Storage
+except ImportError:  # only needed when MEDIA_BUCKET is set
+
+    class S3Storage:
+        def __init__(self, *args, **kwargs):
+            raise ImproperlyConfigured(
+                "MEDIA_BUCKET needs django-storages and boto3: pip install 'django-storages[s3]'"
+            )
+
+
+IMMUTABLE_CACHE_CONTROL = "max-age=31536000, immutable"
+
+
+def content_hash(content, length=16):
+    """Hex SHA-256 prefix of a Django ``File``, leaving it rewound."""
+    digest = hashlib.sha256()
+    content.seek(0)
+    for chunk in content.chunks():
+        digest.update(chunk)
+    content.seek(0)
+    return digest.hexdigest()[:length]
+
+
+class ContentHashMixin:
+    """Store files under names that include a hash of their bytes.
+
+    Saving the same bytes twice returns the existing name without writing,
+    so stored files are never modified in place and can be cached forever.
+    """
+
+    def hashed_name(self, name, content):
+        directory, filename = os.path.split(name)
+        stem, ext = os.path.splitext(filename)
+        return os.path.join(directory, f"{stem}.{content_hash(content)}{ext}")
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, "chunks"):
+            from django.core.files import File
+
+            content = File(content, name)
+        name = self.hashed_name(name, content)
+        if self.exists(name):
+            return name
+        return super().save(name, content, max_length=max_length)
+
+
+class HashedFileSystemStorage(ContentHashMixin, FileSystemStorage):
+    """Content-hashed files under ``MEDIA_ROOT``, for development and single hosts."""
+
+    def __init__(self, **kwargs):
+        # Identical names hold identical bytes, so a concurrent writer can overwrite.
+        kwargs.setdefault("allow_overwrite", True)
+        super().__init__(**kwargs)
+
+
+class MediaStorage(S3Storage):
+    """Private bucket; ``url()`` is signed and expires."""
+
+    default_acl = "private"
+    file_overwrite = True
+    querystring_auth = True
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault(
+            "querystring_expire", getattr(settings, "MEDIA_SIGNED_URL_SECONDS", 3600)
+        )
+        super().__init__(**kwargs)
+
+
+class TicketStorage(ContentHashMixin, MediaStorage):
+    """Ticket images: content-hashed, immutable, cached for a year once fetched."""
+
+    def get_object_parameters(self, name):
+        params = super().get_object_parameters(name)
+        params.setdefault("CacheControl", IMMUTABLE_CACHE_CONTROL)
+        return params
+
+
+def ticket_storage():
+    """The ``tickets`` storage; a callable so ``Booking.qr_code`` follows settings."""
+    return storages["tickets"]
@@ -0,0 +1,15 @@
+from django import template
+from django.templatetags.static import static
+
+from core import assets
+
+register = template.Library()
+
+
+@register.simple_tag
+def bundle(name):
+    """
+    URL of the current build of a JavaScript bundle (see core/assets.py).
+    Usage: <script src="{% bundle 'public-map.min.js' %}"></script>
+    """
+    return static(assets.bundle_path(name))
@@ -1,8 +1,10 @@
 from django.urls import path
-from .views import SystemSettingsUpdateView
+from .views import PerformanceView, SystemSettingsUpdateView, metrics_view
 
 app_name = 'core'
 
 urlpatterns = [
     path('admin/system-settings/', SystemSettingsUpdateView.as_view(), name='system_settings'),
+    path('admin/performance/', PerformanceView.as_view(), name='performance'),
+    path('metrics', metrics_view, name='metrics'),
 ]
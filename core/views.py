@@ -1,11 +1,19 @@
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.http import HttpResponse
 from django.contrib.auth.decorators import user_passes_test
 from django.utils.decorators import method_decorator
-from django.views.generic import UpdateView
+from django.shortcuts import redirect
+from django.utils.crypto import constant_time_compare
+from django.views.generic import TemplateView, UpdateView
 from django.urls import reverse_lazy
 from django.contrib import messages
 
 from .models import SiteSettings
 from .forms import SiteSettingsForm
+from . import metrics
+from .instrumentation import view_stats
 
 
 def superuser_required(user):
@@ -24,3 +32,50 @@ class SystemSettingsUpdateView(UpdateView):
     def form_valid(self, form):
         messages.success(self.request, 'System settings updated successfully.')
         return super().form_valid(form)
+
+
+@method_decorator(user_passes_test(superuser_required), name='dispatch')
+class PerformanceView(TemplateView):
+    """Top offending views collected by the instrumentation middleware."""
+    template_name = 'core/performance.html'
+    sort_fields = {
+        'total': 'total_ms',
+        'avg': 'avg_ms',
+        'queries': 'avg_queries',
+        'db': 'avg_db_ms',
+        'n_plus_one': 'n_plus_one',
+    }
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        sort = self.request.GET.get('sort', 'total')
+        if sort not in self.sort_fields:
+            sort = 'total'
+        context['sort'] = sort
+        context['rows'] = view_stats.top(order_by=self.sort_fields[sort])
+        context['since'] = datetime.fromtimestamp(view_stats.since, tz=dt_timezone.utc)
+        context['sample_rate'] = getattr(settings, 'INSTRUMENTATION_SAMPLE_RATE', 1.0)
+        context['duplicate_threshold'] = getattr(settings, 'INSTRUMENTATION_DUPLICATE_THRESHOLD', 3)
+        return context
+
+    def post(self, request, *args, **kwargs):
+        view_stats.reset()
+        messages.success(request, 'Performance statistics reset.')
+        return redirect('core:performance')
+
+
+def metrics_view(request):
+    """Prometheus scrape endpoint; requires METRICS_TOKEN as a bearer token.
+
+    Without a token the endpoint is only served with DEBUG on.
+    """
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    if not token:
+        if not settings.DEBUG:
+            return HttpResponse('Not found', status=404, content_type='text/plain')
+    elif not constant_time_compare(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        return HttpResponse('Unauthorized', status=401, content_type='text/plain')
+    if not metrics.is_available():
+        return HttpResponse('prometheus_client is not installed', status=503, content_type='text/plain')
+    body, content_type = metrics.render_latest()
+    return HttpResponse(body, content_type=content_type)
@@ -1,7 +1,9 @@
 from django.contrib import admin
+from django.db.models import OuterRef, Subquery
 from django.utils.html import format_html
 from django.urls import reverse
 from django.utils.safestring import mark_safe
+from core.pagination import EstimatedCountPaginator
 from .models import (
     Driver, BusLocation, SpeedAlert, RouteProgress,
     GeofenceArea, EmergencyAlert
@@ -17,6 +19,7 @@ class DriverAdmin(admin.ModelAdmin):
     list_filter = ('is_active',)
     search_fields = ('user__username', 'user__first_name', 'user__last_name', 'license_number', 'phone_number')
     readonly_fields = ('created_at', 'updated_at', 'current_location_display', 'current_speed_display')
+    list_select_related = ('user', 'assigned_bus')
     
     fieldsets = (
         ('Personal Information', {
@@ -38,8 +41,16 @@ class DriverAdmin(admin.ModelAdmin):
         }),
     )
     
+    def get_queryset(self, request):
+        # Latest fix's speed for every row in the same query, rather than
+        # Driver.current_speed's lookup per row.
+        latest_speed = BusLocation.objects.filter(
+            bus=OuterRef('assigned_bus')
+        ).order_by('-timestamp').values('speed')[:1]
+        return super().get_queryset(request).annotate(latest_speed=Subquery(latest_speed))
+    
     def current_speed_display(self, obj):
-        speed = obj.current_speed
+        speed = obj.latest_speed or 0
         if speed > 80:
             color = 'red'
         elif speed > 60:
@@ -47,18 +58,21 @@ class DriverAdmin(admin.ModelAdmin):
         else:
             color = 'green'
         return format_html(
-            '<span style="color: {};">{:.1f} km/h</span>',
-            color, speed
+            '<span style="color: {};">{} km/h</span>',
+            color, f'{speed:.1f}'
         )
     current_speed_display.short_description = 'Current Speed'
+    current_speed_display.admin_order_field = 'latest_speed'
     
     def current_location_display(self, obj):
+        # Bus.current_location is a dict of the bus's last reported fix
         location = obj.current_location
-        if location and hasattr(location, 'latitude'):
+        if location:
+            updated = location['last_update']
             return format_html(
-                'Lat: {:.6f}, Lng: {:.6f}<br><small>Updated: {}</small>',
-                location.latitude, location.longitude,
-                location.timestamp.strftime('%Y-%m-%d %H:%M:%S') if location.timestamp else 'Never'
+                'Lat: {}, Lng: {}<br><small>Updated: {}</small>',
+                f"{location['latitude']:.6f}", f"{location['longitude']:.6f}",
+                updated.strftime('%Y-%m-%d %H:%M:%S') if updated else 'Never'
             )
         return 'No GPS data'
     current_location_display.short_description = 'Current Location'
@@ -73,7 +87,13 @@ class BusLocationAdmin(admin.ModelAdmin):
     list_filter = ('is_moving', 'is_at_terminal', 'timestamp')
     search_fields = ('bus__bus_number', 'terminal_name')
     readonly_fields = ('timestamp', 'map_link')
-    date_hierarchy = 'timestamp'
+    list_select_related = ('bus',)
+    # The history table grows by a row per fix: estimate the unfiltered count,
+    # skip the second "x of y" count, and filter dates with the timestamp
+    # list filter (fixed ranges, no query) instead of date_hierarchy, which
+    # scans the table for the distinct years/months/days to offer.
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     
     fieldsets = (
         ('Bus Information', {
@@ -102,8 +122,8 @@ class BusLocationAdmin(admin.ModelAdmin):
         else:
             color = 'green'
         return format_html(
-            '<span style="color: {};">{:.1f} km/h</span>',
-            color, obj.speed
+            '<span style="color: {};">{} km/h</span>',
+            color, f'{obj.speed:.1f}'
         )
     speed_display.short_description = 'Speed'
     
@@ -130,6 +150,7 @@ class SpeedAlertAdmin(admin.ModelAdmin):
     )
     search_fields = ('bus__bus_number', 'driver__user__username', 'message')
     readonly_fields = ('created_at', 'acknowledged_at', 'location_link')
+    list_select_related = ('bus', 'driver__user')
     actions = ['mark_acknowledged']
     
     fieldsets = (
@@ -191,6 +212,7 @@ class EmergencyAlertAdmin(admin.ModelAdmin):
     )
     search_fields = ('bus__bus_number', 'driver__user__username', 'description')
     readonly_fields = ('created_at', 'resolved_at', 'response_time_minutes', 'location_link')
+    list_select_related = ('bus', 'driver__user')
     actions = ['mark_resolved', 'contact_authorities']
     
     fieldsets = (
@@ -257,6 +279,7 @@ class RouteProgressAdmin(admin.ModelAdmin):
     list_filter = ('status', 'route', 'journey_start_time')
     search_fields = ('bus__bus_number', 'route__origin', 'route__destination')
     readonly_fields = ('created_at', 'updated_at', 'is_delayed')
+    list_select_related = ('bus', 'route')
     
     fieldsets = (
         ('Journey Information', {
@@ -0,0 +1,87 @@
+"""
+Each driver's assigned bus, kept in the Django cache.
+
+The driver GPS endpoints resolve ``request.user`` to its ``Driver`` and bus
+on every fix, every few seconds per bus. The driver, with ``assigned_bus``
+loaded, is cached per user for ``IDENTITY_CACHE_SECONDS``. ``Driver`` saves
+and deletes drop the entry. So do ``Bus`` saves, except the live-position
+updates every fix makes (``Bus.LIVE_POSITION_FIELDS``). As those drops only
+reach other processes through a shared cache, ``IDENTITY_CACHE_SECONDS`` is
+0 (no caching) without one.
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+
+from core import metrics
+
+NO_DRIVER = 'none'  # cached for users without an active driver profile
+
+
+def cache_seconds():
+    return getattr(settings, 'IDENTITY_CACHE_SECONDS', 0)
+
+
+def assignment_key(user_id):
+    return f'driver-bus:{user_id}'
+
+
+def forget(user_id):
+    cache.delete(assignment_key(user_id))
+
+
+def forget_bus(bus):
+    """Drop the entries of drivers assigned to ``bus``."""
+    from .models import Driver
+
+    cache.delete_many([
+        assignment_key(user_id)
+        for user_id in Driver.objects.filter(assigned_bus=bus).values_list('user_id', flat=True)
+    ])
+
+
+def _unpack(driver):
+    from .models import Driver
+
+    if driver == NO_DRIVER or not driver.is_active:
+        raise Driver.DoesNotExist('No active driver profile for this user')
+    return driver
+
+
+def driver_for(user):
+    """The user's active ``Driver`` with ``assigned_bus`` loaded.
+
+    Raises ``Driver.DoesNotExist`` like ``Driver.objects.get()`` would.
+    """
+    from .models import Driver
+
+    timeout = cache_seconds()
+    key = assignment_key(user.pk)
+    driver = cache.get(key) if timeout else None
+    metrics.record_cache('driver_bus', driver is not None)
+    if driver is None:
+        driver = (
+            Driver.objects.select_related('assigned_bus')
+            .filter(user=user, is_active=True).first()
+        ) or NO_DRIVER
+        if timeout:
+            cache.set(key, driver, timeout)
+    return _unpack(driver)
+
+
+async def adriver_for(user):
+    """Async ``driver_for()``."""
+    from .models import Driver
+
+    timeout = cache_seconds()
+    key = assignment_key(user.pk)
+    driver = await cache.aget(key) if timeout else None
+    metrics.record_cache('driver_bus', driver is not None)
+    if driver is None:
+        driver = await (
+            Driver.objects.select_related('assigned_bus')
+            .filter(user=user, is_active=True).afirst()
+        ) or NO_DRIVER
+        if timeout:
+            await cache.aset(key, driver, timeout)
+    return _unpack(driver)
@@ -0,0 +1,106 @@
+"""
+Live bus positions kept in the Django cache.
+
+Every new ``BusLocation`` overwrites the bus's entry here, so readers that
+only need "where is bus X now" (passenger tracking by PNR) get it from the
+cache instead of querying the newest row of the location history. With a
+shared cache backend (``REDIS_URL``) all processes see the same positions;
+with the default local-memory cache each process fills its own entries on a
+miss and keeps them for about one GPS interval only.
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from core import metrics
+
+LIVE_POSITION_TIMEOUT = 60 * 60  # a bus silent for an hour is served from the DB again
+STALE_POSITION_TIMEOUT = 30
+LOCAL_POSITION_TIMEOUT = 5  # about one GPS interval
+
+
+def position_timeout(age=0):
+    """Seconds a position ``age`` seconds old may be served from the cache."""
+    if not getattr(settings, 'SHARED_CACHE', False):
+        # publish() only reaches the process that took the fix; the others
+        # re-read the database after about one GPS interval.
+        return LOCAL_POSITION_TIMEOUT
+    # Positions that are already old only stay briefly so a refresh storm on a
+    # silent bus still costs one query per STALE_POSITION_TIMEOUT.
+    return max(STALE_POSITION_TIMEOUT, LIVE_POSITION_TIMEOUT - age)
+
+
+def position_key(bus_id):
+    return f'bus-live:{bus_id}'
+
+
+def position_payload(location, progress=None):
+    payload = {
+        'bus_id': location.bus_id,
+        'latitude': float(location.latitude),
+        'longitude': float(location.longitude),
+        'speed': float(location.speed or 0),
+        'heading': float(location.heading) if location.heading is not None else None,
+        'is_moving': location.is_moving,
+        'timestamp': location.timestamp.isoformat(),
+        'epoch': location.timestamp.timestamp(),
+    }
+    if progress is not None:
+        payload['progress'] = {
+            'route_id': progress.route_id,
+            'status': progress.status,
+            'progress_percentage': round(progress.progress_percentage, 1),
+            'estimated_arrival': (
+                progress.estimated_arrival_time.isoformat()
+                if progress.estimated_arrival_time else None
+            ),
+        }
+    return payload
+
+
+def publish(location, progress=None):
+    """Store ``location`` as the bus's current position."""
+    cache.set(
+        position_key(location.bus_id),
+        position_payload(location, progress),
+        position_timeout(),
+    )
+
+
+def current_position(bus_id):
+    """The bus's latest position payload, or None if it has never reported."""
+    payload = cache.get(position_key(bus_id))
+    metrics.record_cache('live_position', payload is not None)
+    if payload is not None:
+        return payload or None  # {} marks a bus with no history
+
+    from .models import BusLocation
+
+    location = BusLocation.objects.filter(bus_id=bus_id).order_by('-timestamp').first()
+    if location is None:
+        cache.set(position_key(bus_id), {}, min(STALE_POSITION_TIMEOUT, position_timeout()))
+        return None
+    payload = position_payload(location)
+    age = (timezone.now() - location.timestamp).total_seconds()
+    cache.set(position_key(bus_id), payload, position_timeout(age))
+    return payload
+
+
+async def acurrent_position(bus_id):
+    """Async ``current_position`` for the ASGI tracking view."""
+    payload = await cache.aget(position_key(bus_id))
+    metrics.record_cache('live_position', payload is not None)
+    if payload is not None:
+        return payload or None
+
+    from .models import BusLocation
+
+    location = await BusLocation.objects.filter(bus_id=bus_id).order_by('-timestamp').afirst()
+    if location is None:
+        await cache.aset(position_key(bus_id), {}, min(STALE_POSITION_TIMEOUT, position_timeout()))
+        return None
+    payload = position_payload(location)
+    age = (timezone.now() - location.timestamp).total_seconds()
+    await cache.aset(position_key(bus_id), payload, position_timeout(age))
+    return payload
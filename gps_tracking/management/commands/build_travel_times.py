@@ -0,0 +1,32 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from gps_tracking.travel_model import build_travel_times
+
+
+class Command(BaseCommand):
+    help = 'Rebuild per-route, per-hour-of-week travel times from GPS history'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=30,
+            help='How many days of BusLocation history to mine (default 30)',
+        )
+        parser.add_argument(
+            '--route', type=int, action='append', dest='routes',
+            help='Only rebuild this route id (repeatable)',
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"🕒 Mining {options['days']} days of GPS history...")
+        started = time.perf_counter()
+        summary = build_travel_times(days=options['days'], route_ids=options['routes'])
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f"   {summary['fixes']:,} fixes, {summary['trips']:,} trips, "
+            f"{summary['routes']} routes"
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Wrote {summary['rows']:,} travel-time rows in {elapsed:.1f}s"
+        ))
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.1 on 2026-10-19 12:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('buses', '0003_bus_assigned_driver_alter_bus_current_driver_name_and_more'),
+        ('gps_tracking', '0001_initial'),
+        ('routes', '0003_route_path'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='routeprogress',
+            name='average_speed',
+            field=models.FloatField(default=0.0, help_text='Rolling speed along the route in km/h'),
+        ),
+        migrations.AddField(
+            model_name='routeprogress',
+            name='last_fix_time',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='routeprogress',
+            name='segment_index',
+            field=models.PositiveIntegerField(default=0, help_text='Polyline segment the bus was last snapped to'),
+        ),
+        migrations.AddIndex(
+            model_name='routeprogress',
+            index=models.Index(fields=['bus', 'status'], name='gps_trackin_bus_id_df1576_idx'),
+        ),
+    ]
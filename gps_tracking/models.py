@@ -1,11 +1,17 @@
+import logging
+
 from django.db import models
 from django.utils import timezone
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
 from buses.models import Bus
 from routes.models import Route
+from core import metrics
+
+from . import assignments, live
 
 User = get_user_model()
+logger = logging.getLogger(__name__)
 
 
 class Driver(models.Model):
@@ -25,6 +31,13 @@ class Driver(models.Model):
     def save(self, *args, **kwargs):
         self.clean()
         super().save(*args, **kwargs)
+        assignments.forget(self.user_id)
+
+    def delete(self, *args, **kwargs):
+        user_id = self.user_id
+        result = super().delete(*args, **kwargs)
+        assignments.forget(user_id)
+        return result
     
     # Current assignment
     assigned_bus = models.OneToOneField(
@@ -89,11 +102,26 @@ class BusLocation(models.Model):
     
     def save(self, *args, **kwargs):
         # Update bus current location when saving
+        adding = self._state.adding
         super().save(*args, **kwargs)
+        if adding:
+            metrics.gps_fixes.labels(bus=str(self.bus_id)).inc()
         self.bus.current_latitude = self.latitude
         self.bus.current_longitude = self.longitude
         self.bus.last_location_update = self.timestamp
         self.bus.save(update_fields=['current_latitude', 'current_longitude', 'last_location_update'])
+        if adding:
+            progress = self.update_route_progress()
+            live.publish(self, progress)
+    
+    def update_route_progress(self):
+        """Feed this fix to the route progress engine; never fails the save."""
+        from .progress import engine
+        try:
+            return engine.ingest(self.bus, self.latitude, self.longitude, self.timestamp, self.speed)
+        except Exception:
+            logger.exception("Route progress update failed for bus %s", self.bus_id)
+            return None
 
 
 class SpeedAlert(models.Model):
@@ -166,6 +194,11 @@ class RouteProgress(models.Model):
     total_distance = models.FloatField(help_text="Total route distance in km")
     progress_percentage = models.FloatField(default=0.0)
     
+    # Incremental state kept by gps_tracking.progress
+    segment_index = models.PositiveIntegerField(default=0, help_text="Polyline segment the bus was last snapped to")
+    average_speed = models.FloatField(default=0.0, help_text="Rolling speed along the route in km/h")
+    last_fix_time = models.DateTimeField(null=True, blank=True)
+    
     # Status
     STATUS_CHOICES = [
         ('not_started', 'Not Started'),
@@ -186,6 +219,9 @@ class RouteProgress(models.Model):
     
     class Meta:
         ordering = ['-journey_start_time']
+        indexes = [
+            models.Index(fields=['bus', 'status']),
+        ]
     
     def __str__(self):
         return f"{self.bus.bus_name} - {self.route} ({self.status})"
@@ -0,0 +1,249 @@
+"""
+Incremental route progress and ETA engine fed by the GPS stream.
+
+Every new ``BusLocation`` is passed to ``engine.ingest()``. The fix is
+snapped to the route polyline (``Route.polyline``, terminal to terminal),
+searching only a few segments around the one the bus was last matched to,
+so each fix costs O(1) regardless of route length or history. Distance
+covered comes from precomputed cumulative segment lengths, speed is an
+exponentially weighted average of the along-route speed, and the ETA is the
+remaining distance at that speed, blended with the historical travel time
+for the hour of the week (see gps_tracking/travel_model.py).
+
+The database row is the only authoritative state, so any number of workers
+(or serverless instances) can take fixes for the same bus. Each fix is
+written with one conditional ``UPDATE`` keyed on the row's ``updated_at``:
+if another worker wrote the row since it was read, nothing is written and the
+fix is replayed once on a fresh copy. A process keeps the row it last wrote
+per bus, so the usual fix costs that ``UPDATE`` and no read. Passenger ETA
+lookups read the stored row instead of replaying location history. The
+process lock only guards the in-memory dicts; no query runs under it.
+"""
+
+import math
+import threading
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+KM_PER_DEGREE_LAT = 110.574
+KM_PER_DEGREE_LNG = 111.320
+
+SEARCH_BACK = 1  # segments behind the last match to consider
+SEARCH_AHEAD = 3  # segments ahead of the last match to consider
+OFF_ROUTE_KM = 1.0  # beyond this the local search is retried over the whole route
+SPEED_ALPHA = 0.3  # weight of the newest observation in the rolling speed
+MAX_SPEED_KMH = 120.0
+MIN_ETA_SPEED_KMH = 5.0
+ARRIVAL_RADIUS_KM = 0.15
+DELAY_THRESHOLD_MINUTES = 5
+
+ACTIVE_STATUSES = ('not_started', 'in_transit', 'delayed')
+PERSISTED_FIELDS = [
+    'distance_covered', 'total_distance', 'progress_percentage', 'segment_index',
+    'average_speed', 'last_fix_time', 'estimated_arrival_time',
+    'actual_arrival_time', 'status', 'delay_minutes', 'updated_at',
+]
+
+
+class RouteGeometry:
+    """A route polyline projected to a local plane, with cumulative lengths in km."""
+
+    def __init__(self, points):
+        lat0 = math.radians(sum(lat for lat, _ in points) / len(points))
+        self.kx = KM_PER_DEGREE_LNG * math.cos(lat0)
+        self.ky = KM_PER_DEGREE_LAT
+        self.xy = [(lng * self.kx, lat * self.ky) for lat, lng in points]
+        self.cumulative = [0.0]
+        for (x1, y1), (x2, y2) in zip(self.xy, self.xy[1:]):
+            self.cumulative.append(self.cumulative[-1] + math.hypot(x2 - x1, y2 - y1))
+        self.total_km = self.cumulative[-1]
+
+    @property
+    def segments(self):
+        return len(self.xy) - 1
+
+    def snap(self, latitude, longitude, first=0, last=None):
+        """
+        Project a point onto segments ``first..last`` (inclusive).
+
+        Returns ``(segment_index, distance_along_km, distance_off_route_km)``.
+        """
+        px, py = longitude * self.kx, latitude * self.ky
+        first = max(0, first)
+        last = self.segments - 1 if last is None else min(self.segments - 1, last)
+        best = None
+        for index in range(first, last + 1):
+            (x1, y1), (x2, y2) = self.xy[index], self.xy[index + 1]
+            dx, dy = x2 - x1, y2 - y1
+            length_sq = dx * dx + dy * dy
+            t = 0.0 if length_sq == 0 else max(0.0, min(1.0, ((px - x1) * dx + (py - y1) * dy) / length_sq))
+            off = math.hypot(px - (x1 + t * dx), py - (y1 + t * dy))
+            if best is None or off < best[2]:
+                along = self.cumulative[index] + t * (self.cumulative[index + 1] - self.cumulative[index])
+                best = (index, along, off)
+        return best
+
+
+class ProgressEngine:
+    """Route progress kept in ``RouteProgress`` rows, with per-process read caches."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._progress = {}  # bus id -> RouteProgress as this process last wrote it
+        self._geometry = {}  # route id -> (route.updated_at, RouteGeometry)
+
+    def geometry(self, route):
+        with self._lock:
+            cached = self._geometry.get(route.pk)
+        if cached is None or cached[0] != route.updated_at:
+            cached = (route.updated_at, RouteGeometry(route.polyline))
+            with self._lock:
+                self._geometry[route.pk] = cached
+        return cached[1]
+
+    def expected_speed(self, route, geometry, when):
+        """Typical speed for a departure at ``when`` from the travel-time model."""
+        minutes = route.typical_duration(when)
+        if minutes:
+            return geometry.total_km / (minutes / 60)
+        return MIN_ETA_SPEED_KMH
+
+    def ingest(self, bus, latitude, longitude, timestamp, speed=None):
+        """Advance the bus's journey with one GPS fix and return its RouteProgress."""
+        if not bus.assigned_route_id:
+            return None
+        with self._lock:
+            # Taken out of the cache so no other thread advances the same object.
+            progress = self._progress.pop(bus.pk, None)
+        for fresh in (False, True):
+            if fresh or progress is None or progress.route_id != bus.assigned_route_id:
+                progress = self._journey_for(bus, latitude, longitude, timestamp)
+                if progress is None:
+                    return None
+            if progress.last_fix_time is not None and timestamp < progress.last_fix_time:
+                break  # a late fix; the journey has already moved past it
+            version = progress.updated_at
+            self._advance(progress, float(latitude), float(longitude), timestamp, speed)
+            if self._save(progress, version):
+                break
+            progress = None  # another worker wrote the row first; replay on a fresh copy
+        else:
+            return None
+        if progress.status in ACTIVE_STATUSES:
+            with self._lock:
+                self._progress[bus.pk] = progress
+        return progress
+
+    def _save(self, progress, version):
+        """Write ``progress`` if its row still has ``updated_at == version``."""
+        from .models import RouteProgress
+
+        return RouteProgress.objects.filter(pk=progress.pk, updated_at=version).update(
+            **{field: getattr(progress, field) for field in PERSISTED_FIELDS}
+        ) == 1
+
+    def _latest_journey(self, bus, **filters):
+        from .models import RouteProgress
+
+        return (
+            RouteProgress.objects.select_related('route')
+            .filter(bus_id=bus.pk, route_id=bus.assigned_route_id, **filters)
+            .order_by('-journey_start_time')
+            .first()
+        )
+
+    def _journey_for(self, bus, latitude, longitude, timestamp):
+        from .models import RouteProgress
+
+        progress = self._latest_journey(bus)
+        if progress is not None and progress.status in ACTIVE_STATUSES:
+            return progress
+
+        # No journey under way. Start one when the bus is on the route; after
+        # an arrival, wait until it is back near the origin.
+        route = bus.assigned_route
+        geometry = self.geometry(route)
+        _, along, off = geometry.snap(float(latitude), float(longitude))
+        if off > OFF_ROUTE_KM or geometry.total_km - along <= ARRIVAL_RADIUS_KM:
+            return None
+        if progress is not None and progress.status == 'arrived' and along > geometry.total_km * 0.1:
+            return None
+        with transaction.atomic():
+            # Locking the bus row makes a second worker wait, then find this journey.
+            type(bus).objects.select_for_update().filter(pk=bus.pk).first()
+            progress = self._latest_journey(bus, status__in=ACTIVE_STATUSES)
+            if progress is None:
+                progress = RouteProgress.objects.create(
+                    bus_id=bus.pk,
+                    route=route,
+                    journey_start_time=timestamp,
+                    total_distance=round(geometry.total_km, 3),
+                    status='not_started',
+                )
+        return progress
+
+    def _advance(self, progress, latitude, longitude, timestamp, speed):
+        route = progress.route
+        geometry = self.geometry(route)
+        index, along, off = geometry.snap(
+            latitude, longitude,
+            progress.segment_index - SEARCH_BACK,
+            progress.segment_index + SEARCH_AHEAD,
+        )
+        if off > OFF_ROUTE_KM:
+            # Lost track (gap in the feed or a detour): one full scan to re-acquire.
+            index, along, off = geometry.snap(latitude, longitude)
+        previous_fix = progress.last_fix_time
+        progress.last_fix_time = timestamp
+        progress.updated_at = timezone.now()
+        if off > OFF_ROUTE_KM:
+            return
+
+        # GPS jitter can snap slightly backwards; distance covered never decreases.
+        delta = along - progress.distance_covered
+        if delta > 0:
+            progress.distance_covered = along
+            progress.segment_index = index
+
+        observed = None
+        if previous_fix is not None and timestamp > previous_fix:
+            hours = (timestamp - previous_fix).total_seconds() / 3600
+            observed = min(MAX_SPEED_KMH, max(0.0, delta) / hours)
+        elif speed is not None:
+            observed = min(MAX_SPEED_KMH, float(speed))
+        if observed is not None:
+            if progress.average_speed:
+                progress.average_speed += SPEED_ALPHA * (observed - progress.average_speed)
+            else:
+                progress.average_speed = observed
+
+        progress.calculate_progress()
+        remaining = max(0.0, progress.total_distance - progress.distance_covered)
+        if remaining <= ARRIVAL_RADIUS_KM:
+            progress.distance_covered = progress.total_distance
+            progress.progress_percentage = 100.0
+            progress.status = 'arrived'
+            progress.actual_arrival_time = timestamp
+            progress.estimated_arrival_time = timestamp
+            return
+
+        # Early in the trip trust history for this hour of the week; the further
+        # the bus gets, the more weight its own rolling speed gets.
+        expected = self.expected_speed(route, geometry, progress.journey_start_time)
+        hours = remaining / max(MIN_ETA_SPEED_KMH, expected)
+        if progress.average_speed:
+            weight = progress.progress_percentage / 100
+            live = remaining / max(MIN_ETA_SPEED_KMH, progress.average_speed)
+            hours = weight * live + (1 - weight) * hours
+        progress.estimated_arrival_time = timestamp + timedelta(hours=hours)
+
+        scheduled = progress.journey_start_time + timedelta(minutes=route.duration_minutes)
+        late = (progress.estimated_arrival_time - scheduled).total_seconds() / 60
+        progress.delay_minutes = max(0, int(late))
+        if progress.distance_covered > 0:
+            progress.status = 'delayed' if progress.delay_minutes >= DELAY_THRESHOLD_MINUTES else 'in_transit'
+
+
+engine = ProgressEngine()
@@ -0,0 +1,197 @@
+"""
+Mine BusLocation history into per-route, per-hour-of-week travel times.
+
+Fixes are streamed once, ordered by bus and time, with a chunked server-side
+iterator. Each bus's series is turned into NumPy arrays and snapped to its
+route polyline in one vectorised pass. A trip is the last fix in the origin
+zone followed by the first fix in the destination zone. Its duration is
+bucketed by the hour of the week it left. Python-level work is one tuple
+append per fix, so a month of history for the whole fleet takes minutes.
+
+Used by ``manage.py build_travel_times``; the results are read through
+``routes.travel_times``.
+"""
+
+from collections import defaultdict
+from datetime import timedelta
+
+import numpy as np
+from django.db import transaction
+from django.utils import timezone
+
+from buses.models import Bus
+from routes.models import RouteTravelTime
+from routes.travel_times import HOURS_PER_WEEK, invalidate
+
+from .models import BusLocation
+from .progress import OFF_ROUTE_KM, RouteGeometry
+
+CHUNK_SIZE = 20_000
+ZONE_KM = 0.3  # distance from either end of the route that counts as "at the terminal"
+MIN_SAMPLES = 3
+HISTOGRAM_BUCKET_MINUTES = 5
+PROJECTION_BLOCK = 2_000_000  # max fix x segment cells projected at once
+
+
+def snap_many(geometry, latitudes, longitudes):
+    """Vectorised ``RouteGeometry.snap`` over arrays: returns (along_km, off_km)."""
+    xy = np.asarray(geometry.xy)
+    starts, deltas = xy[:-1], np.diff(xy, axis=0)
+    lengths_sq = np.maximum((deltas ** 2).sum(axis=1), 1e-12)
+    cumulative = np.asarray(geometry.cumulative)
+    seg_lengths = np.diff(cumulative)
+
+    points = np.column_stack((longitudes * geometry.kx, latitudes * geometry.ky))
+    along = np.empty(len(points))
+    off = np.empty(len(points))
+    step = max(1, PROJECTION_BLOCK // len(starts))
+    for first in range(0, len(points), step):
+        block = points[first:first + step, None, :]
+        rel = block - starts[None]
+        t = np.clip((rel * deltas[None]).sum(axis=2) / lengths_sq[None], 0.0, 1.0)
+        gap = rel - t[..., None] * deltas[None]
+        distance = np.hypot(gap[..., 0], gap[..., 1])
+        best = distance.argmin(axis=1)
+        rows = np.arange(len(best))
+        along[first:first + step] = cumulative[best] + t[rows, best] * seg_lengths[best]
+        off[first:first + step] = distance[rows, best]
+    return along, off
+
+
+def extract_trips(times, along, off, total_km, min_seconds, max_seconds):
+    """
+    Find origin-to-destination runs in one bus's time-ordered fixes.
+
+    Returns ``(departure_times, durations_seconds)`` arrays.
+    """
+    on_route = off <= OFF_ROUTE_KM
+    at_start = on_route & (along <= ZONE_KM)
+    at_end = on_route & (along >= total_km - ZONE_KM)
+    index = np.arange(len(times))
+
+    # First fix of each visit to the destination zone.
+    arrivals = at_end & ~np.concatenate(([False], at_end[:-1]))
+    last_start = np.maximum.accumulate(np.where(at_start, index, -1))
+    previous_arrival = np.maximum.accumulate(np.where(arrivals, index, -1))
+    previous_arrival = np.concatenate(([-1], previous_arrival[:-1]))
+
+    ends = index[arrivals]
+    starts = last_start[ends]
+    valid = (starts >= 0) & (starts > previous_arrival[ends])
+    starts, ends = starts[valid], ends[valid]
+    durations = times[ends] - times[starts]
+    keep = (durations >= min_seconds) & (durations <= max_seconds)
+    return times[starts][keep], durations[keep]
+
+
+def _hours_of_week(epoch_seconds, utc_offset_seconds):
+    # 1970-01-01 was a Thursday, i.e. day 3 of a Monday-based week.
+    local_hours = np.floor((epoch_seconds + utc_offset_seconds) / 3600).astype(np.int64)
+    return (local_hours + 3 * 24) % HOURS_PER_WEEK
+
+
+def _iter_bus_series(since, bus_ids):
+    """Yield ``(bus_id, [(epoch_seconds, lat, lng), ...])`` per bus in ``bus_ids``, streaming."""
+    rows = (
+        BusLocation.objects.filter(timestamp__gte=since, bus_id__in=bus_ids)
+        .order_by("bus_id", "timestamp")
+        .values_list("bus_id", "timestamp", "latitude", "longitude")
+        .iterator(chunk_size=CHUNK_SIZE)
+    )
+    current, series = None, []
+    for bus_id, timestamp, latitude, longitude in rows:
+        if bus_id != current:
+            if series:
+                yield current, series
+            current, series = bus_id, []
+        series.append((timestamp.timestamp(), float(latitude), float(longitude)))
+    if series:
+        yield current, series
+
+
+def summarise(durations_minutes):
+    p10, p50, p90 = np.percentile(durations_minutes, [10, 50, 90])
+    buckets = np.bincount((durations_minutes // HISTOGRAM_BUCKET_MINUTES).astype(np.int64))
+    return {
+        "p10_minutes": round(float(p10), 1),
+        "p50_minutes": round(float(p50), 1),
+        "p90_minutes": round(float(p90), 1),
+        "histogram": buckets.tolist(),
+    }
+
+
+def build_rows(route, departures_how, durations_minutes):
+    """168 RouteTravelTime rows for one route, filling sparse hours."""
+    if len(durations_minutes) < MIN_SAMPLES:
+        return []
+    overall = summarise(durations_minutes)
+    by_hour_of_day = {}
+    rows = []
+    for how in range(HOURS_PER_WEEK):
+        mask = departures_how == how
+        samples = int(mask.sum())
+        if samples >= MIN_SAMPLES:
+            stats = summarise(durations_minutes[mask])
+        else:
+            hour = how % 24
+            if hour not in by_hour_of_day:
+                pooled = durations_minutes[departures_how % 24 == hour]
+                by_hour_of_day[hour] = summarise(pooled) if len(pooled) >= MIN_SAMPLES else overall
+            stats = by_hour_of_day[hour]
+            samples = 0
+        rows.append(RouteTravelTime(route=route, hour_of_week=how, samples=samples, **stats))
+    return rows
+
+
+def build_travel_times(days=30, route_ids=None):
+    """Rebuild RouteTravelTime from the last ``days`` of GPS history."""
+    since = timezone.now() - timedelta(days=days)
+    utc_offset = timezone.localtime().utcoffset().total_seconds()
+    buses = Bus.objects.filter(assigned_route__isnull=False).select_related("assigned_route")
+    if route_ids:
+        buses = buses.filter(assigned_route_id__in=route_ids)
+    bus_routes = {bus.pk: bus.assigned_route for bus in buses}
+
+    geometries = {}
+    departures = defaultdict(list)
+    durations = defaultdict(list)
+    fixes = 0
+    for bus_id, series in _iter_bus_series(since, list(bus_routes)):
+        route = bus_routes[bus_id]
+        if route.pk not in geometries:
+            geometries[route.pk] = RouteGeometry(route.polyline)
+        geometry = geometries[route.pk]
+        data = np.asarray(series)
+        fixes += len(data)
+        along, off = snap_many(geometry, data[:, 1], data[:, 2])
+        scheduled = route.duration_minutes * 60
+        left, took = extract_trips(
+            data[:, 0], along, off, geometry.total_km,
+            min_seconds=max(60, scheduled / 4), max_seconds=max(scheduled * 4, 3600),
+        )
+        if len(took):
+            departures[route.pk].append(_hours_of_week(left, utc_offset))
+            durations[route.pk].append(took / 60)
+
+    routes = {route.pk: route for route in bus_routes.values()}
+    rows = []
+    trips = 0
+    for route_id, parts in durations.items():
+        minutes = np.concatenate(parts)
+        trips += len(minutes)
+        rows.extend(build_rows(routes[route_id], np.concatenate(departures[route_id]), minutes))
+
+    with transaction.atomic():
+        stale = RouteTravelTime.objects.all()
+        if route_ids:
+            stale = stale.filter(route_id__in=route_ids)
+        stale.delete()
+        RouteTravelTime.objects.bulk_create(rows, batch_size=2_000)
+    invalidate()
+
+    return {
+        "fixes": fixes,
+        "trips": trips,
+        "routes": len({row.route_id for row in rows}),
+        "rows": len(rows),
+    }
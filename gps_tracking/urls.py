@@ -25,6 +25,12 @@ urlpatterns = [
     path("api/passenger/buses/", views.PassengerBusTrackingAPIView.as_view(), name="api_passenger_buses"),
     path("api/bus/<int:pk>/progress/", views.RouteProgressAPIView.as_view(), name="api_route_progress"),
     path("api/bus/<int:pk>/emergency/", views.TriggerEmergencyAlertAPIView.as_view(), name="api_emergency_alert"),
+
+    # Async API endpoints (serve wakafine_bus.asgi under uvicorn)
+    path("api/async/bus/<int:pk>/update-location/", views.AsyncUpdateBusLocationAPIView.as_view(), name="api_update_location_async"),
+    path("api/async/driver/update-location/", views.AsyncDriverLocationUpdateAPIView.as_view(), name="api_driver_update_location_async"),
+    path("api/async/buses/locations/", views.AsyncGetBusLocationsAPIView.as_view(), name="api_bus_locations_async"),
+    path("api/async/passenger/buses/", views.AsyncPassengerBusTrackingAPIView.as_view(), name="api_passenger_buses_async"),
     
     # Actions
     path("admin/speed-alert/<int:pk>/acknowledge/", views.AcknowledgeSpeedAlertView.as_view(), name="acknowledge_speed_alert"),
@@ -3,7 +3,7 @@ from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.contrib.auth.decorators import login_required
 from django.views.generic import TemplateView, ListView, DetailView, View
 from django.contrib import messages
-from django.http import JsonResponse
+from django.http import Http404, JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
 from django.conf import settings
@@ -13,6 +13,9 @@ from datetime import timedelta
 import json
 
 from buses.models import Bus
+from core import metrics
+from core.instrumentation import span
+from . import assignments
 from .models import BusLocation, EmergencyAlert, SpeedAlert, RouteProgress
 
 
@@ -41,12 +44,17 @@ class BusDetailView(DetailView):
     template_name = 'gps_tracking/bus_detail.html'
     context_object_name = 'bus'
 
+    def get_queryset(self):
+        return Bus.objects.with_live_stats().select_related('assigned_route')
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        bus = self.get_object()
+        bus = self.object
         context['google_maps_api_key'] = settings.GOOGLE_MAPS_API_KEY
         context['current_location'] = BusLocation.objects.filter(bus=bus).first()
-        context['route_progress'] = RouteProgress.objects.filter(bus=bus).first()
+        context['route_progress'] = context['current_progress'] = (
+            RouteProgress.objects.filter(bus=bus).select_related('route').first()
+        )
         context['recent_alerts'] = SpeedAlert.objects.filter(
             bus=bus,
             created_at__gte=timezone.now() - timedelta(hours=24)
@@ -128,7 +136,7 @@ class DriverDashboardView(LoginRequiredMixin, TemplateView):
                 context['bus'] = driver.assigned_bus
                 context['driver'] = driver
                 context['current_location'] = BusLocation.objects.filter(bus=driver.assigned_bus).order_by('-timestamp').first()
-                context['route_progress'] = RouteProgress.objects.filter(bus=driver.assigned_bus).order_by('-created_at').first()
+                context['route_progress'] = RouteProgress.objects.filter(bus=driver.assigned_bus).select_related('route').order_by('-created_at').first()
             else:
                 context['bus'] = None
                 context['driver'] = driver
@@ -143,6 +151,7 @@ class DriverDashboardView(LoginRequiredMixin, TemplateView):
 class UpdateBusLocationAPIView(View):
     """API endpoint to update bus location - supports both bus ID and driver authentication."""
     
+    @metrics.timed(metrics.gps_ingest_seconds, endpoint='bus')
     def post(self, request, pk=None):
         try:
             # Support both direct bus ID and driver-based updates
@@ -155,7 +164,7 @@ class UpdateBusLocationAPIView(View):
                 
                 try:
                     from .models import Driver
-                    driver = Driver.objects.get(user=request.user, is_active=True)
+                    driver = assignments.driver_for(request.user)
                     bus = driver.assigned_bus
                     if not bus:
                         return JsonResponse({'error': 'No bus assigned to driver'}, status=400)
@@ -269,13 +278,14 @@ class GetBusLocationsAPIView(View):
                     'minutes_ago': int(time_diff.total_seconds() / 60)
                 })
             
-            return JsonResponse({
-                'success': True,
-                'buses': data,
-                'total_buses': len(data),
-                'online_buses': sum(1 for bus in data if bus['is_online']),
-                'timestamp': timezone.now().isoformat()
-            })
+            with span('serialize'):
+                return JsonResponse({
+                    'success': True,
+                    'buses': data,
+                    'total_buses': len(data),
+                    'online_buses': sum(1 for bus in data if bus['is_online']),
+                    'timestamp': timezone.now().isoformat()
+                })
             
         except Exception as e:
             return JsonResponse({'error': str(e)}, status=500)
@@ -286,23 +296,40 @@ class RouteProgressAPIView(View):
     
     def get(self, request, pk):
         try:
-            bus = get_object_or_404(Bus, pk=pk)
-            progress = RouteProgress.objects.filter(bus=bus).first()
+            bus = get_object_or_404(Bus.objects.select_related('assigned_route'), pk=pk)
+            # Progress is written by gps_tracking.progress on every fix.
+            progress = (
+                RouteProgress.objects.filter(bus=bus)
+                .select_related('route')
+                .order_by('-journey_start_time')
+                .first()
+            )
             
             if not progress:
                 return JsonResponse({'error': 'No route progress found'}, status=404)
             
+            route = progress.route
             data = {
                 'bus_id': bus.id,
-                'route_name': bus.route.name if bus.route else None,
-                'current_stop': progress.current_stop,
-                'progress_percentage': float(progress.progress_percentage),
-                'estimated_arrival': progress.estimated_arrival.isoformat() if progress.estimated_arrival else None,
+                'route_name': route.name,
+                'origin': route.origin_display,
+                'destination': route.destination_display,
+                'status': progress.status,
+                'distance_covered_km': round(progress.distance_covered, 2),
+                'total_distance_km': round(progress.total_distance, 2),
+                'progress_percentage': round(float(progress.progress_percentage), 1),
+                'average_speed_kmh': round(progress.average_speed, 1),
+                'estimated_arrival': progress.estimated_arrival_time.isoformat() if progress.estimated_arrival_time else None,
+                'actual_arrival': progress.actual_arrival_time.isoformat() if progress.actual_arrival_time else None,
+                'delay_minutes': progress.delay_minutes,
+                'last_fix_time': progress.last_fix_time.isoformat() if progress.last_fix_time else None,
                 'updated_at': progress.updated_at.isoformat()
             }
             
             return JsonResponse(data)
             
+        except Http404:
+            raise
         except Exception as e:
             return JsonResponse({'error': str(e)}, status=500)
 
@@ -374,13 +401,14 @@ class ResolveEmergencyAlertView(AdminRequiredMixin, View):
 class DriverLocationUpdateAPIView(View):
     """API endpoint for drivers to update their location."""
     
+    @metrics.timed(metrics.gps_ingest_seconds, endpoint='driver')
     def post(self, request):
         if not request.user.is_authenticated:
             return JsonResponse({'error': 'Authentication required'}, status=401)
         
         try:
             from .models import Driver
-            driver = Driver.objects.get(user=request.user, is_active=True)
+            driver = assignments.driver_for(request.user)
             if not driver.assigned_bus:
                 return JsonResponse({'error': 'No bus assigned'}, status=400)
             
@@ -508,4 +536,230 @@ def driver_tracking(request):
     
     except Exception as e:
         messages.error(request, f"Error loading driver tracking: {str(e)}")
-        return redirect('gps_tracking:driver_dashboard')
\ No newline at end of file
+        return redirect('gps_tracking:driver_dashboard')
+
+# Async API Views
+#
+# Async variants of the polling and ingest endpoints. Under ASGI (uvicorn
+# serving wakafine_bus.asgi) a passenger waiting on the database no longer
+# holds a worker thread, so one process can serve many more concurrent
+# pollers. The sync views above stay in place for the WSGI deployment.
+
+def _location_payload(bus, location, now):
+    """Serialize a bus and its latest fix the way the polling APIs return it."""
+    time_diff = now - location.timestamp
+    return {
+        'bus_id': bus.id,
+        'bus_number': bus.bus_number,
+        'bus_name': bus.bus_name,
+        'latitude': float(location.latitude),
+        'longitude': float(location.longitude),
+        'speed': float(location.speed),
+        'heading': float(location.heading) if location.heading else 0,
+        'timestamp': location.timestamp.isoformat(),
+        'is_moving': location.is_moving,
+        'is_online': time_diff.total_seconds() < 600,  # 10 minutes
+        'accuracy': float(location.accuracy) if location.accuracy else None,
+        'route_name': bus.assigned_route.name if bus.assigned_route else None,
+        'route_id': bus.assigned_route_id,
+        'minutes_ago': int(time_diff.total_seconds() / 60),
+    }
+
+
+def _buses_with_latest_location(buses_query):
+    """Annotate each bus with the id of its most recent BusLocation."""
+    from django.db.models import OuterRef, Subquery
+
+    latest = BusLocation.objects.filter(bus=OuterRef('pk')).order_by('-timestamp').values('pk')[:1]
+    return buses_query.select_related('assigned_route').annotate(latest_location_id=Subquery(latest))
+
+
+async def _latest_fixes(buses_query):
+    """Return [(bus, latest BusLocation)] in two queries instead of one per bus."""
+    buses = [bus async for bus in _buses_with_latest_location(buses_query) if bus.latest_location_id]
+    locations = await BusLocation.objects.ain_bulk([bus.latest_location_id for bus in buses])
+    return [(bus, locations[bus.latest_location_id]) for bus in buses if bus.latest_location_id in locations]
+
+
+def _parse_fix(data):
+    """Validate an incoming GPS fix; return (fields, error response)."""
+    latitude = data.get('latitude')
+    longitude = data.get('longitude')
+    if not latitude or not longitude:
+        return None, JsonResponse({'error': 'Latitude and longitude are required'}, status=400)
+    if not (-90 <= float(latitude) <= 90) or not (-180 <= float(longitude) <= 180):
+        return None, JsonResponse({'error': 'Invalid coordinates'}, status=400)
+    speed = float(data.get('speed', 0) or 0)
+    return {
+        'latitude': latitude,
+        'longitude': longitude,
+        'speed': speed,
+        'heading': data.get('heading', 0),
+        'accuracy': data.get('accuracy', None),
+        'altitude': data.get('altitude', None),
+        'is_moving': speed > 1,  # Consider moving if speed > 1 km/h
+    }, None
+
+
+async def _record_fix(bus, fix):
+    """Store a fix and raise an overspeed alert when needed.
+
+    BusLocation.save() already copies the position onto the bus.
+    """
+    from .models import Driver
+
+    bus_location = await BusLocation.objects.acreate(bus=bus, **fix)
+    if fix['speed'] > 80:
+        driver = await Driver.objects.filter(assigned_bus=bus).afirst()
+        if driver:
+            await SpeedAlert.objects.acreate(
+                bus=bus,
+                driver=driver,
+                alert_type='overspeed',
+                severity='high',
+                recorded_speed=fix['speed'],
+                speed_limit=80,
+                location=bus_location,
+                message=f"Speed limit exceeded: {fix['speed']} km/h (limit: 80 km/h)"
+            )
+    return bus_location
+
+
+async def _driver_bus(request):
+    """Return (driver's assigned bus, error response) for the requesting user."""
+    from .models import Driver
+
+    user = await request.auser()
+    if not user.is_authenticated:
+        return None, JsonResponse({'error': 'Authentication required'}, status=401)
+    try:
+        driver = await assignments.adriver_for(user)
+    except Driver.DoesNotExist:
+        return None, JsonResponse({'error': 'Driver profile not found'}, status=404)
+    if not driver.assigned_bus:
+        return None, JsonResponse({'error': 'No bus assigned to driver'}, status=400)
+    return driver.assigned_bus, None
+
+
+class AsyncGetBusLocationsAPIView(View):
+    """Async version of GetBusLocationsAPIView."""
+
+    async def get(self, request):
+        try:
+            now = timezone.now()
+            data = [
+                _location_payload(bus, location, now)
+                for bus, location in await _latest_fixes(Bus.objects.filter(is_active=True))
+            ]
+            return JsonResponse({
+                'success': True,
+                'buses': data,
+                'total_buses': len(data),
+                'online_buses': sum(1 for bus in data if bus['is_online']),
+                'timestamp': now.isoformat()
+            })
+        except Exception as e:
+            return JsonResponse({'error': str(e)}, status=500)
+
+
+class AsyncPassengerBusTrackingAPIView(View):
+    """Async version of PassengerBusTrackingAPIView."""
+
+    async def get(self, request):
+        try:
+            route_id = request.GET.get('route_id')
+            bus_number = request.GET.get('bus_number')
+
+            buses_query = Bus.objects.filter(is_active=True).select_related('assigned_driver__user')
+            if route_id:
+                buses_query = buses_query.filter(assigned_route_id=route_id)
+            if bus_number:
+                buses_query = buses_query.filter(bus_number__icontains=bus_number)
+
+            now = timezone.now()
+            data = []
+            for bus, location in await _latest_fixes(buses_query):
+                payload = _location_payload(bus, location, now)
+                payload['last_update'] = payload.pop('timestamp')
+                payload['driver_name'] = bus.driver_name if bus.assigned_driver else 'No Driver Assigned'
+                data.append(payload)
+
+            return JsonResponse({
+                'success': True,
+                'buses': data,
+                'count': len(data),
+                'filters': {
+                    'route_id': route_id,
+                    'bus_number': bus_number
+                }
+            })
+        except Exception as e:
+            return JsonResponse({'error': str(e)}, status=500)
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class AsyncUpdateBusLocationAPIView(View):
+    """Async version of UpdateBusLocationAPIView."""
+
+    @metrics.timed(metrics.gps_ingest_seconds, endpoint='bus_async')
+    async def post(self, request, pk=None):
+        try:
+            if pk:
+                try:
+                    bus = await Bus.objects.aget(pk=pk)
+                except Bus.DoesNotExist:
+                    return JsonResponse({'error': 'Bus not found'}, status=404)
+            else:
+                bus, error = await _driver_bus(request)
+                if error:
+                    return error
+
+            fix, error = _parse_fix(json.loads(request.body))
+            if error:
+                return error
+            fix.pop('altitude')
+            bus_location = await _record_fix(bus, fix)
+
+            return JsonResponse({
+                'success': True,
+                'message': 'Location updated successfully',
+                'location_id': bus_location.id,
+                'timestamp': bus_location.timestamp.isoformat(),
+                'bus_number': bus.bus_number
+            })
+        except json.JSONDecodeError:
+            return JsonResponse({'error': 'Invalid JSON data'}, status=400)
+        except ValueError as e:
+            return JsonResponse({'error': f'Invalid data: {str(e)}'}, status=400)
+        except Exception as e:
+            return JsonResponse({'error': str(e)}, status=500)
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class AsyncDriverLocationUpdateAPIView(View):
+    """Async version of DriverLocationUpdateAPIView."""
+
+    @metrics.timed(metrics.gps_ingest_seconds, endpoint='driver_async')
+    async def post(self, request):
+        try:
+            bus, error = await _driver_bus(request)
+            if error:
+                return error
+
+            fix, error = _parse_fix(json.loads(request.body))
+            if error:
+                return error
+            bus_location = await _record_fix(bus, fix)
+
+            return JsonResponse({
+                'success': True,
+                'message': 'Location updated successfully',
+                'bus_number': bus.bus_number,
+                'timestamp': bus_location.timestamp.isoformat()
+            })
+        except json.JSONDecodeError:
+            return JsonResponse({'error': 'Invalid JSON data'}, status=400)
+        except ValueError as e:
+            return JsonResponse({'error': f'Invalid data: {str(e)}'}, status=400)
+        except Exception as e:
+            return JsonResponse({'error': str(e)}, status=500)
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Route
+from .models import FareChange, FareTable, Route
 
 
 @admin.register(Route)
@@ -18,3 +18,39 @@ class RouteAdmin(admin.ModelAdmin):
     search_fields = ("name", "origin", "destination")
     list_editable = ("price", "is_active")
     ordering = ("origin", "departure_time")
+
+
+@admin.register(FareTable)
+class FareTableAdmin(admin.ModelAdmin):
+    list_display = (
+        "origin",
+        "destination",
+        "fare_class",
+        "price",
+        "effective_from",
+        "effective_to",
+    )
+    list_filter = ("fare_class", "origin", "destination")
+    date_hierarchy = "effective_from"
+
+
+@admin.register(FareChange)
+class FareChangeAdmin(admin.ModelAdmin):
+    list_display = (
+        "batch",
+        "kind",
+        "target",
+        "object_id",
+        "old_amount",
+        "new_amount",
+        "applied_by",
+        "created_at",
+    )
+    list_filter = ("kind", "target", "created_at")
+    search_fields = ("batch", "reason")
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
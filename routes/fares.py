@@ -0,0 +1,133 @@
+"""
+Fare quotes from the effective-dated fare table (``FareTable``).
+
+Each process compiles the whole fare table into a dict keyed by
+(origin, destination, fare class). Each entry holds that trip's date bands
+as sorted start dates and (end, price) pairs, so a quote is a dict lookup
+plus a bisect. The compiled table is tagged with the fare version held in
+the Django cache. ``FareTable.save()`` and ``delete()`` and ``apply_fares``
+bump that version, and every process recompiles, with one query, the next
+time it quotes. With a shared cache (``REDIS_URL``) this reaches all
+workers at once. With the local-memory cache, other processes pick up edits
+after ``FARE_CACHE_SECONDS``.
+
+Trips without a fare for the date fall back to the standard class, then to
+``Route.price``.
+"""
+
+import bisect
+import threading
+import time
+import uuid
+from datetime import datetime
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from core import metrics
+
+VERSION_KEY = "fares:version"
+STANDARD = "standard"
+
+_lock = threading.Lock()
+_table = {}
+_version = None
+_loaded_at = None
+
+
+def invalidate():
+    """Make every process recompile its fares on its next quote."""
+    global _loaded_at
+    cache.set(VERSION_KEY, uuid.uuid4().hex, None)
+    _loaded_at = None
+
+
+def _current_version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        version = uuid.uuid4().hex
+        if not cache.add(VERSION_KEY, version, None):
+            version = cache.get(VERSION_KEY, version)
+    return version
+
+
+def _compile():
+    from .models import FareTable
+
+    bands = {}
+    rows = FareTable.objects.order_by("effective_from").values_list(
+        "origin", "destination", "fare_class", "effective_from", "effective_to", "price"
+    )
+    for origin, destination, fare_class, start, end, price in rows:
+        starts, entries = bands.setdefault((origin, destination, fare_class), ([], []))
+        starts.append(start)
+        entries.append((end, price))
+    return bands
+
+
+def fare_table():
+    """``{(origin, destination, class): (starts, [(end, price)])}`` for the current version."""
+    global _table, _version, _loaded_at
+    version = _current_version()
+    ttl = getattr(settings, "FARE_CACHE_SECONDS", 600)
+    fresh = (
+        _loaded_at is not None
+        and version == _version
+        and time.monotonic() - _loaded_at <= ttl
+    )
+    metrics.record_cache("fares", fresh)
+    if not fresh:
+        with _lock:
+            if _loaded_at is None or version != _version or time.monotonic() - _loaded_at > ttl:
+                _table = _compile()
+                _version = version
+                _loaded_at = time.monotonic()
+    return _table
+
+
+def _as_date(value):
+    if isinstance(value, datetime):
+        return timezone.localtime(value).date() if timezone.is_aware(value) else value.date()
+    return value
+
+
+def _lookup(table, key, on_date):
+    bands = table.get(key)
+    if bands is None:
+        return None
+    starts, entries = bands
+    index = bisect.bisect_right(starts, on_date) - 1
+    if index < 0:
+        return None
+    end, price = entries[index]
+    if end is not None and end < on_date:
+        return None
+    return price
+
+
+def fare(route, on_date=None, fare_class=STANDARD, reverse=False):
+    """One leg on ``route`` travelling on ``on_date`` (a date or datetime, default today).
+
+    ``reverse`` prices the return leg, destination to origin, falling back
+    to the outbound fare when that direction has none.
+    """
+    on_date = _as_date(on_date) if on_date else timezone.localdate()
+    table = fare_table()
+    trips = [(route.origin, route.destination)]
+    if reverse:
+        trips.insert(0, (route.destination, route.origin))
+    for cls in dict.fromkeys((fare_class, STANDARD)):
+        for origin, destination in trips:
+            price = _lookup(table, (origin, destination, cls), on_date)
+            if price is not None:
+                return price
+    return route.price
+
+
+def quote(route, travel_date=None, trip_type="one_way", return_date=None, fare_class=STANDARD):
+    """Total for a booking: the outbound fare plus, for round trips, the return fare."""
+    total = fare(route, travel_date, fare_class)
+    if trip_type == "round_trip":
+        total += fare(route, return_date or travel_date, fare_class, reverse=True)
+    return total
@@ -0,0 +1,89 @@
+import getpass
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from routes import repricing
+
+
+class Command(BaseCommand):
+    help = (
+        "Reprice routes and pending bookings from the fare table, or redenominate "
+        "every stored amount, in one audited transaction"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "action", choices=["reprice", "redenominate"],
+            help="reprice: copy fares from the fare table; redenominate: divide all amounts",
+        )
+        parser.add_argument(
+            "--date", type=date.fromisoformat,
+            help="reprice: apply the fares in force on this day (YYYY-MM-DD, default today)",
+        )
+        parser.add_argument(
+            "--divisor", help="redenominate: divide amounts by this, e.g. 1000",
+        )
+        parser.add_argument(
+            "--minimum", help="redenominate: raise amounts below this after conversion",
+        )
+        parser.add_argument(
+            "--places", type=int, default=0,
+            help="redenominate: decimal places to round to (default 0)",
+        )
+        parser.add_argument("--reason", default="", help="Recorded in the audit trail")
+        parser.add_argument(
+            "--dry-run", action="store_true",
+            help="Show what would change and roll back",
+        )
+        parser.add_argument(
+            "--show", type=int, default=20,
+            help="Changed rows to list per table (default 20)",
+        )
+
+    def handle(self, *args, **options):
+        common = {
+            "reason": options["reason"][:200],
+            "applied_by": getpass.getuser()[:150],
+            "dry_run": options["dry_run"],
+            "show": options["show"],
+        }
+        started = time.perf_counter()
+        if options["action"] == "reprice":
+            self.stdout.write("💱 Repricing from the fare table...")
+            batch, summaries = repricing.reprice(on_date=options["date"], **common)
+        else:
+            if not options["divisor"]:
+                raise CommandError("redenominate needs --divisor")
+            self.stdout.write(f"💱 Redenominating all amounts by {options['divisor']}...")
+            try:
+                batch, summaries = repricing.redenominate(
+                    options["divisor"], minimum=options["minimum"],
+                    places=options["places"], **common
+                )
+            except (ValueError, ArithmeticError) as exc:
+                raise CommandError(f"Invalid redenomination: {exc}")
+        elapsed = time.perf_counter() - started
+
+        for summary in summaries:
+            self.stdout.write(
+                f"\n   {summary.target}: {summary.rows:,} rows, "
+                f"Le {summary.old_total:,.2f} → Le {summary.new_total:,.2f}"
+            )
+            for change in summary.sample:
+                self.stdout.write(
+                    f"     #{change.object_id}: Le {change.old_amount} → Le {change.new_amount}"
+                )
+            if summary.rows > len(summary.sample):
+                self.stdout.write(f"     ... and {summary.rows - len(summary.sample):,} more")
+
+        total = sum(summary.rows for summary in summaries)
+        if options["dry_run"]:
+            self.stdout.write(self.style.WARNING(
+                f"\nDry run: {total:,} rows would change; nothing was written"
+            ))
+        else:
+            self.stdout.write(self.style.SUCCESS(
+                f"\n✅ Changed {total:,} rows in {elapsed:.2f}s (audit batch {batch})"
+            ))
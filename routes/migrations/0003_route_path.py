@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-19 12:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('routes', '0002_route_destination_terminal_route_origin_terminal'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='route',
+            name='path',
+            field=models.JSONField(blank=True, default=list, help_text='Ordered [latitude, longitude] points from origin to destination terminal'),
+        ),
+    ]
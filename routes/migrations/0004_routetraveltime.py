@@ -0,0 +1,31 @@
+# Generated by Django 5.2.1 on 2026-10-19 12:39
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('routes', '0003_route_path'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RouteTravelTime',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hour_of_week', models.PositiveSmallIntegerField(help_text='0 = Monday 00:00-00:59 local time, 167 = Sunday 23:00-23:59')),
+                ('samples', models.PositiveIntegerField(default=0)),
+                ('p10_minutes', models.FloatField()),
+                ('p50_minutes', models.FloatField()),
+                ('p90_minutes', models.FloatField()),
+                ('histogram', models.JSONField(blank=True, default=list, help_text='Trip counts per 5-minute bucket, starting at 0 minutes')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('route', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='travel_times', to='routes.route')),
+            ],
+            options={
+                'unique_together': {('route', 'hour_of_week')},
+            },
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.1 on 2026-10-19 13:06
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('routes', '0004_routetraveltime'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FareChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('batch', models.CharField(db_index=True, max_length=32)),
+                ('kind', models.CharField(choices=[('reprice', 'Repricing'), ('redenominate', 'Redenomination')], max_length=20)),
+                ('target', models.CharField(choices=[('route', 'Route price'), ('fare', 'Fare table price'), ('booking', 'Booking amount'), ('payment', 'Payment amount')], max_length=20)),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('old_amount', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('new_amount', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('reason', models.CharField(blank=True, max_length=200)),
+                ('applied_by', models.CharField(blank=True, max_length=150)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['target', 'object_id'], name='routes_fare_target_665d49_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='FareTable',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('origin', models.CharField(choices=[('lumley', 'Lumley'), ('regent_road', 'Regent Road'), ('aberdeen', 'Aberdeen'), ('hill_station', 'Hill Station'), ('kissy', 'Kissy'), ('east_end', 'East End'), ('wilberforce', 'Wilberforce'), ('tower_hill', 'Tower Hill'), ('ferry_junction', 'Ferry Junction'), ('goderich', 'Goderich'), ('kent', 'Kent'), ('congo_cross', 'Congo Cross')], max_length=50)),
+                ('destination', models.CharField(choices=[('lumley', 'Lumley'), ('regent_road', 'Regent Road'), ('aberdeen', 'Aberdeen'), ('hill_station', 'Hill Station'), ('kissy', 'Kissy'), ('east_end', 'East End'), ('wilberforce', 'Wilberforce'), ('tower_hill', 'Tower Hill'), ('ferry_junction', 'Ferry Junction'), ('goderich', 'Goderich'), ('kent', 'Kent'), ('congo_cross', 'Congo Cross')], max_length=50)),
+                ('fare_class', models.CharField(choices=[('standard', 'Standard')], default='standard', max_length=20)),
+                ('price', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('effective_from', models.DateField()),
+                ('effective_to', models.DateField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['origin', 'destination', 'fare_class', '-effective_from'],
+                'indexes': [models.Index(fields=['origin', 'destination', 'fare_class', 'effective_from'], name='routes_fare_origin_4ef2b6_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-19 13:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('routes', '0007_faretable_standard_class_only'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='faretable',
+            name='fare_class',
+            field=models.CharField(choices=[('standard', 'Standard'), ('student', 'Student')], default='standard', max_length=20),
+        ),
+    ]
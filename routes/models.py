@@ -1,5 +1,8 @@
-from django.db import models
+import calendar
+
+from django.db import models, transaction
 from django.core.exceptions import ValidationError
+from django.utils import timezone
 
 
 class Route(models.Model):
@@ -19,6 +22,23 @@ class Route(models.Model):
         ("congo_cross", "Congo Cross"),
     ]
 
+    # Approximate centre of each location, used to draw a straight
+    # terminal-to-terminal line for routes without a recorded path.
+    LOCATION_COORDINATES = {
+        "lumley": (8.4478, -13.2630),
+        "regent_road": (8.4560, -13.2570),
+        "aberdeen": (8.4890, -13.2830),
+        "hill_station": (8.4560, -13.2380),
+        "kissy": (8.4720, -13.1950),
+        "east_end": (8.4860, -13.2160),
+        "wilberforce": (8.4680, -13.2570),
+        "tower_hill": (8.4820, -13.2300),
+        "ferry_junction": (8.4850, -13.2060),
+        "goderich": (8.4310, -13.2880),
+        "kent": (8.1660, -13.1660),
+        "congo_cross": (8.4780, -13.2520),
+    }
+
     name = models.CharField(max_length=100)
     origin = models.CharField(max_length=50, choices=LOCATION_CHOICES)
     destination = models.CharField(max_length=50, choices=LOCATION_CHOICES)
@@ -45,6 +65,11 @@ class Route(models.Model):
     departure_time = models.TimeField()
     arrival_time = models.TimeField()
     duration_minutes = models.PositiveIntegerField(help_text="Duration in minutes")
+    path = models.JSONField(
+        default=list,
+        blank=True,
+        help_text="Ordered [latitude, longitude] points from origin to destination terminal",
+    )
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -78,9 +103,176 @@ class Route(models.Model):
         return self.get_destination_display()
 
     @property
-    def duration_formatted(self):
-        hours = self.duration_minutes // 60
-        minutes = self.duration_minutes % 60
+    def polyline(self):
+        """Route geometry as a list of (lat, lng) tuples, origin first."""
+        if len(self.path) >= 2:
+            return [(float(lat), float(lng)) for lat, lng in self.path]
+        return [
+            self.LOCATION_COORDINATES[self.origin],
+            self.LOCATION_COORDINATES[self.destination],
+        ]
+
+    def typical_duration(self, when=None):
+        """
+        Median observed minutes for a departure at ``when`` (default: today's
+        scheduled departure), or ``duration_minutes`` without GPS history.
+        """
+        from .travel_times import expected_minutes
+
+        return expected_minutes(self, when)
+
+    @staticmethod
+    def format_minutes(total_minutes):
+        total_minutes = int(round(total_minutes))
+        hours = total_minutes // 60
+        minutes = total_minutes % 60
         if hours > 0:
             return f"{hours}h {minutes}m"
         return f"{minutes}m"
+
+    @property
+    def duration_formatted(self):
+        return self.format_minutes(self.typical_duration())
+
+
+class RouteTravelTime(models.Model):
+    """
+    Observed travel time for a route by departure hour of the week.
+
+    Built offline from GPS history by the ``build_travel_times`` management
+    command. Hours with too few observed trips are filled from the same hour
+    on other days, then from the route as a whole (``samples`` is 0 for those).
+    """
+
+    route = models.ForeignKey(
+        Route, on_delete=models.CASCADE, related_name="travel_times"
+    )
+    hour_of_week = models.PositiveSmallIntegerField(
+        help_text="0 = Monday 00:00-00:59 local time, 167 = Sunday 23:00-23:59"
+    )
+    samples = models.PositiveIntegerField(default=0)
+    p10_minutes = models.FloatField()
+    p50_minutes = models.FloatField()
+    p90_minutes = models.FloatField()
+    histogram = models.JSONField(
+        default=list,
+        blank=True,
+        help_text="Trip counts per 5-minute bucket, starting at 0 minutes",
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ["route", "hour_of_week"]
+
+    def __str__(self):
+        day, hour = divmod(self.hour_of_week, 24)
+        return f"{self.route} {calendar.day_abbr[day]} {hour:02d}:00 ~{self.p50_minutes:.0f} min"
+
+
+class FareTable(models.Model):
+    """
+    The fare between two locations for a fare class over a date range.
+
+    ``Route.price`` holds the standard fare in force today. The
+    ``apply_fares`` management command copies fares from here onto routes
+    and unpaid bookings, and new bookings are quoted from here by
+    ``routes.fares``. Peak and off-peak periods are consecutive date bands.
+    ``effective_to`` is inclusive; leave it empty for open-ended fares.
+    """
+
+    FARE_CLASS_CHOICES = [
+        ("standard", "Standard"),
+        ("student", "Student"),
+    ]
+
+    origin = models.CharField(max_length=50, choices=Route.LOCATION_CHOICES)
+    destination = models.CharField(max_length=50, choices=Route.LOCATION_CHOICES)
+    fare_class = models.CharField(
+        max_length=20, choices=FARE_CLASS_CHOICES, default="standard"
+    )
+    price = models.DecimalField(max_digits=10, decimal_places=2)
+    effective_from = models.DateField()
+    effective_to = models.DateField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["origin", "destination", "fare_class", "effective_from"]),
+        ]
+        ordering = ["origin", "destination", "fare_class", "-effective_from"]
+
+    def clean(self):
+        if self.origin == self.destination:
+            raise ValidationError("Origin and destination cannot be the same.")
+        if self.effective_to and self.effective_to < self.effective_from:
+            raise ValidationError("A fare cannot end before it starts.")
+        overlapping = FareTable.objects.filter(
+            origin=self.origin,
+            destination=self.destination,
+            fare_class=self.fare_class,
+        ).exclude(pk=self.pk).filter(
+            models.Q(effective_to__isnull=True) | models.Q(effective_to__gte=self.effective_from)
+        )
+        if self.effective_to:
+            overlapping = overlapping.filter(effective_from__lte=self.effective_to)
+        if overlapping.exists():
+            raise ValidationError("Another fare for this trip and class covers some of these dates.")
+
+    def save(self, *args, **kwargs):
+        from .fares import invalidate
+
+        self.clean()
+        super().save(*args, **kwargs)
+        # After commit, so no process recompiles without this change.
+        transaction.on_commit(invalidate)
+
+    def delete(self, *args, **kwargs):
+        from .fares import invalidate
+
+        result = super().delete(*args, **kwargs)
+        transaction.on_commit(invalidate)
+        return result
+
+    def __str__(self):
+        until = self.effective_to or "open"
+        return (
+            f"{self.get_origin_display()} → {self.get_destination_display()} "
+            f"{self.fare_class}: Le {self.price} ({self.effective_from} – {until})"
+        )
+
+
+class FareChange(models.Model):
+    """
+    Audit trail of amounts changed by ``apply_fares``, one row per changed row.
+
+    Rows sharing a ``batch`` were written by one run, in the same transaction
+    as the change itself.
+    """
+
+    KIND_CHOICES = [
+        ("reprice", "Repricing"),
+        ("redenominate", "Redenomination"),
+    ]
+
+    TARGET_CHOICES = [
+        ("route", "Route price"),
+        ("fare", "Fare table price"),
+        ("booking", "Booking amount"),
+        ("payment", "Payment amount"),
+    ]
+
+    batch = models.CharField(max_length=32, db_index=True)
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    target = models.CharField(max_length=20, choices=TARGET_CHOICES)
+    object_id = models.PositiveBigIntegerField()
+    old_amount = models.DecimalField(max_digits=10, decimal_places=2)
+    new_amount = models.DecimalField(max_digits=10, decimal_places=2)
+    reason = models.CharField(max_length=200, blank=True)
+    applied_by = models.CharField(max_length=150, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [models.Index(fields=["target", "object_id"])]
+
+    def __str__(self):
+        return f"{self.batch} {self.target} #{self.object_id}: {self.old_amount} → {self.new_amount}"
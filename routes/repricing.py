@@ -0,0 +1,227 @@
+"""
+Set-based repricing and currency redenomination.
+
+A run changes every affected amount in one transaction with two statements
+per table, instead of one ``save()`` per row:
+
+1. ``INSERT INTO routes_farechange ... SELECT`` computes the new amount for
+   every row that changes and writes it to the audit trail under the run's
+   batch id.
+2. ``UPDATE <table> ... FROM routes_farechange`` joins those audit rows back
+   onto the table.
+
+The rows updated are therefore exactly the rows audited, and each table is
+touched in a single pass, so a nationwide change holds its row locks for
+seconds rather than queueing behind thousands of small transactions. A dry
+run performs step 1, reads the audit rows back as the diff and rolls back.
+
+``reprice()`` copies fares from ``FareTable``: the standard fare in force on
+the run date onto routes, and the ``fares.quote()`` total for each booking's
+dates and fare class onto pending future bookings with no payment under way. ``redenominate()`` divides
+every stored amount (routes, fares, bookings and payments) by a factor.
+"""
+
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, time
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count, Sum
+from django.utils import timezone
+
+from . import fares
+from .models import FareChange, FareTable, Route
+
+
+@dataclass
+class TargetSummary:
+    target: str
+    rows: int = 0
+    old_total: Decimal = Decimal("0")
+    new_total: Decimal = Decimal("0")
+    sample: list = field(default_factory=list)
+
+
+def _plans_for_reprice(on_date):
+    """(target, table, column, has updated_at, SELECT id/old/new, params) per table."""
+    from bookings.models import Booking, Payment
+
+    fares_table = FareTable._meta.db_table
+    routes = Route._meta.db_table
+    bookings = Booking._meta.db_table
+    payments = Payment._meta.db_table
+    day = connection.ops.adapt_datefield_value(on_date)
+    tzname = timezone.get_current_timezone_name() if settings.USE_TZ else None
+    travel_day, travel_day_params = connection.ops.datetime_cast_date_sql("b.travel_date", (), tzname)
+    return_day, return_day_params = connection.ops.datetime_cast_date_sql(
+        "COALESCE(b.return_date, b.travel_date)", (), tzname
+    )
+    start_of_day = datetime.combine(on_date, time.min)
+    if settings.USE_TZ:
+        start_of_day = timezone.make_aware(start_of_day)
+    start_of_day = connection.ops.adapt_datetimefield_value(start_of_day)
+
+    def leg(alias, origin, destination, on, on_params, fare_class=None):
+        """LEFT JOIN of the fare from ``origin`` to ``destination`` in force on ``on``.
+
+        The fare is in ``fare_class``, or in the booking's own class if None.
+        """
+        cls, cls_params = ("b.fare_class", []) if fare_class is None else ("%s", [fare_class])
+        sql = (
+            f" LEFT JOIN {fares_table} {alias} ON {alias}.origin = r.{origin}"
+            f" AND {alias}.destination = r.{destination} AND {alias}.fare_class = {cls}"
+            f" AND {alias}.effective_from <= {on}"
+            f" AND ({alias}.effective_to IS NULL OR {alias}.effective_to >= {on})"
+        )
+        return sql, [*cls_params, *on_params, *on_params]
+
+    # As fares.quote(): each leg is priced in the booking's fare class, then
+    # the standard class. The outbound leg uses the travel date; a round trip
+    # adds the return leg on the return date, priced destination to origin,
+    # else origin to destination, else Route.price.
+    joins = [
+        leg("fc", "origin", "destination", travel_day, travel_day_params),
+        leg("fs", "origin", "destination", travel_day, travel_day_params, fares.STANDARD),
+        leg("rrc", "destination", "origin", return_day, return_day_params),
+        leg("roc", "origin", "destination", return_day, return_day_params),
+        leg("rrs", "destination", "origin", return_day, return_day_params, fares.STANDARD),
+        leg("ros", "origin", "destination", return_day, return_day_params, fares.STANDARD),
+    ]
+    join_sql = "".join(sql for sql, _ in joins)
+    join_params = [param for _, params in joins for param in params]
+    outbound_fare = "COALESCE(fc.price, fs.price)"
+    booking_fare = (
+        f"{outbound_fare} + CASE WHEN b.trip_type = 'round_trip'"
+        " THEN COALESCE(rrc.price, roc.price, rrs.price, ros.price, r.price) ELSE 0 END"
+    )
+    return [
+        (
+            "route", routes, "price", True,
+            f"SELECT r.id, r.price AS old_amount, f.price AS new_amount FROM {routes} r"
+            f" JOIN {fares_table} f ON f.origin = r.origin AND f.destination = r.destination"
+            " WHERE f.fare_class = %s AND f.effective_from <= %s"
+            " AND (f.effective_to IS NULL OR f.effective_to >= %s)"
+            " AND r.price <> f.price",
+            [fares.STANDARD, day, day],
+        ),
+        (
+            "booking", bookings, "amount_paid", True,
+            f"SELECT b.id, b.amount_paid AS old_amount, {booking_fare} AS new_amount"
+            f" FROM {bookings} b"
+            f" JOIN {routes} r ON r.id = b.route_id"
+            f"{join_sql}"
+            f" WHERE {outbound_fare} IS NOT NULL"
+            " AND b.status = 'pending' AND b.travel_date >= %s"
+            f" AND NOT EXISTS (SELECT 1 FROM {payments} p"
+            " WHERE p.booking_id = b.id AND p.status <> 'failed')"
+            f" AND b.amount_paid <> {booking_fare}",
+            [*join_params, start_of_day],
+        ),
+    ]
+
+
+def _plans_for_redenominate(divisor, minimum, places):
+    from bookings.models import Booking, Payment
+
+    def converted(column):
+        # Decimals reach SQLite as text: cast them so comparisons are numeric,
+        # and "* 1.0" so whole amounts are not divided as integers.
+        rounded = f"ROUND({column} * 1.0 / CAST(%s AS NUMERIC), %s)"
+        if minimum is None:
+            return rounded, [divisor, places]
+        return (
+            f"CASE WHEN {rounded} < CAST(%s AS NUMERIC) THEN CAST(%s AS NUMERIC) ELSE {rounded} END",
+            [divisor, places, minimum, minimum, divisor, places],
+        )
+
+    plans = []
+    for target, model, column, has_updated_at in (
+        ("route", Route, "price", True),
+        ("fare", FareTable, "price", False),
+        ("booking", Booking, "amount_paid", True),
+        ("payment", Payment, "amount", True),
+    ):
+        expression, params = converted(column)
+        plans.append((
+            target, model._meta.db_table, column, has_updated_at,
+            f"SELECT id, {column} AS old_amount, {expression} AS new_amount"
+            f" FROM {model._meta.db_table}"
+            f" WHERE {column} <> {expression}",
+            params + params,
+        ))
+    return plans
+
+
+def _run(kind, plans, reason, applied_by, dry_run, show, lock_timeout):
+    batch = uuid.uuid4().hex
+    audit = FareChange._meta.db_table
+    now = connection.ops.adapt_datetimefield_value(timezone.now())
+    summaries = []
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            if connection.vendor == "postgresql" and lock_timeout:
+                # Give up rather than queue behind long transactions (and
+                # make everything else queue behind us).
+                cursor.execute("SET LOCAL lock_timeout = %s", [f"{int(lock_timeout * 1000)}ms"])
+            for target, table, column, has_updated_at, select_sql, params in plans:
+                cursor.execute(
+                    f"INSERT INTO {audit} (object_id, old_amount, new_amount,"
+                    " batch, kind, target, reason, applied_by, created_at)"
+                    " SELECT s.id, s.old_amount, s.new_amount, %s, %s, %s, %s, %s, %s"
+                    f" FROM ({select_sql}) s",
+                    [batch, kind, target, reason, applied_by, now, *params],
+                )
+                if not dry_run:
+                    touch = ", updated_at = %s" if has_updated_at else ""
+                    cursor.execute(
+                        f"UPDATE {table} SET {column} = c.new_amount{touch}"
+                        f" FROM {audit} c WHERE c.batch = %s AND c.target = %s"
+                        f" AND c.object_id = {table}.id",
+                        [now, batch, target] if has_updated_at else [batch, target],
+                    )
+                summaries.append(_summarise(batch, target, show))
+        if dry_run:
+            transaction.set_rollback(True)
+        elif any(plan[0] == "fare" for plan in plans):
+            transaction.on_commit(fares.invalidate)
+    return batch, summaries
+
+
+def _summarise(batch, target, show):
+    changes = FareChange.objects.filter(batch=batch, target=target)
+    totals = changes.aggregate(rows=Count("id"), old=Sum("old_amount"), new=Sum("new_amount"))
+    return TargetSummary(
+        target=target,
+        rows=totals["rows"],
+        old_total=totals["old"] or Decimal("0"),
+        new_total=totals["new"] or Decimal("0"),
+        sample=list(changes.order_by("object_id")[:show]) if show else [],
+    )
+
+
+def reprice(on_date=None, reason="", applied_by="", dry_run=False, show=20, lock_timeout=5):
+    """Apply the fares in force on ``on_date`` (default today).
+
+    Returns ``(batch, [TargetSummary, ...])``; after a dry run the batch id
+    refers to nothing, as the audit rows were rolled back.
+    """
+    on_date = on_date or timezone.localdate()
+    return _run("reprice", _plans_for_reprice(on_date), reason,
+                applied_by, dry_run, show, lock_timeout)
+
+
+def redenominate(divisor, minimum=None, places=0, reason="", applied_by="",
+                 dry_run=False, show=20, lock_timeout=5):
+    """Divide every stored amount by ``divisor``, rounded to ``places`` decimals.
+
+    Amounts that would round below ``minimum`` are raised to it.
+    """
+    divisor = Decimal(divisor)
+    if divisor <= 0:
+        raise ValueError("divisor must be positive")
+    if minimum is not None:
+        minimum = Decimal(minimum)
+    return _run("redenominate", _plans_for_redenominate(divisor, minimum, int(places)),
+                reason, applied_by, dry_run, show, lock_timeout)
@@ -0,0 +1,67 @@
+"""
+Lookups against the historical travel-time table (``RouteTravelTime``).
+
+The table is small (one median per route and hour of the week), so each
+process loads all of it in one query and refreshes it every
+``TRAVEL_TIME_CACHE_SECONDS``. Lookups are then plain list indexing, cheap
+enough for ``Route.duration_formatted`` in list pages and the ETA engine.
+"""
+
+import threading
+import time
+from datetime import datetime
+
+from django.conf import settings
+from django.utils import timezone
+
+HOURS_PER_WEEK = 168
+
+_lock = threading.Lock()
+_table = {}
+_loaded_at = None
+
+
+def hour_of_week(when):
+    """0 for Monday 00:00-00:59 local time up to 167 for Sunday 23:00-23:59."""
+    if timezone.is_aware(when):
+        when = timezone.localtime(when)
+    return when.weekday() * 24 + when.hour
+
+
+def _load():
+    from .models import RouteTravelTime
+
+    table = {}
+    rows = RouteTravelTime.objects.values_list("route_id", "hour_of_week", "p50_minutes")
+    for route_id, hour, minutes in rows:
+        table.setdefault(route_id, [None] * HOURS_PER_WEEK)[hour] = minutes
+    return table
+
+
+def median_table():
+    """``{route_id: [p50 minutes per hour of week]}``, reloaded after the TTL."""
+    global _table, _loaded_at
+    ttl = getattr(settings, "TRAVEL_TIME_CACHE_SECONDS", 600)
+    if _loaded_at is None or time.monotonic() - _loaded_at > ttl:
+        with _lock:
+            if _loaded_at is None or time.monotonic() - _loaded_at > ttl:
+                _table = _load()
+                _loaded_at = time.monotonic()
+    return _table
+
+
+def invalidate():
+    global _loaded_at
+    _loaded_at = None
+
+
+def expected_minutes(route, when=None):
+    """Median observed minutes for ``route`` departing at ``when``."""
+    if when is None:
+        when = timezone.make_aware(
+            datetime.combine(timezone.localdate(), route.departure_time)
+        )
+    hours = median_table().get(route.pk)
+    if hours is None or hours[hour_of_week(when)] is None:
+        return route.duration_minutes
+    return hours[hour_of_week(when)]
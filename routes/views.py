@@ -1,3 +1,5 @@
+from datetime import datetime
+
 from django.shortcuts import render
 from django.views.generic import (
     ListView,
@@ -79,6 +81,16 @@ class RouteSearchView(ListView):
         context["destination"] = self.request.GET.get("destination", "")
         context["travel_date"] = self.request.GET.get("travel_date", "")
         context["today"] = timezone.now().date()
+
+        # Typical duration for the chosen day from GPS history (falls back to
+        # the timetable duration when there is none).
+        try:
+            day = datetime.strptime(context["travel_date"], "%Y-%m-%d").date()
+        except ValueError:
+            day = context["today"]
+        for route in context["routes"]:
+            departure = timezone.make_aware(datetime.combine(day, route.departure_time))
+            route.expected_duration = Route.format_minutes(route.typical_duration(departure))
         return context
 
 
@@ -87,6 +99,11 @@ class RouteDetailView(DetailView):
     template_name = "routes/detail.html"
     context_object_name = "route"
 
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["buses"] = list(self.object.bus_set.with_live_stats())
+        return context
+
 
 class AdminRouteDetailView(AdminRequiredMixin, DetailView):
     model = Route
@@ -0,0 +1,410 @@
+"""
+Copy the data of a SQLite database into Postgres with COPY, table by table in parallel.
+
+Usage:
+  # 1. create the schema on the target with Django (DB_* as in settings.py)
+  DB_NAME=wakafine DB_USER=postgres DB_HOST=localhost DB_SSLMODE=disable python manage.py migrate
+  # 2. copy the rows
+  python scripts/sqlite_to_postgres_copy.py --sqlite db.sqlite3 \
+      --dsn "postgresql://postgres@localhost/wakafine?sslmode=disable" --workers 4
+
+For a local test target: createdb wakafine_copy_test, then run both steps
+against it and compare the row counts printed at the end.
+
+Unlike sqlite_to_postgres_dump.py (one INSERT literal per row in a SQL file)
+and migrate_to_supabase.py (ORM), this:
+ - takes the schema from the Django migrations already applied on the target,
+   so types (booleans, timestamps, identities) are exactly what Django expects
+ - drops foreign keys and secondary indexes before loading, writing their
+   definitions to --ddl-out first, and recreates them afterwards (indexes in
+   parallel, foreign keys one by one), also when a table fails to load
+ - streams each table from SQLite in --chunk-rows batches straight into
+   COPY ... FROM STDIN (text format), truncating and loading in one
+   transaction so COPY FREEZE can skip later vacuum work
+ - loads tables in parallel worker processes, largest first; with foreign
+   keys deferred every table is independent
+ - moves every serial/identity sequence past the loaded ids and ANALYZEs
+
+Every table present in both databases is replaced by the SQLite copy,
+including django_migrations and django_content_type, so ids match the source.
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from urllib.parse import quote
+
+try:
+    import psycopg2
+except ImportError:  # pragma: no cover - required on the machine running the copy
+    psycopg2 = None
+
+CHUNK_ROWS = 5000
+COPY_BUFFER = 1 << 20
+SKIP_TABLES = {"sqlite_sequence", "sqlite_stat1"}
+
+# COPY text format: backslash escapes for the delimiter, line breaks and backslash
+_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+_FALSE = {0, "0", "f", "false", "False", b"0"}
+
+
+def quote_ident(name):
+    return '"{}"'.format(name.replace('"', '""'))
+
+
+def dsn_from_env():
+    """A libpq URL built from the DB_* variables settings.py reads."""
+    name, user, host = os.environ.get("DB_NAME"), os.environ.get("DB_USER"), os.environ.get("DB_HOST")
+    if not (name and user and host):
+        return None
+    password = os.environ.get("DB_PASSWORD", "")
+    auth = quote(user) + (":" + quote(password) if password else "")
+    port = os.environ.get("DB_PORT") or "5432"
+    sslmode = os.environ.get("DB_SSLMODE", "require")
+    return f"postgresql://{auth}@{host}:{port}/{name}?sslmode={sslmode}"
+
+
+def connect(dsn):
+    conn = psycopg2.connect(dsn)
+    conn.set_client_encoding("UTF8")
+    with conn.cursor() as cur:
+        # Django stores naive UTC strings in SQLite
+        cur.execute("SET TIME ZONE 'UTC'")
+    conn.commit()
+    return conn
+
+
+def sqlite_tables(path):
+    """{table: row count} for the user tables of the SQLite file."""
+    src = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        names = [
+            row[0] for row in src.execute(
+                "SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%' ORDER BY name"
+            )
+        ]
+        return {
+            name: src.execute(f"SELECT COUNT(*) FROM {quote_ident(name)}").fetchone()[0]
+            for name in names if name not in SKIP_TABLES
+        }
+    finally:
+        src.close()
+
+
+def sqlite_columns(path, table):
+    src = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        return [row[1] for row in src.execute(f"PRAGMA table_info({quote_ident(table)})")]
+    finally:
+        src.close()
+
+
+def pg_columns(cur):
+    """{table: {column: data_type}} for the public schema."""
+    cur.execute(
+        "SELECT table_name, column_name, data_type FROM information_schema.columns"
+        " WHERE table_schema = 'public' ORDER BY table_name, ordinal_position"
+    )
+    tables = {}
+    for table, column, data_type in cur.fetchall():
+        tables.setdefault(table, {})[column] = data_type
+    return tables
+
+
+def deferred_ddl(cur):
+    """(foreign keys, indexes) to drop before the load, as (table, name, definition)."""
+    cur.execute(
+        "SELECT conrelid::regclass::text, conname, pg_get_constraintdef(oid)"
+        " FROM pg_constraint WHERE contype = 'f' AND connamespace = 'public'::regnamespace"
+        " ORDER BY 1, 2"
+    )
+    foreign_keys = cur.fetchall()
+    # Secondary indexes only: primary key and unique constraint indexes stay.
+    cur.execute(
+        "SELECT t.relname, ic.relname, pg_get_indexdef(i.indexrelid)"
+        " FROM pg_index i"
+        " JOIN pg_class ic ON ic.oid = i.indexrelid"
+        " JOIN pg_class t ON t.oid = i.indrelid"
+        " JOIN pg_namespace n ON n.oid = t.relnamespace"
+        " WHERE n.nspname = 'public'"
+        " AND NOT EXISTS (SELECT 1 FROM pg_constraint c WHERE c.conindid = i.indexrelid)"
+        " ORDER BY 1, 2"
+    )
+    indexes = cur.fetchall()
+    return foreign_keys, indexes
+
+
+def foreign_key_sql(table, name, definition):
+    return f"ALTER TABLE {table} ADD CONSTRAINT {quote_ident(name)} {definition}"
+
+
+def write_ddl(path, foreign_keys, indexes):
+    with open(path, "w", encoding="utf-8") as handle:
+        handle.write("-- Indexes and foreign keys dropped by sqlite_to_postgres_copy.py\n")
+        for _, _, definition in indexes:
+            handle.write(definition + ";\n")
+        for table, name, definition in foreign_keys:
+            handle.write(foreign_key_sql(table, name, definition) + ";\n")
+
+
+def drop_deferred(conn, foreign_keys, indexes):
+    with conn.cursor() as cur:
+        for table, name, _ in foreign_keys:
+            cur.execute(f"ALTER TABLE {table} DROP CONSTRAINT {quote_ident(name)}")
+        for _, name, _ in indexes:
+            cur.execute(f"DROP INDEX {quote_ident(name)}")
+    conn.commit()
+
+
+def _converter(data_type):
+    if data_type == "boolean":
+        return lambda value: "f" if value in _FALSE else "t"
+    if data_type == "bytea":
+        return lambda value: "\\\\x" + (value.encode() if isinstance(value, str) else bytes(value)).hex()
+    return lambda value: str(value).translate(_ESCAPES)
+
+
+class RowStream:
+    """File-like object that COPY reads: SQLite rows encoded as COPY text lines."""
+
+    def __init__(self, rows, converters):
+        self.rows = rows
+        self.converters = converters
+        self.buffer = b""
+        self.count = 0
+
+    def _line(self, row):
+        return "\t".join(
+            "\\N" if value is None else convert(value)
+            for convert, value in zip(self.converters, row)
+        ) + "\n"
+
+    def read(self, size=-1):
+        chunks = [self.buffer]
+        length = len(self.buffer)
+        for row in self.rows:
+            line = self._line(row).encode("utf-8")
+            chunks.append(line)
+            length += len(line)
+            self.count += 1
+            if 0 < size <= length:
+                break
+        data = b"".join(chunks)
+        if size > 0:
+            data, self.buffer = data[:size], data[size:]
+        else:
+            self.buffer = b""
+        return data
+
+
+def copy_table(sqlite_path, dsn, table, columns, chunk_rows):
+    """Worker: replace ``table`` on the target with the SQLite rows. Returns (table, rows, seconds)."""
+    started = time.perf_counter()
+    src = sqlite3.connect(f"file:{sqlite_path}?mode=ro", uri=True)
+    cursor = src.execute(
+        f"SELECT {', '.join(quote_ident(name) for name in columns)} FROM {quote_ident(table)} ORDER BY rowid"
+    )
+
+    def rows():
+        while True:
+            batch = cursor.fetchmany(chunk_rows)
+            if not batch:
+                return
+            yield from batch
+
+    conn = connect(dsn)
+    try:
+        types = pg_columns(conn.cursor())[table]
+        stream = RowStream(rows(), [_converter(types[name]) for name in columns])
+        with conn.cursor() as cur:
+            cur.execute(f"TRUNCATE {quote_ident(table)}")
+            cur.copy_expert(
+                f"COPY {quote_ident(table)} ({', '.join(quote_ident(name) for name in columns)})"
+                " FROM STDIN WITH (FREEZE)",
+                stream,
+                size=COPY_BUFFER,
+            )
+        conn.commit()
+    finally:
+        conn.close()
+        src.close()
+    return table, stream.count, time.perf_counter() - started
+
+
+def run_statement(dsn, sql):
+    """Worker: run one DDL statement in its own connection. Returns (sql, seconds)."""
+    started = time.perf_counter()
+    conn = connect(dsn)
+    try:
+        with conn.cursor() as cur:
+            cur.execute(sql)
+        conn.commit()
+    finally:
+        conn.close()
+    return sql, time.perf_counter() - started
+
+
+def load_tables(sqlite_path, dsn, jobs, workers, chunk_rows):
+    """Copy every job's table in parallel; returns the rows loaded. Stops at the first failure."""
+    total_rows = 0
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(copy_table, sqlite_path, dsn, table, columns, chunk_rows)
+            for _, table, columns in jobs
+        ]
+        try:
+            for future in as_completed(futures):
+                table, rows, seconds = future.result()
+                total_rows += rows
+                print(f"  {table:<40} {rows:>10,} rows  {seconds:6.1f}s")
+        except BaseException:
+            pool.shutdown(cancel_futures=True)
+            raise
+    seconds = time.perf_counter() - started
+    print(f"loaded {total_rows:,} rows in {seconds:.1f}s ({total_rows / max(seconds, 1e-9):,.0f} rows/s)")
+    return total_rows
+
+
+def restore_indexes(dsn, indexes, workers):
+    """Recreate the indexes in parallel; returns the failures."""
+    failures = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(run_statement, dsn, sql): sql for _, _, sql in indexes}
+        for future in as_completed(futures):
+            try:
+                future.result()
+            except psycopg2.Error as exc:
+                # A unique index without a constraint can fail on duplicate source rows.
+                failures.append((futures[future], str(exc).strip()))
+    return failures
+
+
+def restore_foreign_keys(conn, foreign_keys):
+    """Re-add the foreign keys one at a time (each locks two tables); returns the failures."""
+    failures = []
+    for table, name, definition in foreign_keys:
+        sql = foreign_key_sql(table, name, definition)
+        try:
+            with conn.cursor() as cur:
+                cur.execute(sql)
+            conn.commit()
+        except psycopg2.Error as exc:
+            # SQLite does not enforce foreign keys by default, so orphans are possible.
+            conn.rollback()
+            failures.append((sql, str(exc).strip()))
+    return failures
+
+
+def restore_deferred(dsn, conn, foreign_keys, indexes, workers):
+    """Recreate the dropped indexes, then foreign keys; returns the failures."""
+    index_started = time.perf_counter()
+    failures = restore_indexes(dsn, indexes, workers)
+    print(f"recreated {len(indexes) - len(failures)} of {len(indexes)} indexes"
+          f" in {time.perf_counter() - index_started:.1f}s")
+    fk_failures = restore_foreign_keys(conn, foreign_keys)
+    print(f"recreated {len(foreign_keys) - len(fk_failures)} of {len(foreign_keys)} foreign keys")
+    failures += fk_failures
+    for sql, error in failures:
+        print(f"  FAILED {sql}\n    {error}")
+    return failures
+
+
+def reset_sequences(conn):
+    """Move every serial/identity sequence in public past the highest loaded id."""
+    with conn.cursor() as cur:
+        cur.execute(
+            "SELECT table_name, column_name,"
+            " pg_get_serial_sequence(quote_ident(table_name), column_name)"
+            " FROM information_schema.columns WHERE table_schema = 'public'"
+            " AND (column_default LIKE 'nextval(%' OR is_identity = 'YES')"
+        )
+        sequences = [row for row in cur.fetchall() if row[2]]
+        for table, column, sequence in sequences:
+            cur.execute(
+                f"SELECT setval(%s, COALESCE(MAX({quote_ident(column)}), 1), MAX({quote_ident(column)}) IS NOT NULL)"
+                f" FROM {quote_ident(table)}",
+                [sequence],
+            )
+    conn.commit()
+    return len(sequences)
+
+
+def target_counts(conn, tables):
+    counts = {}
+    with conn.cursor() as cur:
+        for table in tables:
+            cur.execute(f"SELECT COUNT(*) FROM {quote_ident(table)}")
+            counts[table] = cur.fetchone()[0]
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument("--sqlite", default="db.sqlite3", help="Path to sqlite file")
+    parser.add_argument("--dsn", default=dsn_from_env(), help="Target Postgres URL (default: from DB_* variables)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2, help="Parallel load processes")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS, help="Rows fetched from SQLite per batch")
+    parser.add_argument("--tables", nargs="+", help="Only copy these tables")
+    parser.add_argument("--ddl-out", default="deferred_ddl.sql", help="Where to save the dropped index and FK definitions")
+    args = parser.parse_args()
+
+    if psycopg2 is None:
+        parser.error("psycopg2 is required (pip install psycopg2-binary)")
+    if not args.dsn:
+        parser.error("give --dsn or set DB_NAME, DB_USER and DB_HOST")
+    if not os.path.exists(args.sqlite):
+        parser.error(f"{args.sqlite} not found")
+
+    started = time.perf_counter()
+    source = sqlite_tables(args.sqlite)
+    conn = connect(args.dsn)
+    with conn.cursor() as cur:
+        target = pg_columns(cur)
+        foreign_keys, indexes = deferred_ddl(cur)
+    conn.commit()
+
+    jobs = []
+    for table, count in source.items():
+        if args.tables and table not in args.tables:
+            continue
+        if table not in target:
+            print(f"skip {table}: not in the target schema (run manage.py migrate there first?)")
+            continue
+        columns = [name for name in sqlite_columns(args.sqlite, table) if name in target[table]]
+        dropped = set(sqlite_columns(args.sqlite, table)) - set(columns)
+        if dropped:
+            print(f"{table}: ignoring columns missing on the target: {', '.join(sorted(dropped))}")
+        jobs.append((count, table, columns))
+    jobs.sort(reverse=True)
+    if not jobs:
+        parser.error("no tables to copy")
+
+    write_ddl(args.ddl_out, foreign_keys, indexes)
+    print(f"dropping {len(foreign_keys)} foreign keys and {len(indexes)} indexes (saved to {args.ddl_out})")
+    drop_deferred(conn, foreign_keys, indexes)
+
+    try:
+        load_tables(args.sqlite, args.dsn, jobs, args.workers, args.chunk_rows)
+    finally:
+        # Even when a table fails to load, leave the schema as it was found.
+        failures = restore_deferred(args.dsn, conn, foreign_keys, indexes, args.workers)
+
+    print(f"reset {reset_sequences(conn)} sequences")
+    conn.autocommit = True
+    with conn.cursor() as cur:
+        cur.execute("ANALYZE")
+
+    loaded = target_counts(conn, [table for _, table, _ in jobs])
+    mismatched = [(table, source[table], loaded[table]) for _, table, _ in jobs if loaded[table] != source[table]]
+    for table, expected, actual in mismatched:
+        print(f"  COUNT MISMATCH {table}: sqlite {expected:,}, postgres {actual:,}")
+    conn.close()
+    print(f"done in {time.perf_counter() - started:.1f}s")
+    return 1 if failures or mismatched else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,147 @@
+"""
+End-to-end test of sqlite_to_postgres_copy.py against a local Postgres.
+
+The loader works on the whole public schema of its target, so point
+COPY_TEST_DSN at a scratch database; the test recreates its public schema:
+
+  createdb wakafine_copy_test
+  COPY_TEST_DSN="postgresql://postgres@localhost/wakafine_copy_test?sslmode=disable" \
+      python scripts/test_sqlite_to_postgres_copy.py
+
+Skipped without COPY_TEST_DSN or psycopg2.
+"""
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+try:
+    import psycopg2
+except ImportError:  # pragma: no cover
+    psycopg2 = None
+
+SCRIPT = Path(__file__).with_name("sqlite_to_postgres_copy.py")
+DSN = os.environ.get("COPY_TEST_DSN")
+
+PG_SCHEMA = """
+DROP SCHEMA public CASCADE;
+CREATE SCHEMA public;
+CREATE TABLE parent (
+    id integer GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+    name varchar(50) NOT NULL,
+    active boolean NOT NULL,
+    created_at timestamp with time zone NOT NULL,
+    note text NULL,
+    blob bytea NULL
+);
+CREATE TABLE child (
+    id bigserial PRIMARY KEY,
+    parent_id integer NOT NULL REFERENCES parent (id) DEFERRABLE INITIALLY DEFERRED,
+    seats integer NOT NULL
+);
+CREATE INDEX child_parent_id_idx ON child (parent_id);
+CREATE UNIQUE INDEX parent_name_active_uniq ON parent (name) WHERE active;
+"""
+
+# Django's SQLite layout: booleans as 0/1, timestamps as naive UTC text.
+SQLITE_SCHEMA = """
+CREATE TABLE parent (id integer PRIMARY KEY AUTOINCREMENT, name varchar(50) NOT NULL,
+    active bool NOT NULL, created_at datetime NOT NULL, note text NULL, blob blob NULL);
+CREATE TABLE child (id integer PRIMARY KEY AUTOINCREMENT, parent_id integer NOT NULL,
+    seats integer NOT NULL);
+"""
+
+PARENTS = [
+    (1, "plain", 1, "2025-01-02 03:04:05.123456", "no escapes", None),
+    (2, "escapes", 0, "2025-06-30 23:59:59", "tab\there\nnew line \\ backslash", b"\x00\xffbytes"),
+    (7, "unicode", 1, "2024-12-31 00:00:00", "Kenema → Bo", None),
+]
+
+
+@unittest.skipUnless(DSN and psycopg2, "set COPY_TEST_DSN to a scratch Postgres database")
+class CopyLoaderTest(unittest.TestCase):
+    def setUp(self):
+        self.conn = psycopg2.connect(DSN)
+        self.conn.autocommit = True
+        with self.conn.cursor() as cur:
+            cur.execute(PG_SCHEMA)
+        self.tmp = tempfile.TemporaryDirectory()
+        self.sqlite = os.path.join(self.tmp.name, "source.sqlite3")
+        src = sqlite3.connect(self.sqlite)
+        src.executescript(SQLITE_SCHEMA)
+        src.executemany("INSERT INTO parent VALUES (?, ?, ?, ?, ?, ?)", PARENTS)
+        src.executemany(
+            "INSERT INTO child (parent_id, seats) VALUES (?, ?)",
+            [(PARENTS[i % 3][0], i) for i in range(2500)],
+        )
+        src.commit()
+        src.close()
+
+    def tearDown(self):
+        self.conn.close()
+        self.tmp.cleanup()
+
+    def run_loader(self):
+        return subprocess.run(
+            [
+                sys.executable, str(SCRIPT), "--sqlite", self.sqlite, "--dsn", DSN,
+                "--workers", "2", "--chunk-rows", "100",
+                "--ddl-out", os.path.join(self.tmp.name, "deferred.sql"),
+            ],
+            capture_output=True, text=True,
+        )
+
+    def query(self, sql, params=None):
+        with self.conn.cursor() as cur:
+            cur.execute(sql, params)
+            return cur.fetchall()
+
+    def deferred_objects(self):
+        foreign_keys = self.query(
+            "SELECT conname FROM pg_constraint WHERE contype = 'f'"
+            " AND connamespace = 'public'::regnamespace"
+        )
+        indexes = self.query(
+            "SELECT indexname FROM pg_indexes WHERE schemaname = 'public'"
+            " AND indexname IN ('child_parent_id_idx', 'parent_name_active_uniq')"
+        )
+        return len(foreign_keys), len(indexes)
+
+    def test_copies_rows_and_restores_schema(self):
+        result = self.run_loader()
+        self.assertEqual(result.returncode, 0, result.stdout + result.stderr)
+
+        rows = self.query(
+            "SELECT id, name, active, created_at AT TIME ZONE 'UTC', note, blob"
+            " FROM parent ORDER BY id"
+        )
+        self.assertEqual([row[:3] for row in rows], [(1, "plain", True), (2, "escapes", False), (7, "unicode", True)])
+        self.assertEqual(str(rows[0][3]), "2025-01-02 03:04:05.123456")
+        self.assertEqual(rows[1][4], "tab\there\nnew line \\ backslash")
+        self.assertEqual(bytes(rows[1][5]), b"\x00\xffbytes")
+        self.assertEqual(rows[2][4], "Kenema → Bo")
+        self.assertIsNone(rows[0][5])
+        self.assertEqual(self.query("SELECT COUNT(*), SUM(seats) FROM child")[0], (2500, sum(range(2500))))
+
+        self.assertEqual(self.deferred_objects(), (1, 2))
+        # Sequences continue after the copied ids.
+        self.assertEqual(self.query("INSERT INTO parent (name, active, created_at) VALUES ('new', false, now()) RETURNING id")[0][0], 8)
+        self.assertEqual(self.query("INSERT INTO child (parent_id, seats) VALUES (1, 0) RETURNING id")[0][0], 2501)
+
+    def test_failed_load_restores_indexes_and_foreign_keys(self):
+        src = sqlite3.connect(self.sqlite)
+        src.execute("UPDATE child SET seats = 'many' WHERE id = 2000")
+        src.commit()
+        src.close()
+
+        result = self.run_loader()
+        self.assertNotEqual(result.returncode, 0)
+        self.assertIn("invalid input syntax for type integer", result.stderr)
+        self.assertEqual(self.deferred_objects(), (1, 2))
+
+
+if __name__ == "__main__":
+    unittest.main()
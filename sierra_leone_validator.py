@@ -1,17 +1,24 @@
 #!/usr/bin/env python
 """
 Sierra Leone Mobile Money Validation System
-Uses specific regex patterns for each provider
+Classifies numbers by their 2-digit network code through a lookup table
 """
 
 import re
-from typing import Optional, Tuple
+from typing import Iterable, List, Optional, Tuple
+
+# Everything except digits and "+" is dropped before classification
+_STRIP = re.compile(r"[^0-9+]")
 
 
 class SierraLeoneMobileValidator:
     """
     Comprehensive validator for Sierra Leone mobile money numbers
-    Uses specific regex patterns for each provider
+
+    A number is +232 or 0, a 2-digit network code and 6 digits. It is cleaned
+    once, the network code is looked up in NETWORK_PROVIDERS (built from
+    NETWORK_CODES) and the remaining digits are checked, instead of trying
+    each provider's regex in turn. PROVIDER_PATTERNS documents the same rules.
     """
 
     # Regex patterns for each mobile money provider
@@ -34,12 +41,44 @@ class SierraLeoneMobileValidator:
         "qmoney": {"international": ["31", "32", "34"], "local": ["031", "032", "034"]},
     }
 
+    # Network code -> provider, e.g. "76" -> "orange"
+    NETWORK_PROVIDERS = {
+        code: provider
+        for provider, codes in NETWORK_CODES.items()
+        for code in codes["international"]
+    }
+
+    @classmethod
+    def _clean(cls, phone_number: str) -> str:
+        """Remove spaces, dashes and anything else that is not a digit or +"""
+        if phone_number.isascii() and (
+            phone_number.isdigit() or (phone_number[0] == "+" and phone_number[1:].isdigit())
+        ):
+            return phone_number
+        return _STRIP.sub("", phone_number)
+
+    @classmethod
+    def _classify(cls, clean_number: str) -> Tuple[Optional[str], Optional[str]]:
+        """(provider, +232 number) for a cleaned number, or (None, None)"""
+        length = len(clean_number)
+        if length == 12 and clean_number.startswith("+232"):
+            code, subscriber = clean_number[4:6], clean_number[6:]
+        elif length == 9 and clean_number[0] == "0":
+            code, subscriber = clean_number[1:3], clean_number[3:]
+        else:
+            return None, None
+        provider = cls.NETWORK_PROVIDERS.get(code)
+        # After _clean only ASCII digits and "+" remain, so isdigit() is exact
+        if provider is None or not subscriber.isdigit():
+            return None, None
+        return provider, f"+232{code}{subscriber}"
+
     @classmethod
     def validate_number(
         cls, phone_number: str
     ) -> Tuple[bool, Optional[str], Optional[str]]:
         """
-        Validate a phone number and determine its provider using regex patterns
+        Validate a phone number and determine its provider from its network code
 
         Returns:
             (is_valid, provider, normalized_number)
@@ -47,17 +86,40 @@ class SierraLeoneMobileValidator:
         if not phone_number:
             return False, None, None
 
-        # Clean the phone number (remove spaces, dashes, etc.)
-        clean_number = re.sub(r"[^0-9+]", "", phone_number)
+        provider, normalized = cls._classify(cls._clean(phone_number))
+        if provider is None:
+            return False, None, None
+        return True, provider, normalized
 
-        # Test against each provider's regex pattern
-        for provider, pattern in cls.PROVIDER_PATTERNS.items():
-            if re.match(pattern, clean_number):
-                # Normalize to +232 format
-                normalized = cls._normalize_to_international(clean_number)
-                return True, provider, normalized
+    @classmethod
+    def classify_many(
+        cls, phone_numbers: Iterable[str]
+    ) -> List[Tuple[bool, Optional[str], Optional[str]]]:
+        """
+        validate_number() for many numbers at once, e.g. an imported customer
+        list or a payment reconciliation file. Repeated numbers are
+        classified once.
 
-        return False, None, None
+        Returns:
+            one (is_valid, provider, normalized_number) per input, in order
+        """
+        invalid = (False, None, None)
+        clean = cls._clean
+        classify = cls._classify
+        seen = {}
+        results = []
+        append = results.append
+        for phone_number in phone_numbers:
+            result = seen.get(phone_number)
+            if result is None:
+                if phone_number:
+                    provider, normalized = classify(clean(phone_number))
+                    result = invalid if provider is None else (True, provider, normalized)
+                else:
+                    result = invalid
+                seen[phone_number] = result
+            append(result)
+        return results
 
     @classmethod
     def _normalize_to_international(cls, number: str) -> str:
@@ -87,12 +149,8 @@ class SierraLeoneMobileValidator:
         if not phone_number or provider not in cls.PROVIDER_PATTERNS:
             return False
 
-        # Clean the phone number
-        clean_number = re.sub(r"[^0-9+]", "", phone_number)
-
-        # Test against the specific provider's pattern
-        pattern = cls.PROVIDER_PATTERNS[provider]
-        return bool(re.match(pattern, clean_number))
+        detected, _ = cls._classify(cls._clean(phone_number))
+        return detected == provider
 
     @classmethod
     def get_provider_for_payment_method(cls, payment_method: str) -> Optional[str]:
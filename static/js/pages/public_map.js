@@ -0,0 +1,387 @@
+/*
+ * Live bus tracking map (templates/gps_tracking/public_map.html).
+ * The page passes the Google Maps key in a json_script element.
+ */
+const MAPS_API_KEY = JSON.parse(document.getElementById('maps-api-key').textContent || '""');
+
+let map;
+let busMarkers = {};
+let busData = [];
+let mapsLoaded = false;
+
+// Initialize when page loads
+document.addEventListener('DOMContentLoaded', function() {
+    console.log('Page loaded, initializing GPS tracking...');
+    loadGoogleMaps();
+});
+
+// Load Google Maps API dynamically
+function loadGoogleMaps() {
+    if (typeof google !== 'undefined' && google.maps) {
+        console.log('Google Maps already loaded');
+        initMap();
+        return;
+    }
+    
+    console.log('Loading Google Maps API...');
+    console.log('API Key available:', MAPS_API_KEY.length > 0 ? 'Yes' : 'No');
+    
+    const script = document.createElement('script');
+    script.src = `https://maps.googleapis.com/maps/api/js?key=${encodeURIComponent(MAPS_API_KEY)}&callback=initMap`;
+    script.async = true;
+    script.defer = true;
+    script.onerror = function() {
+        console.error('Failed to load Google Maps API');
+        console.error('Possible causes:');
+        console.error('1. Invalid API key');
+        console.error('2. API key restrictions');
+        console.error('3. Network connectivity issues');
+        console.error('4. API billing not set up');
+        
+        showErrorMessage('Failed to load Google Maps. Please check the API key configuration.');
+        document.getElementById('map-loading').innerHTML = `
+            <div class="text-center">
+                <i class="fas fa-exclamation-triangle text-3xl text-red-600 mb-2"></i>
+                <p class="text-red-600 mb-2">Failed to load Google Maps</p>
+                <p class="text-sm text-gray-600 mb-3">This may be due to an invalid API key or network issues</p>
+                <button onclick="loadGoogleMaps()" class="bg-blue-600 text-white px-4 py-2 rounded hover:bg-blue-700">
+                    Retry
+                </button>
+            </div>
+        `;
+    };
+    script.onload = function() {
+        console.log('Google Maps API script loaded successfully');
+    };
+    document.head.appendChild(script);
+}
+
+// Initialize Google Map - called by Google Maps API
+function initMap() {
+    try {
+        console.log('Initializing Google Maps...');
+        
+        // Center on Sierra Leone
+        map = new google.maps.Map(document.getElementById('map'), {
+            zoom: 10,
+            center: { lat: 8.460555, lng: -11.779889 }, // Freetown, Sierra Leone
+            styles: [
+                // Custom map styling for better visibility
+                {
+                    featureType: 'road',
+                    elementType: 'geometry',
+                    stylers: [{ color: '#f5f1e6' }]
+                },
+                {
+                    featureType: 'water',
+                    elementType: 'geometry',
+                    stylers: [{ color: '#c9c9c9' }]
+                }
+            ]
+        });
+        
+        mapsLoaded = true;
+        document.getElementById('map-loading').style.display = 'none';
+        console.log('Google Maps initialized successfully');
+        
+        // Load initial bus data
+        loadBusLocations();
+        
+        // Set up real-time updates
+        setInterval(loadBusLocations, 30000); // Update every 30 seconds
+        
+    } catch (error) {
+        console.error('Error initializing Google Maps:', error);
+        showErrorMessage('Failed to initialize map: ' + error.message);
+    }
+}
+
+// Load bus locations from API
+async function loadBusLocations() {
+    try {
+        const response = await fetch('/gps/api/buses/locations/');
+        if (!response.ok) {
+            throw new Error(`HTTP ${response.status}: ${response.statusText}`);
+        }
+        const data = await response.json();
+        
+        if (!data.success) {
+            throw new Error('API returned error: ' + (data.error || 'Unknown error'));
+        }
+        
+        busData = data.buses || [];
+        console.log('Loaded', busData.length, 'buses from API');
+        
+        updateMapMarkers();
+        updateBusCount();
+        updateLastRefresh();
+        
+    } catch (error) {
+        console.error('Failed to load bus locations:', error);
+        // Show error to user
+        showErrorMessage('Failed to load bus locations: ' + error.message);
+    }
+}
+
+// Update map markers
+function updateMapMarkers() {
+    if (!mapsLoaded || !map) {
+        console.log('Google Maps not ready yet, skipping marker update');
+        return;
+    }
+    
+    try {
+        // Clear existing markers
+        Object.values(busMarkers).forEach(({marker}) => {
+            if (marker && marker.setMap) {
+                marker.setMap(null);
+            }
+        });
+        busMarkers = {};
+        
+        console.log('Updating markers for', busData.length, 'buses');
+        
+        // Add new markers
+        busData.forEach(bus => {
+        const position = { lat: bus.latitude, lng: bus.longitude };
+        
+        // Create custom marker icon based on bus status - using default Google Maps markers with custom colors
+        const icon = {
+            path: google.maps.SymbolPath.CIRCLE,
+            fillColor: bus.is_moving ? '#10B981' : '#EF4444', // Green for moving, red for stopped
+            fillOpacity: 0.8,
+            strokeColor: '#FFFFFF',
+            strokeWeight: 2,
+            scale: 12,
+        };
+        
+        // Add bus icon overlay with prominent bus ID
+        const busIcon = {
+            url: 'data:image/svg+xml;charset=UTF-8,' + encodeURIComponent(`
+                <svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 32 32" width="32" height="32">
+                    <!-- Bus body -->
+                    <rect x="4" y="8" width="24" height="16" rx="2" ry="2" fill="${bus.is_moving ? '#10B981' : '#EF4444'}" stroke="#FFFFFF" stroke-width="1"/>
+                    <!-- Windows -->
+                    <rect x="6" y="10" width="6" height="4" fill="#E5E7EB" rx="1"/>
+                    <rect x="14" y="10" width="6" height="4" fill="#E5E7EB" rx="1"/>
+                    <rect x="22" y="10" width="4" height="4" fill="#E5E7EB" rx="1"/>
+                    <!-- Wheels -->
+                    <circle cx="10" cy="26" r="3" fill="#374151" stroke="#FFFFFF" stroke-width="1"/>
+                    <circle cx="22" cy="26" r="3" fill="#374151" stroke="#FFFFFF" stroke-width="1"/>
+                    <!-- Bus ID Badge -->
+                    <circle cx="16" cy="18" r="6" fill="#FFFFFF" stroke="${bus.is_moving ? '#10B981' : '#EF4444'}" stroke-width="2"/>
+                    <text x="16" y="22" text-anchor="middle" fill="${bus.is_moving ? '#10B981' : '#EF4444'}" font-size="8" font-weight="bold">${bus.bus_id}</text>
+                    <!-- Status indicator -->
+                    <circle cx="26" cy="12" r="2" fill="${bus.is_online ? '#10B981' : '#9CA3AF'}" stroke="#FFFFFF" stroke-width="1"/>
+                </svg>
+            `),
+            scaledSize: new google.maps.Size(32, 32),
+            origin: new google.maps.Point(0, 0),
+            anchor: new google.maps.Point(16, 24)
+        };
+        
+        const marker = new google.maps.Marker({
+            position: position,
+            map: map,
+            icon: busIcon,
+            title: `${bus.bus_name} (${bus.bus_number})`,
+            animation: google.maps.Animation.DROP
+        });
+        
+        // Create info window
+        const infoWindow = new google.maps.InfoWindow({
+            content: createInfoWindowContent(bus)
+        });
+        
+        marker.addListener('click', () => {
+            // Close all other info windows
+            Object.values(busMarkers).forEach(({infoWindow: iw}) => iw.close());
+            infoWindow.open(map, marker);
+        });
+        
+        busMarkers[bus.bus_id] = { marker, infoWindow };
+    });
+
+    // After markers created, check for focus_bus query param
+    const params = new URLSearchParams(window.location.search);
+    const focusBus = params.get('focus_bus');
+    if (focusBus && busMarkers[focusBus]) {
+        const { marker, infoWindow } = busMarkers[focusBus];
+        map.setCenter(marker.getPosition());
+        map.setZoom(15);
+        // Close others then open
+        Object.values(busMarkers).forEach(({infoWindow: iw}) => {
+            if (iw && iw.close) iw.close();
+        });
+        infoWindow.open(map, marker);
+    }
+    
+    console.log(`Updated ${busData.length} bus markers on map`);
+    
+    } catch (error) {
+        console.error('Error updating map markers:', error);
+        showErrorMessage('Error displaying bus locations on map: ' + error.message);
+    }
+}
+
+// Create info window content
+function createInfoWindowContent(bus) {
+    return `
+        <div class="p-2 max-w-xs">
+            <h3 class="font-semibold text-lg mb-2">${bus.bus_name}</h3>
+            <div class="space-y-1 text-sm">
+                <div><strong>Bus ID:</strong> ${bus.bus_id}</div>
+                <div><strong>Number:</strong> ${bus.bus_number}</div>
+                ${bus.route_name ? `<div><strong>Route:</strong> ${bus.route_name}</div>` : ''}
+                ${bus.driver_name ? `<div><strong>Driver:</strong> ${bus.driver_name}</div>` : ''}
+                <div><strong>Speed:</strong> ${bus.speed.toFixed(1)} km/h</div>
+                <div><strong>Status:</strong> <span class="font-medium ${bus.is_moving ? 'text-green-600' : 'text-red-600'}">${bus.is_moving ? 'Moving' : 'Stopped'}</span></div>
+                <div><strong>Last Update:</strong> ${bus.minutes_ago} minutes ago</div>
+                <div><strong>Online:</strong> <span class="font-medium ${bus.is_online ? 'text-green-600' : 'text-red-600'}">${bus.is_online ? 'Yes' : 'No'}</span></div>
+            </div>
+            <button onclick="showBusDetails(${bus.bus_id})" class="mt-2 bg-blue-600 text-white px-3 py-1 rounded text-sm hover:bg-blue-700">
+                View Details
+            </button>
+        </div>
+    `;
+}
+
+// Focus on specific bus
+function focusOnBus(busId) {
+    const bus = busData.find(b => b.bus_id === busId);
+    if (bus && busMarkers[busId]) {
+        map.setCenter({ lat: bus.latitude, lng: bus.longitude });
+        map.setZoom(15);
+        busMarkers[busId].infoWindow.open(map, busMarkers[busId].marker);
+    }
+}
+
+// Show bus details in modal
+async function showBusDetails(busId) {
+    try {
+        const response = await fetch(`/gps/bus/${busId}/`);
+        const html = await response.text();
+        
+        // Extract content from the response
+        const parser = new DOMParser();
+        const doc = parser.parseFromString(html, 'text/html');
+        const content = doc.querySelector('.bus-details-content');
+        
+        if (content) {
+            document.getElementById('modalContent').innerHTML = content.innerHTML;
+            document.getElementById('busModal').classList.remove('hidden');
+            document.getElementById('busModal').classList.add('flex');
+        }
+    } catch (error) {
+        console.error('Error loading bus details:', error);
+    }
+}
+
+// Close bus modal
+function closeBusModal() {
+    document.getElementById('busModal').classList.add('hidden');
+    document.getElementById('busModal').classList.remove('flex');
+}
+
+// Update bus count display
+function updateBusCount() {
+    const movingCount = busData.filter(bus => bus.is_moving).length;
+    document.getElementById('movingBusCount').textContent = movingCount;
+}
+
+// Update last refresh time
+function updateLastRefresh() {
+    const now = new Date();
+    document.getElementById('lastRefresh').textContent = now.toLocaleTimeString();
+}
+
+// Refresh map manually
+function refreshMap() {
+    loadBusLocations();
+}
+
+// Filter functionality
+document.getElementById('routeFilter').addEventListener('change', function() {
+    // Implement route filtering logic
+    filterBuses();
+});
+
+document.getElementById('statusFilter').addEventListener('change', function() {
+    // Implement status filtering logic
+    filterBuses();
+});
+
+function filterBuses() {
+    const routeFilter = document.getElementById('routeFilter').value;
+    const statusFilter = document.getElementById('statusFilter').value;
+    
+    // Hide/show markers based on filters
+    Object.entries(busMarkers).forEach(([busId, {marker}]) => {
+        const bus = busData.find(b => b.bus_id == busId);
+        let show = true;
+        
+        if (routeFilter && bus.route_name && bus.route_name != routeFilter) {
+            show = false;
+        }
+        
+        if (statusFilter) {
+            if (statusFilter === 'moving' && !bus.is_moving) show = false;
+            if (statusFilter === 'stationary' && bus.is_moving) show = false;
+        }
+        
+        marker.setVisible(show);
+    });
+    
+    // Also filter bus cards
+    document.querySelectorAll('[data-bus-id]').forEach(card => {
+        const busId = card.dataset.busId;
+        const bus = busData.find(b => b.bus_id == busId);
+        let show = true;
+        
+        if (routeFilter && bus.route_name && bus.route_name != routeFilter) {
+            show = false;
+        }
+        
+        if (statusFilter) {
+            if (statusFilter === 'moving' && !bus.is_moving) show = false;
+            if (statusFilter === 'stationary' && bus.is_moving) show = false;
+        }
+        
+        card.style.display = show ? 'block' : 'none';
+    });
+}
+
+// Close modal when clicking outside
+document.getElementById('busModal').addEventListener('click', function(e) {
+    if (e.target === this) {
+        closeBusModal();
+    }
+});
+
+// Show error message to user
+function showErrorMessage(message) {
+    // Create or update error display
+    let errorDiv = document.getElementById('error-message');
+    if (!errorDiv) {
+        errorDiv = document.createElement('div');
+        errorDiv.id = 'error-message';
+        errorDiv.className = 'fixed top-4 right-4 bg-red-100 border border-red-400 text-red-700 px-4 py-3 rounded max-w-md z-50';
+        document.body.appendChild(errorDiv);
+    }
+    errorDiv.innerHTML = `
+        <div class="flex items-center">
+            <i class="fas fa-exclamation-triangle mr-2"></i>
+            <span>${message}</span>
+            <button onclick="this.parentElement.parentElement.remove()" class="ml-4 text-red-600 hover:text-red-800">
+                <i class="fas fa-times"></i>
+            </button>
+        </div>
+    `;
+    
+    // Auto-remove after 10 seconds
+    setTimeout(() => {
+        if (errorDiv && errorDiv.parentElement) {
+            errorDiv.remove();
+        }
+    }, 10000);
+}
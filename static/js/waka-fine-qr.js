@@ -5,8 +5,6 @@
  */
 
 function generateWakaFineQRCode(bookingData, qrContainer, options = {}) {
-    'use strict';
-    
     const defaults = {
         width: 130,
         height: 130,
@@ -3,6 +3,11 @@ ASGI config for wakafine_bus project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Serve it with uvicorn to get the async GPS endpoints (``/gps/api/async/...``)
+without tying up a thread per waiting request::
+
+    uvicorn wakafine_bus.asgi:application --workers 4
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
@@ -0,0 +1,134 @@
+"""
+Database connection configuration shared by the development and production
+settings modules.
+
+Connection handling is chosen per deployment with ``DB_POOL_MODE``:
+
+- ``direct`` (default): Django opens its own connections to Postgres.
+  ``DB_CONN_MAX_AGE`` controls reuse (0 closes the connection after every
+  request, which is what the serverless deployment did originally).
+- ``pgbouncer``: connect through a transaction-mode pooler such as Supabase's
+  Supavisor (usually port 6543). Consecutive statements may run on different
+  server backends, so server-side cursors and prepared statements are turned
+  off.
+- ``psycopg``: keep an in-process psycopg 3 connection pool (Django's
+  ``OPTIONS["pool"]``) for long-running servers such as gunicorn or uvicorn.
+  Requires ``psycopg[pool]``; falls back to ``direct`` when it is missing.
+
+Reused connections are health-checked before each request
+(``CONN_HEALTH_CHECKS``) and pooled connections are checked on checkout, so a
+connection dropped by Supabase is replaced instead of failing the request.
+"""
+
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+POOL_MODES = ("direct", "pgbouncer", "psycopg")
+
+
+def env_int(name, default, env=None):
+    env = os.environ if env is None else env
+    value = env.get(name)
+    if value in (None, ""):
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        logger.warning("Ignoring non-integer %s=%r", name, value)
+        return default
+
+
+def env_bool(name, default, env=None):
+    env = os.environ if env is None else env
+    value = env.get(name)
+    if value in (None, ""):
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def _psycopg3_available():
+    try:
+        import psycopg  # noqa: F401
+    except Exception:
+        return False
+    return True
+
+
+def _psycopg_pool_available():
+    try:
+        import psycopg_pool  # noqa: F401
+    except Exception:
+        return False
+    return _psycopg3_available()
+
+
+def postgres_database(
+    name,
+    user,
+    password,
+    host,
+    port="5432",
+    sslmode="require",
+    connect_timeout=None,
+    env=None,
+):
+    """Build a ``DATABASES["default"]`` entry for Postgres.
+
+    Connection reuse is read from the environment so each deployment can pick
+    the strategy that suits it without a settings change.
+    """
+    env = os.environ if env is None else env
+    mode = env.get("DB_POOL_MODE", "direct").strip().lower() or "direct"
+    if mode not in POOL_MODES:
+        logger.warning("Unknown DB_POOL_MODE=%r, using 'direct'", mode)
+        mode = "direct"
+
+    options = {"sslmode": sslmode}
+    if connect_timeout:
+        options["connect_timeout"] = connect_timeout
+
+    config = {
+        "ENGINE": "django.db.backends.postgresql",
+        "NAME": name,
+        "USER": user,
+        "PASSWORD": password or "",
+        "HOST": host,
+        "PORT": port or "5432",
+        "OPTIONS": options,
+        "CONN_MAX_AGE": env_int("DB_CONN_MAX_AGE", 0, env),
+        "CONN_HEALTH_CHECKS": env_bool("DB_CONN_HEALTH_CHECKS", True, env),
+    }
+
+    if mode == "psycopg" and not _psycopg_pool_available():
+        logger.warning(
+            "DB_POOL_MODE=psycopg needs psycopg[pool] installed; using 'direct'"
+        )
+        mode = "direct"
+
+    if mode == "pgbouncer":
+        # Named cursors (used by QuerySet.iterator()) only live inside the
+        # backend that created them, which transaction pooling doesn't
+        # guarantee.
+        config["DISABLE_SERVER_SIDE_CURSORS"] = True
+        if _psycopg3_available():
+            # psycopg 3 prepares repeated statements server-side; a prepared
+            # statement may not exist on the next backend we get.
+            # psycopg2 never prepares statements, so nothing to do there.
+            options["prepare_threshold"] = None
+    elif mode == "psycopg":
+        from psycopg_pool import ConnectionPool
+
+        options["pool"] = {
+            "min_size": env_int("DB_POOL_MIN_SIZE", 1, env),
+            "max_size": env_int("DB_POOL_MAX_SIZE", 10, env),
+            "timeout": env_int("DB_POOL_TIMEOUT", 10, env),
+            "max_idle": env_int("DB_POOL_MAX_IDLE", 300, env),
+            # Run a cheap liveness check when a connection is checked out.
+            "check": ConnectionPool.check_connection,
+        }
+        # Django refuses persistent connections on top of its own pool.
+        config["CONN_MAX_AGE"] = 0
+
+    return config